@@ -0,0 +1,195 @@
+"""
+Load Test for the Smart Money Confidence API
+
+Opens N concurrent keep-alive HTTP/1.1 clients (stdlib asyncio only), has
+each send GET requests back to back for a fixed duration, and reports
+p50/p99 latency and requests/sec for every concurrency level.
+
+Usage:
+    python api/load_test.py --url http://localhost:5001 --clients 100,1000
+    python api/load_test.py --path /api/v1/smart-money-confidence/elite --duration 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_PATHS = [
+    '/api/v1/smart-money-confidence?limit=100',
+    '/api/v1/smart-money-confidence/elite',
+    '/api/v1/smart-money-confidence/alerts',
+]
+
+
+@dataclass
+class LoadTestResult:
+    """Latencies and failures collected for one concurrency level."""
+    clients: int
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, pct: int) -> float:
+        """Latency percentile in milliseconds."""
+        if len(self.latencies) < 2:
+            return self.latencies[0] * 1000 if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[pct - 1] * 1000
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """
+    Read one HTTP response.
+
+    Returns:
+        (status code, whether the server keeps the connection open)
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split(' ', 2)[:2]
+
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+        keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    else:
+        await reader.read()  # Body runs until the server closes
+        keep_alive = False
+
+    return int(status), keep_alive
+
+
+async def _client(host: str, port: int, paths: List[str], deadline: float,
+                  result: LoadTestResult, start: asyncio.Event) -> None:
+    """Send requests on one connection until the deadline, reconnecting as needed."""
+    await start.wait()
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
+    i = 0
+
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        sent = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+            continue
+
+        if status == 200:
+            result.latencies.append(time.perf_counter() - sent)
+        else:
+            result.errors += 1
+
+        if not keep_alive:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_load_test(url: str, clients: int, duration: float,
+                        paths: List[str]) -> LoadTestResult:
+    """
+    Run one concurrency level.
+
+    Args:
+        url: Base URL of the API (http only)
+        clients: Number of concurrent connections
+        duration: Seconds to keep sending requests
+        paths: Request paths, cycled by each client
+
+    Returns:
+        LoadTestResult
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or 'localhost'
+    port = parts.port or 80
+
+    result = LoadTestResult(clients=clients)
+    start = asyncio.Event()
+    deadline = time.monotonic() + duration
+    tasks = [
+        asyncio.create_task(_client(host, port, paths, deadline, result, start))
+        for _ in range(clients)
+    ]
+
+    began = time.monotonic()
+    start.set()
+    await asyncio.gather(*tasks)
+    result.elapsed = time.monotonic() - began
+    return result
+
+
+def print_results(results: List[LoadTestResult]) -> None:
+    """Print one row per concurrency level."""
+    print(f"\n{'Clients':<10} {'Requests':<10} {'Errors':<8} {'p50 ms':<10} {'p99 ms':<10} {'req/s':<10}")
+    print("-" * 60)
+    for result in results:
+        print(
+            f"{result.clients:<10} {len(result.latencies):<10} {result.errors:<8} "
+            f"{result.percentile(50):<10.1f} {result.percentile(99):<10.1f} "
+            f"{result.requests_per_second:<10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test the Smart Money Confidence API')
+    parser.add_argument('--url', default='http://localhost:5001', help='API base URL')
+    parser.add_argument('--clients', default='100,1000',
+                        help='Comma-separated concurrency levels (default: 100,1000)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds per concurrency level (default: 10)')
+    parser.add_argument('--path', action='append',
+                        help='Request path (repeatable; default: scores, elite and alerts)')
+
+    args = parser.parse_args()
+
+    try:
+        levels = [int(level) for level in args.clients.split(',')]
+    except ValueError:
+        print(f"Invalid --clients: {args.clients}")
+        sys.exit(1)
+
+    paths = args.path or DEFAULT_PATHS
+    print(f"Load testing {args.url} for {args.duration:.0f}s per level")
+    for path in paths:
+        print(f"  GET {path}")
+
+    results = []
+    for clients in levels:
+        result = asyncio.run(run_load_test(args.url, clients, args.duration, paths))
+        results.append(result)
+        print(f"  {clients} clients: {len(result.latencies)} requests, {result.errors} errors")
+
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,11 +8,35 @@ Endpoints:
 - GET /api/v1/smart-money-confidence/{wallet} - Get confidence for specific wallet
 - GET /api/v1/smart-money-confidence/elite - Get elite wallets
 - GET /api/v1/smart-money-confidence/{wallet}/history - Get wallet score history
+- GET /api/v1/smart-money-confidence/{wallet}/windows - Get 7/30/90-day scores side by side
+- GET /api/v1/smart-money-confidence/alerts/stream - Server-Sent Events stream of confidence-drop alerts
 - POST /api/v1/smart-money-confidence/recalculate - Recalculate specific wallet
+- POST /api/v1/smart-money-confidence/recalculate/jobs - Queue a bulk recalculation job
+- GET /api/v1/smart-money-confidence/recalculate/jobs/{job_id} - Get job progress
+- GET /api/v1/smart-money-confidence/recalculate/jobs/{job_id}/stream - Stream job progress (SSE)
+- POST /api/v1/smart-money-confidence/export - Export new rows as partitioned Parquet/Arrow files
+
+GET responses are served from an in-process TTL/LRU cache with ETag
+headers (If-None-Match gets a 304). The cache is cleared whenever
+confidence scores are saved.
+
+The alert stream polls the latest-score table past a history-id watermark,
+so scores saved by any process are compared with the wallet's last known
+score without rescanning history.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+import base64
+import hashlib
+import json
+import queue
+import threading
+import time
 import sys
 import os
 
@@ -21,78 +45,499 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from signals.smart_money_confidence import (
     SmartMoneyConfidenceCalculator,
+    PreviousScoreCache,
     recalculate_wallet_confidence,
-    get_all_wallet_confidences,
-    ScoreCategory
+    ScoreCategory,
+    DEFAULT_WINDOWS,
+    parse_windows,
+    add_save_listener,
+    build_confidence_alert
 )
+from signals.recalculation_jobs import RecalculationQueue
+from signals.snapshot_export import SnapshotExporter
 
 app = Flask(__name__)
 
 # Configuration
 DB_PATH = os.environ.get('TRADING_DB_PATH', 'quant/data/trading.db')
 DEFAULT_DAYS = 30
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 30))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+ALERT_STREAM_HEARTBEAT = float(os.environ.get('ALERT_STREAM_HEARTBEAT', 15))
+ALERT_QUEUE_SIZE = 1000
+ALERT_POLL_INTERVAL = float(os.environ.get('ALERT_POLL_INTERVAL', 1))
+RECALC_WORKERS = int(os.environ.get('RECALC_WORKERS', 2))
+RECALC_BATCH_SIZE = int(os.environ.get('RECALC_BATCH_SIZE', 100))
+EXPORT_DIR = os.environ.get('EXPORT_DIR', 'quant/data/export')
+
+_calculator: Optional[SmartMoneyConfidenceCalculator] = None
+_reader: Optional[SmartMoneyConfidenceCalculator] = None
+_recalculation_queue: Optional[RecalculationQueue] = None
+_calculator_lock = threading.Lock()
+
+
+def get_calculator() -> SmartMoneyConfidenceCalculator:
+    """Get the calculator shared by all requests (created on first use)."""
+    global _calculator
+    with _calculator_lock:
+        if _calculator is None:
+            _calculator = SmartMoneyConfidenceCalculator(DB_PATH)
+        return _calculator
+
+
+def get_reader() -> SmartMoneyConfidenceCalculator:
+    """
+    Get the read-only calculator used by GET routes.
+
+    Its connections come from the bounded read-only pool, so concurrent
+    reads never hold the write lock. The writing calculator is created first
+    to make sure the schema exists.
+    """
+    global _reader
+    get_calculator()
+    with _calculator_lock:
+        if _reader is None:
+            _reader = SmartMoneyConfidenceCalculator(DB_PATH, readonly=True)
+        return _reader
+
+
+def get_recalculation_queue() -> RecalculationQueue:
+    """Get the background recalculation job queue (created on first use)."""
+    global _recalculation_queue
+    with _calculator_lock:
+        if _recalculation_queue is None:
+            _recalculation_queue = RecalculationQueue(
+                DB_PATH,
+                workers=RECALC_WORKERS,
+                batch_size=RECALC_BATCH_SIZE
+            )
+        return _recalculation_queue
+
+
+@dataclass
+class CachedResponse:
+    """A cached JSON response body and its validators."""
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL/LRU cache of GET response bodies.
+
+    Entries are keyed on route plus query arguments. Saves clear the whole
+    cache (via a score save listener); the TTL bounds staleness from writes
+    made by other processes.
+    """
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry stays fresh
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0  # Bumped on every clear
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        """Get a fresh entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, body: bytes, generation: int) -> CachedResponse:
+        """
+        Cache a response body.
+
+        The entry is only stored if the cache has not been cleared since
+        `generation` was read, so a save racing with a request cannot leave a
+        stale body behind.
+
+        Returns:
+            The new entry
+        """
+        entry = CachedResponse(
+            body=body,
+            etag=hashlib.sha1(body).hexdigest(),
+            expires_at=time.monotonic() + self.ttl
+        )
+
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+response_cache = ResponseCache()
+
+
+def _invalidate_response_cache(scores, window_days) -> None:
+    response_cache.clear()
+
+
+add_save_listener(_invalidate_response_cache)
+
+
+@dataclass
+class AlertSubscription:
+    """One streaming client's thresholds and pending alerts."""
+    threshold: float
+    drop_threshold: float
+    alerts: queue.Queue
+
+
+class AlertBroadcaster:
+    """
+    Detects confidence drops in saved scores and fans them out to streaming
+    clients.
+
+    Drops are read back from the database, so saves made by any process
+    (recalculation jobs, `main.py calculate-all`, other API workers) are
+    alerted on. While clients are connected, a poller thread reads the
+    smart_money_confidence_latest rows past its own history-id watermark
+    every `poll_interval` seconds (a PreviousScoreCache kept apart from the
+    calculator's) and compares each new score with the wallet's previous
+    one. Saves made in this process wake the poller at once. Window scores
+    are not kept in that table and are ignored. Scores saved while no client
+    is connected are skipped when the next client subscribes.
+    """
+
+    def __init__(self, queue_size: int = ALERT_QUEUE_SIZE,
+                 poll_interval: float = ALERT_POLL_INTERVAL):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            queue_size: Alerts buffered per client before new ones are dropped
+            poll_interval: Seconds between reads of newly saved scores
+        """
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._subscriptions: List[AlertSubscription] = []
+        self._last_scores: Optional[PreviousScoreCache] = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+
+    def subscribe(self, threshold: float, drop_threshold: float,
+                  alerts=None) -> AlertSubscription:
+        """
+        Register a client.
+
+        Args:
+            threshold: Minimum current score for a wallet to be alerted on
+            drop_threshold: Minimum drop to trigger an alert
+            alerts: Queue to deliver to (anything with a put_nowait that
+                    raises queue.Full); a new bounded queue.Queue by default
+
+        Returns:
+            The subscription whose queue receives (event id, alert) pairs
+        """
+        with self._lock:
+            if not self._subscriptions:
+                # First client since the broadcaster was idle: catch up with
+                # every wallet's current score, so only later saves alert
+                if self._last_scores is None:
+                    self._last_scores = PreviousScoreCache(get_reader().pool)
+                self._last_scores.refresh()
+            subscription = AlertSubscription(
+                threshold=threshold,
+                drop_threshold=drop_threshold,
+                alerts=alerts if alerts is not None else queue.Queue(maxsize=self.queue_size)
+            )
+            self._subscriptions.append(subscription)
+
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._run, name='alert-poller', daemon=True)
+                self._poller.start()
+            return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription) -> None:
+        """Remove a client."""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+        self._wake.set()
+
+    def on_save(self, scores, window_days) -> None:
+        """Save listener: read saves made in this process without waiting for the next poll."""
+        if window_days is None:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscriptions:
+                    self._poller = None  # The next client starts a new poller
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error polling confidence alerts: {e}")
+
+    def poll(self) -> int:
+        """
+        Read scores saved since the last poll and queue alerts for drops.
+
+        Returns:
+            Number of alerts queued
+        """
+        sent = 0
+
+        # Held across the read so a client subscribing meanwhile cannot be
+        # sent drops saved before it connected
+        with self._lock:
+            if not self._subscriptions:
+                return 0  # Caught up by the next first subscriber instead
+
+            changes = self._last_scores.poll()
+            for wallet_address, previous, current in changes:
+                if previous is None or previous <= current:
+                    continue
+
+                alert = None
+                for subscription in self._subscriptions:
+                    if current < subscription.threshold or previous - current < subscription.drop_threshold:
+                        continue
+                    if alert is None:
+                        alert = (self._next_id, build_confidence_alert(wallet_address, previous, current))
+                        self._next_id += 1
+                    try:
+                        subscription.alerts.put_nowait(alert)
+                        sent += 1
+                    except queue.Full:
+                        pass  # Client is not keeping up; drop rather than block the poller
+
+        return sent
+
+
+alert_broadcaster = AlertBroadcaster()
+add_save_listener(alert_broadcaster.on_save)
+
+
+def format_alert_event(event_id: int, alert: Dict) -> str:
+    """Format an alert as a Server-Sent Events message."""
+    return f"id: {event_id}\nevent: confidence_alert\ndata: {json.dumps(alert)}\n\n"
+
+
+def format_job_event(job: Dict) -> str:
+    """Format recalculation job progress as a Server-Sent Events message."""
+    return f"id: {job['version']}\nevent: progress\ndata: {json.dumps(job)}\n\n"
+
+
+SCORE_FIELDS = ('wallet_address', 'overall_score', 'category', 'trend', 'calculated_at')
+COMPONENT_FIELDS = (
+    'win_rate_score', 'trade_count_score', 'avg_notional_score',
+    'consistency_score', 'market_timing_score'
+)
+
+
+def parse_score_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a `fields=` projection.
+
+    Returns:
+        Requested field names (every field if none given), with
+        `components` expanded, or None if any name is unknown
+    """
+    if not value:
+        return list(SCORE_FIELDS + COMPONENT_FIELDS)
+
+    fields = []
+    for name in (part.strip() for part in value.split(',')):
+        if name == 'components':
+            fields.extend(COMPONENT_FIELDS)
+        elif name in SCORE_FIELDS or name in COMPONENT_FIELDS:
+            fields.append(name)
+        elif name:
+            return None
+    return list(dict.fromkeys(fields))
+
+
+def project_score_row(row: Dict, fields: List[str]) -> Dict:
+    """Shape a latest-score row like a full score object, keeping only `fields`."""
+    item = {}
+    for field in fields:
+        if field in SCORE_FIELDS:
+            value = row[field]
+            if field == 'calculated_at':
+                value = datetime.fromtimestamp(value).isoformat()
+            item[field] = value
+        else:
+            item.setdefault('components', {})[field] = row[field]
+    return item
+
+
+def encode_score_cursor(overall_score: float, wallet_address: str) -> str:
+    """Encode a listing position as an opaque cursor."""
+    payload = json.dumps([overall_score, wallet_address], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_score_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+    """Decode a cursor from encode_score_cursor (None if malformed)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        overall_score, wallet_address = json.loads(base64.urlsafe_b64decode(padded))
+        return float(overall_score), str(wallet_address)
+    except (ValueError, TypeError):
+        return None
+
+
+def add_cors_headers(response):
+    """Add CORS headers to a response."""
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-None-Match')
+    response.headers.add('Access-Control-Allow-Methods', 'GET,POST,OPTIONS')
+    response.headers.add('Access-Control-Expose-Headers', 'ETag')
+    return response
 
 
 def make_cors_response(data=None, status=200):
     """Make response with CORS headers."""
     response = jsonify(data) if data is not None else jsonify({})
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,POST,OPTIONS')
+    add_cors_headers(response)
     response.status_code = status
     return response
 
 
+def make_cached_response(entry: CachedResponse):
+    """Make a conditional response (200, or 304 if the client's copy is current)."""
+    response = app.response_class(entry.body, status=200, mimetype='application/json')
+    add_cors_headers(response)
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'no-cache'  # Revalidate with ETag
+    return response.make_conditional(request)
+
+
+def cached_response(view):
+    """
+    Serve a GET view from the response cache.
+
+    Only 200 responses are cached; OPTIONS and errors pass through.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        entry = response_cache.get(key)
+
+        if entry is None:
+            generation = response_cache.generation
+            response = view(*args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = response_cache.put(key, response.get_data(), generation)
+
+        return make_cached_response(entry)
+
+    return wrapper
+
+
 @app.route('/api/v1/smart-money-confidence', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_all_confidence_scores():
     """
-    Get latest confidence scores for all wallets.
+    Get latest confidence scores for all wallets, one page at a time.
+
+    Scores are ordered by overall score (then wallet address), highest first.
+    Pass the `next_cursor` of a response as `cursor` to get the next page;
+    it is null on the last page.
 
     Query Parameters:
-    - limit: Maximum number of wallets to return (default: 100)
+    - limit: Page size (default: 100; larger values are capped at MAX_PAGE_SIZE)
     - category: Filter by category (ELITE, STRONG, MODERATE, WEAK, POOR)
+    - cursor: Cursor from the previous page
+    - fields: Comma-separated fields to return (default: all). Top-level fields
+      are wallet_address, overall_score, category, trend and calculated_at;
+      `components` selects every component score, or name them individually
+      (e.g. win_rate_score).
     """
     if request.method == 'OPTIONS':
         return make_cors_response()
 
     try:
-        limit = request.args.get('limit', 100, type=int)
-        category_filter = request.args.get('category')
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return make_cors_response(
+                {'error': f"Invalid limit: {request.args.get('limit')}"},
+                400
+            )
+        limit = min(limit, MAX_PAGE_SIZE)
 
-        calculator = SmartMoneyConfidenceCalculator(DB_PATH)
-        scores = calculator.get_latest_confidence_scores(limit=limit)
+        category_filter = request.args.get('category')
 
-        # Filter by category if specified
+        category = None
         if category_filter:
             try:
                 category = ScoreCategory[category_filter.upper()]
-                scores = [s for s in scores if s.category == category]
             except KeyError:
                 return make_cors_response(
                     {'error': f'Invalid category: {category_filter}'},
                     400
                 )
 
-        # Convert to dict format
+        after = None
+        if request.args.get('cursor'):
+            after = decode_score_cursor(request.args['cursor'])
+            if after is None:
+                return make_cors_response({'error': 'Invalid cursor'}, 400)
+
+        fields = parse_score_fields(request.args.get('fields'))
+        if fields is None:
+            return make_cors_response(
+                {'error': f"Invalid fields: {request.args.get('fields')}"},
+                400
+            )
+
+        # One extra row tells us whether there is a next page
+        rows = get_reader().get_latest_score_page(
+            limit=limit + 1,
+            category=category,
+            after=after,
+            columns=fields
+        )
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit and page:
+            next_cursor = encode_score_cursor(page[-1]['overall_score'], page[-1]['wallet_address'])
+
         result = {
-            'count': len(scores),
-            'scores': [
-                {
-                    'wallet_address': score.wallet_address,
-                    'overall_score': score.overall_score,
-                    'category': score.category.value,
-                    'trend': score.trend,
-                    'calculated_at': score.calculated_at.isoformat(),
-                    'components': {
-                        'win_rate_score': score.win_rate_score,
-                        'trade_count_score': score.trade_count_score,
-                        'avg_notional_score': score.avg_notional_score,
-                        'consistency_score': score.consistency_score,
-                        'market_timing_score': score.market_timing_score
-                    }
-                }
-                for score in scores
-            ]
+            'count': len(page),
+            'next_cursor': next_cursor,
+            'scores': [project_score_row(row, fields) for row in page]
         }
 
         return make_cors_response(result)
@@ -105,6 +550,7 @@ def get_all_confidence_scores():
 
 
 @app.route('/api/v1/smart-money-confidence/<wallet_address>', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_wallet_confidence(wallet_address: str):
     """
     Get latest confidence score for a specific wallet.
@@ -121,7 +567,7 @@ def get_wallet_confidence(wallet_address: str):
     try:
         days = request.args.get('days', DEFAULT_DAYS, type=int)
 
-        calculator = SmartMoneyConfidenceCalculator(DB_PATH)
+        calculator = get_reader()
         score = calculator.calculate_confidence(wallet_address, days)
 
         result = {
@@ -150,6 +596,7 @@ def get_wallet_confidence(wallet_address: str):
 
 
 @app.route('/api/v1/smart-money-confidence/elite', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_elite_wallets():
     """
     Get wallets with elite confidence scores.
@@ -165,7 +612,7 @@ def get_elite_wallets():
         threshold = request.args.get('threshold', 90.0, type=float)
         check_decline = request.args.get('check_decline', True, type=bool)
 
-        calculator = SmartMoneyConfidenceCalculator(DB_PATH)
+        calculator = get_reader()
         scores = calculator.get_elite_wallets(threshold=threshold, check_decline=check_decline)
 
         result = {
@@ -192,6 +639,7 @@ def get_elite_wallets():
 
 
 @app.route('/api/v1/smart-money-confidence/<wallet_address>/history', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_wallet_history(wallet_address: str):
     """
     Get confidence score history for a specific wallet.
@@ -208,7 +656,7 @@ def get_wallet_history(wallet_address: str):
     try:
         days = request.args.get('days', 30, type=int)
 
-        calculator = SmartMoneyConfidenceCalculator(DB_PATH)
+        calculator = get_reader()
         scores = calculator.get_wallet_history(wallet_address, days)
 
         result = {
@@ -242,11 +690,81 @@ def get_wallet_history(wallet_address: str):
         )
 
 
+@app.route('/api/v1/smart-money-confidence/<wallet_address>/windows', methods=['GET', 'OPTIONS'])
+@cached_response
+def get_wallet_windows(wallet_address: str):
+    """
+    Get a wallet's confidence scores over several windows side by side.
+
+    Path Parameters:
+    - wallet_address: Wallet address
+
+    Query Parameters:
+    - windows: Comma-separated window lengths in days (default: 7,30,90)
+    - recalculate: If true, score the wallet now instead of reading saved scores
+    """
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    windows_arg = request.args.get('windows')
+    try:
+        windows = parse_windows(windows_arg) if windows_arg else list(DEFAULT_WINDOWS)
+    except ValueError:
+        return make_cors_response({'error': f'Invalid windows: {windows_arg}'}, 400)
+
+    try:
+        recalculate = request.args.get('recalculate', 'false').lower() == 'true'
+
+        calculator = get_reader()
+
+        scores = {} if recalculate else calculator.get_window_confidences(wallet_address)
+        if any(days not in scores for days in windows):
+            # One scan covers every requested window
+            scores = {
+                days: window_scores[0]
+                for days, window_scores in calculator.calculate_window_confidences(
+                    windows, wallet_addresses=[wallet_address]
+                ).items()
+            }
+
+        result = {
+            'wallet_address': wallet_address,
+            'windows': {
+                str(days): {
+                    'overall_score': scores[days].overall_score,
+                    'category': scores[days].category.value,
+                    'trend': scores[days].trend,
+                    'calculated_at': scores[days].calculated_at.isoformat(),
+                    'components': {
+                        'win_rate_score': scores[days].win_rate_score,
+                        'trade_count_score': scores[days].trade_count_score,
+                        'avg_notional_score': scores[days].avg_notional_score,
+                        'consistency_score': scores[days].consistency_score,
+                        'market_timing_score': scores[days].market_timing_score
+                    }
+                }
+                for days in windows
+            }
+        }
+
+        return make_cors_response(result)
+
+    except Exception as e:
+        return make_cors_response(
+            {'error': str(e)},
+            500
+        )
+
+
 @app.route('/api/v1/smart-money-confidence/recalculate', methods=['POST', 'OPTIONS'])
 def recalculate_confidence():
     """
     Recalculate confidence score for a wallet or all wallets.
 
+    A single wallet is scored inline. Without a wallet address every active
+    wallet is queued as a background job and the job is returned (202), as
+    with POST /recalculate/jobs.
+
     Request Body:
     {
         "wallet_address": "0x123...",  // Optional - if omitted, recalculate all
@@ -286,26 +804,159 @@ def recalculate_confidence():
                 'saved': save_to_db
             }
         else:
-            # Recalculate all wallets
-            scores = get_all_wallet_confidences(
-                db_path=DB_PATH,
-                days=days
+            # Recalculating every wallet runs as a background job
+            job = get_recalculation_queue().submit(days=days)
+            return make_job_response(job.to_dict(), 202)
+
+        return make_cors_response(result)
+
+    except Exception as e:
+        return make_cors_response(
+            {'error': str(e)},
+            500
+        )
+
+
+def make_job_response(job: dict, status: int = 200):
+    """Make a job progress response, with a Location header for new jobs."""
+    response = make_cors_response(job, status)
+    if status == 202:
+        response.headers['Location'] = f"/api/v1/smart-money-confidence/recalculate/jobs/{job['job_id']}"
+    return response
+
+
+@app.route('/api/v1/smart-money-confidence/recalculate/jobs', methods=['POST', 'OPTIONS'])
+def submit_recalculation_job():
+    """
+    Queue a bulk recalculation job.
+
+    Wallets already waiting in the queue are not queued twice. Returns the job
+    (202) immediately; poll or stream its progress.
+
+    Request Body:
+    {
+        "wallets": ["0x123...", ...],  // Wallet list, or "all" for every active wallet
+        "days": 30                      // Optional - analysis period
+    }
+    """
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    try:
+        data = request.get_json(silent=True) or {}
+        wallets = data.get('wallets')
+        days = data.get('days', DEFAULT_DAYS)
+
+        if wallets == 'all':
+            wallets = None
+        elif not isinstance(wallets, list) or not all(isinstance(w, str) for w in wallets):
+            return make_cors_response(
+                {'error': 'wallets must be a list of wallet addresses or "all"'},
+                400
             )
+        if not isinstance(days, int) or days <= 0:
+            return make_cors_response({'error': f'Invalid days: {days}'}, 400)
 
-            result = {
-                'count': len(scores),
-                'saved': save_to_db,
-                'wallets': [
-                    {
-                        'wallet_address': score.wallet_address,
-                        'overall_score': score.overall_score,
-                        'category': score.category.value
-                    }
-                    for score in scores
-                ]
-            }
+        job = get_recalculation_queue().submit(wallets, days=days)
+        return make_job_response(job.to_dict(), 202)
 
-        return make_cors_response(result)
+    except Exception as e:
+        return make_cors_response(
+            {'error': str(e)},
+            500
+        )
+
+
+@app.route('/api/v1/smart-money-confidence/recalculate/jobs/<job_id>', methods=['GET', 'OPTIONS'])
+def get_recalculation_job(job_id: str):
+    """Get a recalculation job's progress."""
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    job = get_recalculation_queue().get(job_id)
+    if job is None:
+        return make_cors_response({'error': f'Unknown job: {job_id}'}, 404)
+
+    return make_job_response(job)
+
+
+@app.route('/api/v1/smart-money-confidence/recalculate/jobs/<job_id>/stream', methods=['GET', 'OPTIONS'])
+def stream_recalculation_job(job_id: str):
+    """
+    Stream a recalculation job's progress as Server-Sent Events.
+
+    Sends a `progress` event with the job on every change and closes the
+    stream after the `completed` status.
+    """
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    jobs = get_recalculation_queue()
+    job = jobs.get(job_id)
+    if job is None:
+        return make_cors_response({'error': f'Unknown job: {job_id}'}, 404)
+
+    def events():
+        current = job
+        yield format_job_event(current)
+        while current['status'] != 'completed':
+            update = jobs.wait(job_id, current['version'], ALERT_STREAM_HEARTBEAT)
+            if update is None:
+                return
+            if update['version'] == current['version']:
+                yield ": heartbeat\n\n"
+                continue
+            current = update
+            yield format_job_event(current)
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    add_cors_headers(response)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+_export_lock = threading.Lock()
+
+
+@app.route('/api/v1/smart-money-confidence/export', methods=['POST', 'OPTIONS'])
+def export_snapshot():
+    """
+    Export score history and closed trades as partitioned Parquet/Arrow files.
+
+    Writes rows added since the last export under EXPORT_DIR on the server and
+    returns what was written. Concurrent export requests get 409.
+
+    Request Body:
+    {
+        "format": "parquet",                 // Optional - "parquet" or "arrow"
+        "tables": ["smart_money_confidence"], // Optional - default: all
+        "full": false                         // Optional - discard earlier exports first
+    }
+    """
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    data = request.get_json(silent=True) or {}
+
+    if not _export_lock.acquire(blocking=False):
+        return make_cors_response({'error': 'An export is already running'}, 409)
+
+    try:
+        exporter = SnapshotExporter(DB_PATH, EXPORT_DIR, data.get('format', 'parquet'))
+        results = exporter.export(data.get('tables'), full=bool(data.get('full', False)))
+
+        return make_cors_response({
+            'output_dir': EXPORT_DIR,
+            'format': exporter.fmt,
+            'tables': results
+        })
+
+    except RuntimeError as e:
+        return make_cors_response({'error': str(e)}, 501)
+
+    except ValueError as e:
+        return make_cors_response({'error': str(e)}, 400)
 
     except Exception as e:
         return make_cors_response(
@@ -313,8 +964,12 @@ def recalculate_confidence():
             500
         )
 
+    finally:
+        _export_lock.release()
+
 
 @app.route('/api/v1/smart-money-confidence/categories', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_categories():
     """
     Get available score categories and their descriptions.
@@ -354,6 +1009,7 @@ def get_categories():
 
 
 @app.route('/api/v1/smart-money-confidence/alerts', methods=['GET', 'OPTIONS'])
+@cached_response
 def get_confidence_alerts():
     """
     Get alerts for elite wallets whose confidence has dropped significantly.
@@ -369,41 +1025,11 @@ def get_confidence_alerts():
         threshold = request.args.get('threshold', 90.0, type=float)
         drop_threshold = request.args.get('drop_threshold', 10.0, type=float)
 
-        calculator = SmartMoneyConfidenceCalculator(DB_PATH)
-
-        # Get elite wallets with downward trend
-        elite_wallets = calculator.get_elite_wallets(
+        alerts = get_reader().get_confidence_alerts(
             threshold=threshold,
-            check_decline=False  # Include declining wallets
+            drop_threshold=drop_threshold
         )
 
-        # Get declining wallets
-        declining_wallets = [
-            wallet for wallet in elite_wallets
-            if wallet.trend == 'down'
-        ]
-
-        # Check for significant drops
-        alerts = []
-        for wallet in declining_wallets:
-            # Get history to calculate actual drop
-            history = calculator.get_wallet_history(wallet.wallet_address, days=7)
-
-            if len(history) >= 2:
-                previous_score = history[-2].overall_score
-                current_score = history[-1].overall_score
-                drop = previous_score - current_score
-
-                if drop >= drop_threshold:
-                    alerts.append({
-                        'wallet_address': wallet.wallet_address,
-                        'previous_score': previous_score,
-                        'current_score': current_score,
-                        'drop': round(drop, 2),
-                        'drop_percentage': round((drop / previous_score) * 100, 2),
-                        'alert_level': 'CRITICAL' if drop >= 20 else 'WARNING'
-                    })
-
         result = {
             'alert_count': len(alerts),
             'thresholds': {
@@ -422,6 +1048,48 @@ def get_confidence_alerts():
         )
 
 
+@app.route('/api/v1/smart-money-confidence/alerts/stream', methods=['GET', 'OPTIONS'])
+def stream_confidence_alerts():
+    """
+    Stream confidence-drop alerts as Server-Sent Events.
+
+    Each alert is sent as a `confidence_alert` event with the same fields as
+    the /alerts endpoint, within ALERT_POLL_INTERVAL seconds of the score
+    being saved by any process. A comment line is
+    sent every ALERT_STREAM_HEARTBEAT seconds to keep idle connections open.
+
+    Query Parameters:
+    - threshold: Minimum current score to alert on (default: 90.0)
+    - drop_threshold: Minimum drop to trigger alert (default: 10.0)
+    """
+    if request.method == 'OPTIONS':
+        return make_cors_response()
+
+    threshold = request.args.get('threshold', 90.0, type=float)
+    drop_threshold = request.args.get('drop_threshold', 10.0, type=float)
+
+    subscription = alert_broadcaster.subscribe(threshold, drop_threshold)
+
+    def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event_id, alert = subscription.alerts.get(timeout=ALERT_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_alert_event(event_id, alert)
+        finally:
+            alert_broadcaster.unsubscribe(subscription)
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    add_cors_headers(response)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -0,0 +1,333 @@
+"""
+Smart Money Confidence API - ASGI Serving Mode
+
+Serves the same routes as smart_money_confidence_api from an asyncio event
+loop, so many dashboard clients can be connected at once.
+
+Requests are handed to the Flask app on a bounded thread pool (ASGI_WORKERS
+threads, default 8). GET routes read through the read-only connection pool,
+so at most ASGI_WORKERS SQLite reads run at a time and none of them block the
+event loop. The alert and recalculation job streams are served natively on
+the loop and hold no worker thread while idle.
+
+Usage:
+    uvicorn api.smart_money_confidence_asgi:app --port 5001
+    python api/smart_money_confidence_asgi.py   # same, if uvicorn is installed
+"""
+
+import asyncio
+import os
+import queue
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api import smart_money_confidence_api as flask_api
+from api.smart_money_confidence_api import (
+    ALERT_QUEUE_SIZE,
+    ALERT_STREAM_HEARTBEAT,
+    alert_broadcaster,
+    format_alert_event,
+    format_job_event
+)
+
+# Configuration
+ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', 8))
+ALERT_STREAM_PATH = '/api/v1/smart-money-confidence/alerts/stream'
+JOB_STREAM_PATH = re.compile(r'^/api/v1/smart-money-confidence/recalculate/jobs/([^/]+)/stream$')
+JOB_POLL_INTERVAL = 0.25
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_WORKERS, thread_name_prefix='confidence-api')
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class LoopAlertQueue:
+    """
+    Thread-safe bridge from the alert broadcaster to an asyncio.Queue.
+
+    The broadcaster calls put_nowait from its poller thread; items are
+    handed to the event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = ALERT_QUEUE_SIZE):
+        """
+        Initialize the queue.
+
+        Args:
+            loop: Event loop the consumer runs on
+            maxsize: Alerts buffered before new ones are dropped
+        """
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def put_nowait(self, item) -> None:
+        """Queue an item from any thread (raises queue.Full when full)."""
+        if self.queue.full():
+            raise queue.Full
+        self.loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass
+
+
+def _wsgi_environ(scope: Dict, body: bytes) -> Dict:
+    """Build a WSGI environ for an ASGI HTTP request."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif key == 'CONTENT_LENGTH':
+            continue  # Set from the body actually read
+        else:
+            key = f"HTTP_{key}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+def _run_flask(environ: Dict) -> Tuple[int, Headers, bytes]:
+    """Run one request through the Flask app (on a worker thread)."""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ]
+
+    result = flask_api.app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+    return started['status'], started['headers'], body
+
+
+async def _read_body(receive) -> bytes:
+    """Read the full request body."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+def _float_arg(args: Dict[str, List[str]], name: str, default: float) -> float:
+    try:
+        return float(args[name][0])
+    except (KeyError, ValueError):
+        return default
+
+
+async def stream_alerts(scope: Dict, receive, send) -> None:
+    """
+    Serve the alert stream as Server-Sent Events on the event loop.
+
+    Same events and query parameters as the Flask route.
+    """
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    threshold = _float_arg(args, 'threshold', 90.0)
+    drop_threshold = _float_arg(args, 'drop_threshold', 10.0)
+
+    loop = asyncio.get_running_loop()
+    alerts = LoopAlertQueue(loop)
+    # Subscribing may warm the previous-score cache, so keep it off the loop
+    subscription = await loop.run_in_executor(
+        _executor, alert_broadcaster.subscribe, threshold, drop_threshold, alerts
+    )
+
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                (b'access-control-allow-origin', b'*'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+        while not disconnected.done():
+            next_alert = asyncio.ensure_future(alerts.queue.get())
+            done, _ = await asyncio.wait(
+                {next_alert, disconnected},
+                timeout=ALERT_STREAM_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if next_alert in done:
+                event_id, alert = next_alert.result()
+                message = format_alert_event(event_id, alert)
+            else:
+                next_alert.cancel()
+                if disconnected in done:
+                    break
+                message = ": heartbeat\n\n"
+
+            await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+
+    finally:
+        disconnected.cancel()
+        alert_broadcaster.unsubscribe(subscription)
+
+
+async def stream_job(scope: Dict, receive, send, job_id: str) -> None:
+    """
+    Serve a recalculation job's progress as Server-Sent Events on the loop.
+
+    Job state lives in memory, so it is polled every JOB_POLL_INTERVAL
+    seconds without touching SQLite. Same events as the Flask route.
+    """
+    loop = asyncio.get_running_loop()
+    jobs = await loop.run_in_executor(_executor, flask_api.get_recalculation_queue)
+    job = jobs.get(job_id)
+
+    if job is None:
+        status, headers, body = await loop.run_in_executor(
+            _executor, _run_flask, _wsgi_environ(scope, b'')
+        )
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': format_job_event(job).encode(), 'more_body': True})
+
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        idle = 0.0
+        while job['status'] != 'completed' and not disconnected.done():
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            update = jobs.get(job_id)
+            if update is None:
+                break
+            if update['version'] != job['version']:
+                job = update
+                idle = 0.0
+                message = format_job_event(job)
+            else:
+                idle += JOB_POLL_INTERVAL
+                if idle < ALERT_STREAM_HEARTBEAT:
+                    continue
+                idle = 0.0
+                message = ": heartbeat\n\n"
+            await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope: Dict, receive, send) -> None:
+    """ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    if scope['path'] == ALERT_STREAM_PATH and scope['method'] == 'GET':
+        await stream_alerts(scope, receive, send)
+        return
+
+    job_stream = JOB_STREAM_PATH.match(scope['path'])
+    if job_stream and scope['method'] == 'GET':
+        await stream_job(scope, receive, send, job_stream.group(1))
+        return
+
+    body = await _read_body(receive)
+    loop = asyncio.get_running_loop()
+    status, headers, payload = await loop.run_in_executor(
+        _executor, _run_flask, _wsgi_environ(scope, body)
+    )
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def main() -> None:
+    """Run the ASGI app with uvicorn."""
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is not installed. Install it with: pip install uvicorn")
+        sys.exit(1)
+
+    port = int(os.environ.get('PORT', 5001))
+    print(f"Starting Smart Money Confidence API (ASGI) on port {port}")
+    print(f"Database: {flask_api.DB_PATH}")
+    print(f"Workers: {ASGI_WORKERS}")
+    uvicorn.run(app, host='0.0.0.0', port=port, log_level='warning', backlog=4096)
+
+
+if __name__ == '__main__':
+    main()
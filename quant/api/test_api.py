@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Test script for the Smart Money Confidence API - without external services
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import smart_money_confidence_api as api
+from signals.smart_money_confidence import ConfidenceScore, ScoreCategory
+
+QUANT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Saves one score from a separate process, as a cron run or worker would
+SAVE_SCORE = """
+import sys
+from datetime import datetime
+from signals.smart_money_confidence import (
+    ConfidenceScore, ScoreCategory, SmartMoneyConfidenceCalculator
+)
+db_path, wallet_address, overall_score = sys.argv[1], sys.argv[2], float(sys.argv[3])
+SmartMoneyConfidenceCalculator(db_path).save_confidence_score(ConfidenceScore(
+    wallet_address=wallet_address,
+    overall_score=overall_score,
+    win_rate_score=overall_score,
+    trade_count_score=overall_score,
+    avg_notional_score=overall_score,
+    consistency_score=overall_score,
+    market_timing_score=overall_score,
+    category=ScoreCategory.STRONG,
+    calculated_at=datetime.now()
+))
+"""
+
+
+def save_score_in_other_process(db_path: str, wallet_address: str, overall_score: float):
+    subprocess.run(
+        [sys.executable, '-c', SAVE_SCORE, db_path, wallet_address, str(overall_score)],
+        cwd=QUANT_DIR, check=True
+    )
+
+
+def make_score(wallet_address: str, overall_score: float) -> ConfidenceScore:
+    """A score whose components are derived from the overall score"""
+    return ConfidenceScore(
+        wallet_address=wallet_address,
+        overall_score=overall_score,
+        win_rate_score=overall_score,
+        trade_count_score=overall_score / 2,
+        avg_notional_score=overall_score / 3,
+        consistency_score=overall_score / 4,
+        market_timing_score=overall_score / 5,
+        category=ScoreCategory.ELITE if overall_score >= 90 else ScoreCategory.MODERATE,
+        calculated_at=datetime.now()
+    )
+
+
+def test_score_listing_pages():
+    """Test cursor paging, field projection and limit checks of the score listing"""
+    print("Testing the paged score listing...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api.DB_PATH = os.path.join(tmp, 'trading.db')
+        api._calculator = api._reader = None
+        api.response_cache.clear()
+
+        # Ties on score are ordered by wallet address
+        scores = {'0xa': 95.0, '0xb': 95.0, '0xc': 91.0, '0xd': 70.0,
+                  '0xe': 70.0, '0xf': 70.0, '0xg': 65.0}
+        api.get_calculator().save_confidence_scores(
+            [make_score(wallet, score) for wallet, score in scores.items()]
+        )
+        expected = sorted(scores, key=lambda wallet: (scores[wallet], wallet), reverse=True)
+        client = api.app.test_client()
+        url = '/api/v1/smart-money-confidence'
+
+        def page_through(query):
+            items, cursor, pages = [], None, 0
+            while True:
+                response = client.get(url, query_string=dict(query, **({'cursor': cursor} if cursor else {})))
+                assert response.status_code == 200, response.get_json()
+                body = response.get_json()
+                assert body['count'] == len(body['scores']) <= query['limit']
+                items.extend(body['scores'])
+                pages += 1
+                cursor = body['next_cursor']
+                if cursor is None:
+                    return items, pages
+
+        items, pages = page_through({'limit': 3})
+        wallets = [item['wallet_address'] for item in items]
+        print(f"  {pages} pages: {wallets}")
+        assert wallets == expected and pages == 3
+
+        items, _ = page_through({'limit': 1, 'category': 'elite'})
+        assert [item['wallet_address'] for item in items] == ['0xb', '0xa', '0xc']
+
+        # Projection keeps only the requested fields
+        body = client.get(url, query_string={'fields': 'wallet_address,components', 'limit': 1}).get_json()
+        item = body['scores'][0]
+        assert set(item) == {'wallet_address', 'components'}, item
+        assert item['components'] == {
+            'win_rate_score': 95.0, 'trade_count_score': 47.5,
+            'avg_notional_score': 95.0 / 3, 'consistency_score': 23.75,
+            'market_timing_score': 19.0
+        }, item
+        item = client.get(url, query_string={'fields': 'overall_score,consistency_score'}).get_json()['scores'][-1]
+        assert item == {'overall_score': 65.0, 'components': {'consistency_score': 16.25}}, item
+        # Paging still works when the cursor columns are not projected
+        items, pages = page_through({'limit': 4, 'fields': 'trend'})
+        assert items == [{'trend': 'neutral'}] * len(scores) and pages == 2, items
+
+        assert client.get(url, query_string={'fields': 'password'}).status_code == 400
+        assert client.get(url, query_string={'cursor': 'not-a-cursor'}).status_code == 400
+        for limit in ('0', '-5', 'ten'):
+            assert client.get(url, query_string={'limit': limit}).status_code == 400, limit
+
+        # Oversized pages are capped
+        max_page_size = api.MAX_PAGE_SIZE
+        api.MAX_PAGE_SIZE = 2
+        try:
+            body = client.get(url, query_string={'limit': 1000000}).get_json()
+            assert body['count'] == 2 and body['next_cursor'] is not None
+        finally:
+            api.MAX_PAGE_SIZE = max_page_size
+
+    print("✓ Score listing test passed")
+    return True
+
+
+def test_response_cache():
+    """Test conditional GETs, invalidation on save and TTL expiry of cached responses"""
+    print("Testing the response cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api.DB_PATH = os.path.join(tmp, 'trading.db')
+        api._calculator = api._reader = None
+        api.response_cache.clear()
+
+        calculator = api.get_calculator()
+        calculator.save_confidence_score(make_score('0xa', 80.0))
+        client = api.app.test_client()
+        url = '/api/v1/smart-money-confidence'
+
+        def latest_score(response):
+            return response.get_json()['scores'][0]['overall_score']
+
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert response.status_code == 200 and latest_score(response) == 80.0
+        assert 'Last-Modified' not in response.headers
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        print(f"  Revalidated {etag}: {response.status_code}")
+        assert response.status_code == 304 and response.data == b''
+
+        # Saving clears the cache
+        calculator.save_confidence_score(make_score('0xa', 60.0))
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200 and latest_score(response) == 60.0
+        assert response.headers['ETag'] != etag
+        etag = response.headers['ETag']
+
+        # Saves by other processes are not seen until the entry expires or is cleared
+        save_score_in_other_process(api.DB_PATH, '0xa', 40.0)
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        api.response_cache.clear()
+        assert latest_score(client.get(url)) == 40.0
+
+    cache = api.ResponseCache(ttl=0.05, max_entries=2)
+    cache.put(('a',), b'1', cache.generation)
+    assert cache.get(('a',)).body == b'1'
+    time.sleep(0.1)
+    assert cache.get(('a',)) is None
+
+    # A body rendered before a clear is not stored
+    generation = cache.generation
+    cache.clear()
+    cache.put(('b',), b'2', generation)
+    assert cache.get(('b',)) is None
+
+    # The least recently used entry is evicted
+    cache.ttl = 60
+    for key in ('a', 'b', 'c'):
+        cache.put((key,), key.encode(), cache.generation)
+    assert cache.get(('a',)) is None and cache.get(('c',)).body == b'c'
+
+    print("✓ Response cache test passed")
+    return True
+
+
+def test_alerts_from_other_process():
+    """Test that a drop saved by another process reaches alert subscribers"""
+    print("Testing alerts for scores saved by another process...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api.DB_PATH = os.path.join(tmp, 'trading.db')
+        api._calculator = api._reader = None
+
+        save_score_in_other_process(api.DB_PATH, '0xdrop', 95.0)
+        save_score_in_other_process(api.DB_PATH, '0xsteady', 85.0)
+
+        # Poll explicitly; the poller thread would only wake after an hour
+        broadcaster = api.AlertBroadcaster(poll_interval=3600)
+        subscription = broadcaster.subscribe(threshold=70.0, drop_threshold=10.0)
+        try:
+            # Scores saved before the client connected are not alerted on
+            assert broadcaster.poll() == 0
+
+            save_score_in_other_process(api.DB_PATH, '0xdrop', 80.0)
+            save_score_in_other_process(api.DB_PATH, '0xsteady', 84.0)
+
+            sent = broadcaster.poll()
+            print(f"  Alerts sent: {sent}")
+            assert sent == 1, sent
+
+            event_id, alert = subscription.alerts.get_nowait()
+            print(f"  Alert {event_id}: {alert}")
+            assert alert['wallet_address'] == '0xdrop'
+            assert alert['previous_score'] == 95.0 and alert['current_score'] == 80.0
+            assert subscription.alerts.empty()
+
+            # Rows already read are not alerted on twice
+            assert broadcaster.poll() == 0
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    print("✓ Cross-process alert test passed")
+    return True
+
+
+def test_alerts_after_reconnect():
+    """Test that drops saved while no client was connected are not alerted on"""
+    print("Testing alerts after every client disconnected...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api.DB_PATH = os.path.join(tmp, 'trading.db')
+        api._calculator = api._reader = None
+
+        save_score_in_other_process(api.DB_PATH, '0xdrop', 95.0)
+
+        broadcaster = api.AlertBroadcaster(poll_interval=3600)
+        subscription = broadcaster.subscribe(threshold=70.0, drop_threshold=10.0)
+        broadcaster.unsubscribe(subscription)
+
+        # Saved while nobody is connected (the poller has exited)
+        save_score_in_other_process(api.DB_PATH, '0xdrop', 80.0)
+
+        subscription = broadcaster.subscribe(threshold=70.0, drop_threshold=10.0)
+        try:
+            sent = broadcaster.poll()
+            print(f"  Alerts sent after reconnecting: {sent}")
+            assert sent == 0, sent
+            assert subscription.alerts.empty()
+
+            # Later drops are compared with the score seen on reconnect
+            save_score_in_other_process(api.DB_PATH, '0xdrop', 70.0)
+            assert broadcaster.poll() == 1
+            _, alert = subscription.alerts.get_nowait()
+            assert alert['previous_score'] == 80.0 and alert['current_score'] == 70.0
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    print("✓ Reconnect alert test passed")
+    return True
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SMART MONEY CONFIDENCE API - TEST SUITE")
+    print("=" * 60)
+    print()
+
+    # Test 1: Alerts for scores saved by another process
+    if not test_alerts_from_other_process():
+        exit(1)
+
+    print()
+
+    # Test 2: No alerts for drops saved while disconnected
+    if not test_alerts_after_reconnect():
+        exit(1)
+
+    print()
+
+    # Test 3: Score listing pages, projections and limits
+    if not test_score_listing_pages():
+        exit(1)
+
+    print()
+
+    # Test 4: Response cache validation, invalidation and expiry
+    if not test_response_cache():
+        exit(1)
+
+    print()
+    print("=" * 60)
+    print("ALL TESTS PASSED ✓")
+    print("=" * 60)
@@ -7,9 +7,13 @@ This script provides a command-line interface for managing Smart Money Confidenc
 Usage:
     python quant/signals/main.py init                # Initialize database
     python quant/signals/main.py init-sample         # Initialize with sample data
+    python quant/signals/main.py migrate             # Add scoring indexes to existing database
     python quant/signals/main.py calculate <wallet>   # Calculate confidence for wallet
     python quant/signals/main.py calculate-all       # Calculate for all wallets
+    python quant/signals/main.py load-candles        # Load OHLCV candles from CSV
     python quant/signals/main.py report              # Generate daily report
+    python quant/signals/main.py report --start 2026-09-01 --end 2026-09-30  # Backfill reports
+    python quant/signals/main.py export              # Export Parquet/Arrow snapshots
     python quant/signals/main.py serve               # Start API server
     python quant/signals/main.py elite               # Show elite wallets
     python quant/signals/main.py alerts              # Show confidence alerts
@@ -17,8 +21,10 @@ Usage:
 
 import sys
 import os
+import time
 import argparse
-from datetime import datetime
+from datetime import date, datetime
+from typing import List, Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -27,14 +33,28 @@ from signals.smart_money_confidence import (
     SmartMoneyConfidenceCalculator,
     recalculate_wallet_confidence,
     get_all_wallet_confidences,
+    get_all_wallet_window_confidences,
+    parse_windows,
     ScoreCategory
 )
+from signals.candle_store import CandleStore
 from reports.smart_money_confidence_report import generate_daily_report
+from reports.report_backfill import backfill_reports
 
 
 # Configuration
 DB_PATH = os.environ.get('TRADING_DB_PATH', 'quant/data/trading.db')
 DEFAULT_DAYS = 30
+CANDLE_DIR = os.environ.get('CANDLE_DIR', 'quant/data/candles')
+CANDLE_INTERVAL = os.environ.get('CANDLE_INTERVAL', '1m')
+EXPORT_DIR = os.environ.get('EXPORT_DIR', 'quant/data/export')
+
+
+def get_candle_store():
+    """Get the local candle store, or None if no candles have been loaded."""
+    if not os.path.isdir(CANDLE_DIR):
+        return None
+    return CandleStore(CANDLE_DIR, CANDLE_INTERVAL)
 
 
 def init_database(sample_data: bool = False) -> bool:
@@ -60,11 +80,24 @@ def init_database(sample_data: bool = False) -> bool:
         return False
 
 
+def migrate_database() -> bool:
+    """Add scoring indexes to an existing database and verify query plans."""
+    print("Migrating database...")
+
+    from signals.init_db import migrate_database as migrate_db, verify_database
+
+    if not migrate_db(DB_PATH):
+        print("Failed to migrate database.")
+        return False
+
+    return verify_database(DB_PATH)
+
+
 def calculate_wallet(wallet_address: str, days: int = DEFAULT_DAYS) -> None:
     """Calculate and display confidence score for a wallet."""
     print(f"Calculating confidence for {wallet_address}...")
 
-    calculator = SmartMoneyConfidenceCalculator(DB_PATH)
+    calculator = SmartMoneyConfidenceCalculator(DB_PATH, candle_store=get_candle_store())
     score = calculator.calculate_confidence(wallet_address, days)
 
     # Display results
@@ -92,13 +125,17 @@ def calculate_wallet(wallet_address: str, days: int = DEFAULT_DAYS) -> None:
         print("\n✗ Failed to save score to database.")
 
 
-def calculate_all(days: int = DEFAULT_DAYS) -> None:
+def calculate_all(days: int = DEFAULT_DAYS, workers: int = 1) -> None:
     """Calculate confidence scores for all active wallets."""
-    print(f"Calculating confidence for all wallets (last {days} days)...")
+    print(f"Calculating confidence for all wallets (last {days} days, {workers} workers)...")
 
-    scores = get_all_wallet_confidences(db_path=DB_PATH, days=days)
+    started = time.perf_counter()
+    scores = get_all_wallet_confidences(db_path=DB_PATH, days=days, workers=workers,
+                                        candle_store=get_candle_store())
+    elapsed = time.perf_counter() - started
 
     print(f"\n✓ Calculated scores for {len(scores)} wallets.")
+    print(f"  Elapsed: {elapsed:.2f}s ({len(scores) / elapsed if elapsed else 0:.1f} wallets/sec)")
 
     # Display summary
     category_counts = {}
@@ -120,6 +157,83 @@ def calculate_all(days: int = DEFAULT_DAYS) -> None:
         print(f"{i:<6} {score.wallet_address[:25]:<25} {score.overall_score:<10.2f} {score.category.value:<10}")
 
 
+def calculate_windows(windows: List[int], workers: int = 1) -> None:
+    """Calculate confidence scores over several windows in one pass."""
+    print(f"Calculating confidence for all wallets "
+          f"({'/'.join(map(str, windows))}-day windows, {workers} workers)...")
+
+    started = time.perf_counter()
+    scores_by_window = get_all_wallet_window_confidences(
+        db_path=DB_PATH, windows=windows, candle_store=get_candle_store(), workers=workers
+    )
+    elapsed = time.perf_counter() - started
+
+    windows = sorted(scores_by_window)
+    wallet_count = len(scores_by_window[windows[0]]) if windows else 0
+    print(f"\n✓ Calculated {len(windows)} windows for {wallet_count} wallets.")
+    print(f"  Elapsed: {elapsed:.2f}s")
+
+    # Category counts side by side
+    print("\nSummary:")
+    print(f"  {'Category':<10} " + " ".join(f"{str(days) + 'd':>8}" for days in windows))
+    for category in ['ELITE', 'STRONG', 'MODERATE', 'WEAK', 'POOR']:
+        counts = [
+            sum(1 for score in scores_by_window[days] if score.category.value == category)
+            for days in windows
+        ]
+        print(f"  {category:<10} " + " ".join(f"{count:>8}" for count in counts))
+
+    # Top 10 by the longest window, with every window's score
+    if not windows:
+        return
+    by_wallet = {
+        days: {score.wallet_address: score for score in scores_by_window[days]}
+        for days in windows
+    }
+    longest = sorted(scores_by_window[windows[-1]], key=lambda x: x.overall_score, reverse=True)
+
+    print(f"\nTop 10 Wallets ({windows[-1]}-day):")
+    print(f"{'Rank':<6} {'Wallet':<25} " + " ".join(f"{str(days) + 'd':>8}" for days in windows))
+    print("-" * (32 + 9 * len(windows)))
+    for i, score in enumerate(longest[:10], 1):
+        print(f"{i:<6} {score.wallet_address[:25]:<25} " + " ".join(
+            f"{by_wallet[days][score.wallet_address].overall_score:>8.2f}" for days in windows
+        ))
+
+
+def load_candles(symbol: str, csv_path: str, interval: str = CANDLE_INTERVAL) -> None:
+    """Load OHLCV candles from a CSV file into the local candle store."""
+    print(f"Loading {interval} candles for {symbol} from {csv_path}...")
+
+    store = CandleStore(CANDLE_DIR, interval)
+    count = store.load_csv(symbol, csv_path)
+
+    print(f"\n✓ {store.path(symbol, interval)} now holds {count} candles.")
+
+
+def export_snapshot(fmt: str = 'parquet', export_dir: str = EXPORT_DIR,
+                    tables: Optional[List[str]] = None, full: bool = False) -> bool:
+    """Export score history and closed trades as partitioned Parquet/Arrow files."""
+    from signals.snapshot_export import SnapshotExporter
+
+    mode = "Full" if full else "Incremental"
+    print(f"{mode} {fmt} export to {export_dir}...")
+
+    try:
+        exporter = SnapshotExporter(DB_PATH, export_dir, fmt)
+        results = exporter.export(tables, full=full)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return False
+
+    print(f"\n{'Table':<25} {'Rows':<10} {'Files':<8} {'Watermark'}")
+    print("-" * 60)
+    for table, result in results.items():
+        print(f"{table:<25} {result['rows']:<10} {len(result['files']):<8} {result['watermark']}")
+
+    return True
+
+
 def generate_report(output_dir: str = 'quant/reports') -> str:
     """Generate daily confidence report."""
     print("Generating confidence report...")
@@ -130,6 +244,19 @@ def generate_report(output_dir: str = 'quant/reports') -> str:
     return report_path
 
 
+def backfill_report(start: date, end: date, output_dir: str = 'quant/reports',
+                    force: bool = False) -> List[str]:
+    """Regenerate daily reports for a date range from score history."""
+    print(f"Backfilling confidence reports {start.isoformat()} to {end.isoformat()}...")
+
+    start_time = time.time()
+    report_paths = backfill_reports(start, end, output_dir=output_dir, db_path=DB_PATH, force=force)
+    elapsed = time.time() - start_time
+
+    print(f"\n✓ Generated {len(report_paths)} reports in {elapsed:.1f}s")
+    return report_paths
+
+
 def show_elite(threshold: float = 90.0) -> None:
     """Show elite wallets."""
     calculator = SmartMoneyConfidenceCalculator(DB_PATH)
@@ -147,37 +274,16 @@ def show_alerts(threshold: float = 90.0, drop_threshold: float = 10.0) -> None:
     """Show confidence alerts for declining elite wallets."""
     calculator = SmartMoneyConfidenceCalculator(DB_PATH)
 
-    # Get elite wallets
-    elite_wallets = calculator.get_elite_wallets(threshold=threshold, check_decline=False)
-
-    # Get declining wallets
-    declining_wallets = [
-        wallet for wallet in elite_wallets
-        if wallet.trend == 'down'
-    ]
-
-    alerts = []
-    for wallet in declining_wallets:
-        history = calculator.get_wallet_history(wallet.wallet_address, days=7)
-
-        if len(history) >= 2:
-            previous_score = history[-2].overall_score
-            current_score = wallet.overall_score
-            drop = previous_score - current_score
-
-            if drop >= drop_threshold:
-                alerts.append({
-                    'wallet': wallet,
-                    'previous': previous_score,
-                    'current': current_score,
-                    'drop': drop
-                })
+    alerts = calculator.get_confidence_alerts(
+        threshold=threshold,
+        drop_threshold=drop_threshold
+    )
 
     if not alerts:
         print("\n✓ No alerts at this time. All elite wallets are stable or improving.")
     else:
-        critical = [a for a in alerts if a['drop'] >= 20]
-        warnings = [a for a in alerts if a['drop'] < 20]
+        critical = [a for a in alerts if a['alert_level'] == 'CRITICAL']
+        warnings = [a for a in alerts if a['alert_level'] == 'WARNING']
 
         print(f"\n🚨 Confidence Alerts: {len(alerts)}")
 
@@ -186,14 +292,14 @@ def show_alerts(threshold: float = 90.0, drop_threshold: float = 10.0) -> None:
             print(f"{'Wallet':<25} {'Previous':<10} {'Current':<10} {'Drop':<10}")
             print("-" * 55)
             for alert in critical:
-                print(f"{alert['wallet'].wallet_address[:25]:<25} {alert['previous']:<10.2f} {alert['current']:<10.2f} -{alert['drop']:<9.2f}")
+                print(f"{alert['wallet_address'][:25]:<25} {alert['previous_score']:<10.2f} {alert['current_score']:<10.2f} -{alert['drop']:<9.2f}")
 
         if warnings:
             print(f"\nWARNING ({len(warnings)}):")
             print(f"{'Wallet':<25} {'Previous':<10} {'Current':<10} {'Drop':<10}")
             print("-" * 55)
             for alert in warnings[:5]:  # Limit warnings display
-                print(f"{alert['wallet'].wallet_address[:25]:<25} {alert['previous']:<10.2f} {alert['current']:<10.2f} -{alert['drop']:<9.2f}")
+                print(f"{alert['wallet_address'][:25]:<25} {alert['previous_score']:<10.2f} {alert['current_score']:<10.2f} -{alert['drop']:<9.2f}")
 
 
 def show_wallet_history(wallet_address: str, days: int = 30) -> None:
@@ -280,10 +386,17 @@ def main():
 Examples:
   %(prog)s init                          # Initialize database
   %(prog)s init-sample                   # Initialize with sample data
+  %(prog)s migrate                       # Add scoring indexes to existing database
   %(prog)s calculate 0x123...           # Calculate confidence for wallet
   %(prog)s calculate-all                # Calculate for all wallets
   %(prog)s calculate-all --days 60      # Calculate with 60-day window
+  %(prog)s calculate-all --workers 8    # Shard wallets across 8 processes
+  %(prog)s calculate-all --windows 7,30,90  # Score 7/30/90-day windows in one pass
+  %(prog)s load-candles --symbol BTC --csv btc_1m.csv  # Load OHLCV candles
   %(prog)s report                        # Generate daily report
+  %(prog)s report --start 2026-09-01 --end 2026-09-30  # Backfill daily reports
+  %(prog)s export                        # Export new rows as Parquet
+  %(prog)s export --format arrow --full  # Re-export everything as Arrow IPC
   %(prog)s elite                        # Show elite wallets
   %(prog)s elite --threshold 95         # Show elite wallets with 95+ score
   %(prog)s alerts                       # Show confidence alerts
@@ -294,9 +407,10 @@ Examples:
     )
 
     parser.add_argument('command', choices=[
-        'init', 'init-sample',
+        'init', 'init-sample', 'migrate',
         'calculate', 'calculate-all',
-        'report',
+        'load-candles',
+        'report', 'export',
         'elite', 'alerts',
         'history', 'summary',
         'serve'
@@ -306,8 +420,20 @@ Examples:
     parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Analysis period in days')
     parser.add_argument('--threshold', type=float, default=90.0, help='Score threshold for elite/alerts')
     parser.add_argument('--drop-threshold', type=float, default=10.0, help='Drop threshold for alerts')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for calculate-all')
+    parser.add_argument('--windows', help='Comma-separated window lengths in days for calculate-all (e.g. 7,30,90)')
+    parser.add_argument('--symbol', help='Symbol (for load-candles)')
+    parser.add_argument('--csv', help='OHLCV CSV file (for load-candles)')
+    parser.add_argument('--interval', default=CANDLE_INTERVAL, help='Candle interval (for load-candles)')
     parser.add_argument('--port', type=int, default=5001, help='API server port')
     parser.add_argument('--output-dir', default='quant/reports', help='Report output directory')
+    parser.add_argument('--start', help='First day to backfill reports for (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last day to backfill reports for (YYYY-MM-DD, default: today)')
+    parser.add_argument('--force', action='store_true', help='Regenerate already backfilled reports')
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet', help='Export file format')
+    parser.add_argument('--export-dir', default=EXPORT_DIR, help='Export dataset directory')
+    parser.add_argument('--tables', help='Comma-separated tables to export (default: all)')
+    parser.add_argument('--full', action='store_true', help='Discard earlier exports and export everything')
 
     args = parser.parse_args()
 
@@ -318,6 +444,10 @@ Examples:
     elif args.command == 'init-sample':
         init_database(sample_data=True)
 
+    elif args.command == 'migrate':
+        if not migrate_database():
+            sys.exit(1)
+
     elif args.command == 'calculate':
         if not args.wallet:
             print("Error: wallet address required for calculate command")
@@ -325,10 +455,37 @@ Examples:
         calculate_wallet(args.wallet, args.days)
 
     elif args.command == 'calculate-all':
-        calculate_all(args.days)
+        if args.windows:
+            try:
+                windows = parse_windows(args.windows)
+            except ValueError:
+                parser.error(f"invalid --windows {args.windows!r}: expected positive day counts, e.g. 7,30,90")
+            calculate_windows(windows, args.workers)
+        else:
+            calculate_all(args.days, args.workers)
+
+    elif args.command == 'load-candles':
+        if not args.symbol or not args.csv:
+            print("Error: --symbol and --csv required for load-candles command")
+            sys.exit(1)
+        load_candles(args.symbol, args.csv, args.interval)
 
     elif args.command == 'report':
-        generate_report(args.output_dir)
+        if args.start:
+            try:
+                start = date.fromisoformat(args.start)
+                end = date.fromisoformat(args.end) if args.end else datetime.utcnow().date()
+            except ValueError as e:
+                print(f"Error: invalid date: {e}")
+                sys.exit(1)
+            backfill_report(start, end, args.output_dir, args.force)
+        else:
+            generate_report(args.output_dir)
+
+    elif args.command == 'export':
+        tables = args.tables.split(',') if args.tables else None
+        if not export_snapshot(args.format, args.export_dir, tables, args.full):
+            sys.exit(1)
 
     elif args.command == 'elite':
         show_elite(args.threshold)
@@ -18,6 +18,13 @@ class CrossChainCorrelation:
         self.eth_monitor = EthereumWhaleMonitor()
         self.sol_monitor = SolanaWhaleMonitor()
 
+    def close(self):
+        """Stop the monitors and close their databases and this one"""
+        for monitor in (self.eth_monitor, self.sol_monitor):
+            monitor.close()
+            monitor.db.close()
+        self.db.close()
+
     def correlate_by_address_patterns(self, hours: int = 24) -> List[Dict[str, Any]]:
         """
         Find potential cross-chain wallet mappings using address patterns.
@@ -283,12 +290,10 @@ class CrossChainCorrelation:
 
         # Collect fresh data
         print("Collecting fresh ETH data...")
-        eth_monitor = EthereumWhaleMonitor()
-        eth_monitor.monitor_whales(lookback_hours=hours)
+        self.eth_monitor.monitor_whales(lookback_hours=hours)
 
         print("\nCollecting fresh SOL data...")
-        sol_monitor = SolanaWhaleMonitor()
-        sol_monitor.monitor_whales(limit=300)
+        self.sol_monitor.monitor_whales(limit=300)
 
         # Analyze correlations
         print("\nRunning correlation analysis...")
@@ -396,4 +401,4 @@ if __name__ == '__main__':
     for event in results['events'][:5]:
         print(f"  Score: {event['correlation_score']:.2f} | {event['description'][:80]}...")
 
-    analyzer.db.close()
+    analyzer.close()
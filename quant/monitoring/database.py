@@ -4,14 +4,277 @@ Database utilities for cross-chain whale monitoring
 
 import sqlite3
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import json
 
 # Database path
 DB_PATH = Path(__file__).parent.parent.parent / "smart_money.db"
 
+# Write batching defaults: flush after this many buffered rows or seconds
+BATCH_MAX_ROWS = 500
+BATCH_MAX_SECONDS = 2.0
+
+# Most bound parameters per IN (...) lookup
+SQL_PARAM_CHUNK = 500
+
+UPSERT_WHALE_WALLET_SQL = """
+    INSERT INTO whale_wallets (address, chain, first_seen, last_seen, total_tx_value, tx_count)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(address, chain) DO UPDATE SET
+        last_seen = excluded.last_seen,
+        total_tx_value = total_tx_value + excluded.total_tx_value,
+        tx_count = tx_count + excluded.tx_count,
+        updated_at = excluded.updated_at
+"""
+
+INSERT_ETH_TX_SQL = """
+    INSERT {conflict}INTO eth_whale_txs (
+        tx_hash, from_address, to_address, value_eth, value_usd,
+        gas_used, gas_price, tx_type, protocol, block_number, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_SOL_TX_SQL = """
+    INSERT {conflict}INTO sol_whale_txs (
+        tx_sig, from_address, to_address, amount_sol, amount_usd,
+        fee_lamports, tx_type, protocol, slot, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_WHALE_ALERT_SQL = """
+    INSERT INTO whale_alerts (
+        alert_type, chain, address, amount, currency,
+        description, correlation_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# High-water marks only move forward
+UPSERT_SCAN_CHECKPOINT_SQL = """
+    INSERT INTO scan_checkpoints (chain, last_block, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(chain) DO UPDATE SET
+        last_block = MAX(last_block, excluded.last_block),
+        updated_at = excluded.updated_at
+"""
+
+
+def _eth_tx_row(tx_data: Dict[str, Any]) -> tuple:
+    return (
+        tx_data.get('tx_hash'),
+        tx_data.get('from_address', '').lower(),
+        tx_data.get('to_address', '').lower(),
+        tx_data.get('value_eth', 0),
+        tx_data.get('value_usd', 0),
+        tx_data.get('gas_used'),
+        tx_data.get('gas_price'),
+        tx_data.get('tx_type', 'transfer'),
+        tx_data.get('protocol'),
+        tx_data.get('block_number'),
+        tx_data.get('timestamp', int(datetime.now().timestamp()))
+    )
+
+
+def _sol_tx_row(tx_data: Dict[str, Any]) -> tuple:
+    return (
+        tx_data.get('tx_sig'),
+        tx_data.get('from_address', '').lower(),
+        tx_data.get('to_address', '').lower(),
+        tx_data.get('amount_sol', 0),
+        tx_data.get('amount_usd', 0),
+        tx_data.get('fee_lamports'),
+        tx_data.get('tx_type', 'transfer'),
+        tx_data.get('protocol'),
+        tx_data.get('slot'),
+        tx_data.get('timestamp', int(datetime.now().timestamp()))
+    )
+
+
+def _whale_alert_row(alert_data: Dict[str, Any]) -> tuple:
+    return (
+        alert_data.get('alert_type'),
+        alert_data.get('chain'),
+        alert_data.get('address', '').lower(),
+        alert_data.get('amount'),
+        alert_data.get('currency'),
+        alert_data.get('description'),
+        alert_data.get('correlation_id')
+    )
+
+
+class WriteBatch:
+    """
+    Unit of work for whale monitor writes.
+
+    Rows are buffered in memory and written with executemany in a single
+    transaction when flush() is called, when max_rows rows are pending, or
+    when the oldest pending row is max_seconds old (checked as rows are
+    added). Scan loops call flush() at block boundaries, so a block is
+    committed once instead of once per row.
+
+    A whale transaction is added together with its wallet upserts and alert.
+    Transactions already in the database (or repeated within the batch) are
+    skipped along with their dependent rows, so overlapping scans do not
+    double-count wallets. Wallet upserts are merged per (address, chain)
+    before writing.
+    """
+
+    def __init__(self, db: 'WhaleDatabase', max_rows: int = BATCH_MAX_ROWS,
+                 max_seconds: float = BATCH_MAX_SECONDS):
+        self.db = db
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+
+        # (tx_data, [(address, tx_value)], alert_data or None)
+        self._eth_txs: List[Tuple[Dict[str, Any], List[Tuple[str, float]], Optional[Dict[str, Any]]]] = []
+        self._sol_txs: List[Tuple[Dict[str, Any], List[Tuple[str, float]], Optional[Dict[str, Any]]]] = []
+        self._wallets: List[Tuple[str, str, float, int]] = []  # address, chain, tx_value, seen at
+        self._alerts: List[Dict[str, Any]] = []
+        self._checkpoints: Dict[str, int] = {}
+        self._pending = 0
+        self._first_pending_at: Optional[float] = None
+
+        self.rows_written = 0
+        self.commits = 0
+
+    @property
+    def pending(self) -> int:
+        """Rows buffered and not yet written"""
+        return self._pending
+
+    def add_eth_tx(self, tx_data: Dict[str, Any], wallets: Sequence[Tuple[str, float]] = (),
+                   alert: Optional[Dict[str, Any]] = None):
+        """Buffer an ETH whale transaction with its wallet upserts and alert (tx_data['id'] is set on flush)"""
+        self._eth_txs.append((tx_data, [w for w in wallets if w[0]], alert))
+        self._added(1 + len(wallets) + (alert is not None))
+
+    def add_sol_tx(self, tx_data: Dict[str, Any], wallets: Sequence[Tuple[str, float]] = (),
+                   alert: Optional[Dict[str, Any]] = None):
+        """Buffer a SOL whale transaction with its wallet upserts and alert (tx_data['id'] is set on flush)"""
+        self._sol_txs.append((tx_data, [w for w in wallets if w[0]], alert))
+        self._added(1 + len(wallets) + (alert is not None))
+
+    def add_whale_wallet(self, address: str, chain: str, tx_value: float = 0):
+        """Buffer a whale wallet upsert"""
+        self._wallets.append((address, chain, tx_value, int(datetime.now().timestamp())))
+        self._added(1)
+
+    def add_whale_alert(self, alert_data: Dict[str, Any]):
+        """Buffer a whale alert"""
+        self._alerts.append(alert_data)
+        self._added(1)
+
+    def set_scan_checkpoint(self, chain: str, last_block: int):
+        """Advance the chain's scan high-water mark when the rows before it are committed"""
+        self._checkpoints[chain] = max(last_block, self._checkpoints.get(chain, last_block))
+        self._added(1)
+
+    def _added(self, rows: int):
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        self._pending += rows
+
+        if (self._pending >= self.max_rows
+                or time.monotonic() - self._first_pending_at >= self.max_seconds):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write and commit all buffered rows; returns the number of rows written"""
+        if not self._pending:
+            return 0
+
+        conn = self.db.conn
+        now = int(datetime.now().timestamp())
+        wallets = list(self._wallets)
+        alerts = list(self._alerts)
+        written = 0
+
+        try:
+            for chain, pending, table, key, sql, to_row in (
+                ('eth', self._eth_txs, 'eth_whale_txs', 'tx_hash', INSERT_ETH_TX_SQL, _eth_tx_row),
+                ('sol', self._sol_txs, 'sol_whale_txs', 'tx_sig', INSERT_SOL_TX_SQL, _sol_tx_row),
+            ):
+                if not pending:
+                    continue
+
+                keys = [tx_data.get(key) for tx_data, _, _ in pending]
+                ids = self.db._lookup_ids(table, key, keys)
+
+                new = []
+                for tx_data, tx_wallets, alert in pending:
+                    tx_key = tx_data.get(key)
+                    if tx_key in ids:
+                        continue
+                    ids[tx_key] = None  # Later repeats in this batch are skipped too
+                    new.append(tx_data)
+                    wallets.extend((address, chain, tx_value, now) for address, tx_value in tx_wallets)
+                    if alert is not None:
+                        alerts.append(alert)
+
+                if new:
+                    conn.executemany(sql.format(conflict='OR IGNORE '), [to_row(tx_data) for tx_data in new])
+                    ids.update(self.db._lookup_ids(table, key, [tx_data.get(key) for tx_data in new]))
+                    written += len(new)
+
+                for tx_data, _, _ in pending:
+                    tx_data['id'] = ids.get(tx_data.get(key))
+
+            # Merge upserts of the same wallet into one row
+            merged: Dict[Tuple[str, str], List] = {}
+            for address, chain, tx_value, seen in wallets:
+                key = (address.lower(), chain)
+                row = merged.get(key)
+                if row is None:
+                    merged[key] = [seen, seen, tx_value, 1]
+                else:
+                    row[0] = min(row[0], seen)
+                    row[1] = max(row[1], seen)
+                    row[2] += tx_value
+                    row[3] += 1
+            if merged:
+                conn.executemany(UPSERT_WHALE_WALLET_SQL, [
+                    (address, chain, first_seen, last_seen, tx_value, count)
+                    for (address, chain), (first_seen, last_seen, tx_value, count) in merged.items()
+                ])
+                written += len(merged)
+
+            if alerts:
+                conn.executemany(INSERT_WHALE_ALERT_SQL, [_whale_alert_row(alert) for alert in alerts])
+                written += len(alerts)
+
+            if self._checkpoints:
+                conn.executemany(UPSERT_SCAN_CHECKPOINT_SQL, [
+                    (chain, last_block, now) for chain, last_block in self._checkpoints.items()
+                ])
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._clear()
+
+        self.rows_written += written
+        self.commits += 1
+        return written
+
+    def discard(self):
+        """Drop all buffered rows without writing them"""
+        self._clear()
+
+    def _clear(self):
+        self._eth_txs = []
+        self._sol_txs = []
+        self._wallets = []
+        self._alerts = []
+        self._checkpoints = {}
+        self._pending = 0
+        self._first_pending_at = None
+
+
 class WhaleDatabase:
     """Database manager for whale monitoring system"""
 
@@ -42,62 +305,58 @@ class WhaleDatabase:
             self.conn.executescript(schema)
             self.conn.commit()
 
+    @contextmanager
+    def batch(self, max_rows: int = BATCH_MAX_ROWS,
+              max_seconds: float = BATCH_MAX_SECONDS) -> Iterator[WriteBatch]:
+        """Batched unit of work: flushed on exit, unflushed rows discarded on error"""
+        batch = WriteBatch(self, max_rows, max_seconds)
+        try:
+            yield batch
+        except BaseException:
+            batch.discard()
+            raise
+        batch.flush()
+
+    def _lookup_ids(self, table: str, key: str, values: Sequence[Any]) -> Dict[Any, int]:
+        """Map key column values to row ids for rows that exist"""
+        ids = {}
+        values = list(dict.fromkeys(v for v in values if v is not None))
+        for i in range(0, len(values), SQL_PARAM_CHUNK):
+            chunk = values[i:i + SQL_PARAM_CHUNK]
+            cursor = self.conn.execute(
+                f"SELECT {key}, id FROM {table} WHERE {key} IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            ids.update((row[0], row[1]) for row in cursor.fetchall())
+        return ids
+
+    def get_scan_checkpoint(self, chain: str) -> Optional[int]:
+        """Last block of the chain's contiguous scanned range, or None if never scanned"""
+        row = self.conn.execute(
+            "SELECT last_block FROM scan_checkpoints WHERE chain = ?", (chain,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_scan_checkpoint(self, chain: str, last_block: int):
+        """Advance the chain's scan high-water mark"""
+        self.conn.execute(UPSERT_SCAN_CHECKPOINT_SQL, (chain, last_block, int(datetime.now().timestamp())))
+        self.conn.commit()
+
     def insert_whale_wallet(self, address: str, chain: str, tx_value: float = 0):
         """Insert or update whale wallet"""
         now = int(datetime.now().timestamp())
-        self.conn.execute("""
-            INSERT INTO whale_wallets (address, chain, first_seen, last_seen, total_tx_value, tx_count)
-            VALUES (?, ?, ?, ?, ?, 1)
-            ON CONFLICT(address, chain) DO UPDATE SET
-                last_seen = excluded.last_seen,
-                total_tx_value = total_tx_value + excluded.total_tx_value,
-                tx_count = tx_count + 1,
-                updated_at = excluded.updated_at
-        """, (address.lower(), chain, now, now, tx_value))
+        self.conn.execute(UPSERT_WHALE_WALLET_SQL, (address.lower(), chain, now, now, tx_value, 1))
         self.conn.commit()
 
     def insert_eth_tx(self, tx_data: Dict[str, Any]) -> int:
         """Insert Ethereum transaction"""
-        cursor = self.conn.execute("""
-            INSERT INTO eth_whale_txs (
-                tx_hash, from_address, to_address, value_eth, value_usd,
-                gas_used, gas_price, tx_type, protocol, block_number, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            tx_data.get('tx_hash'),
-            tx_data.get('from_address', '').lower(),
-            tx_data.get('to_address', '').lower(),
-            tx_data.get('value_eth', 0),
-            tx_data.get('value_usd', 0),
-            tx_data.get('gas_used'),
-            tx_data.get('gas_price'),
-            tx_data.get('tx_type', 'transfer'),
-            tx_data.get('protocol'),
-            tx_data.get('block_number'),
-            tx_data.get('timestamp', int(datetime.now().timestamp()))
-        ))
+        cursor = self.conn.execute(INSERT_ETH_TX_SQL.format(conflict=''), _eth_tx_row(tx_data))
         self.conn.commit()
         return cursor.lastrowid
 
     def insert_sol_tx(self, tx_data: Dict[str, Any]) -> int:
         """Insert Solana transaction"""
-        cursor = self.conn.execute("""
-            INSERT INTO sol_whale_txs (
-                tx_sig, from_address, to_address, amount_sol, amount_usd,
-                fee_lamports, tx_type, protocol, slot, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            tx_data.get('tx_sig'),
-            tx_data.get('from_address', '').lower(),
-            tx_data.get('to_address', '').lower(),
-            tx_data.get('amount_sol', 0),
-            tx_data.get('amount_usd', 0),
-            tx_data.get('fee_lamports'),
-            tx_data.get('tx_type', 'transfer'),
-            tx_data.get('protocol'),
-            tx_data.get('slot'),
-            tx_data.get('timestamp', int(datetime.now().timestamp()))
-        ))
+        cursor = self.conn.execute(INSERT_SOL_TX_SQL.format(conflict=''), _sol_tx_row(tx_data))
         self.conn.commit()
         return cursor.lastrowid
 
@@ -121,20 +380,7 @@ class WhaleDatabase:
 
     def insert_whale_alert(self, alert_data: Dict[str, Any]) -> int:
         """Insert whale alert"""
-        cursor = self.conn.execute("""
-            INSERT INTO whale_alerts (
-                alert_type, chain, address, amount, currency,
-                description, correlation_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            alert_data.get('alert_type'),
-            alert_data.get('chain'),
-            alert_data.get('address', '').lower(),
-            alert_data.get('amount'),
-            alert_data.get('currency'),
-            alert_data.get('description'),
-            alert_data.get('correlation_id')
-        ))
+        cursor = self.conn.execute(INSERT_WHALE_ALERT_SQL, _whale_alert_row(alert_data))
         self.conn.commit()
         return cursor.lastrowid
 
@@ -2,12 +2,22 @@
 Ethereum whale monitor using Etherscan API (free tier)
 """
 
+import asyncio
 import os
 import requests
 import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from database import WhaleDatabase
+from block_scanner import SCAN_MAX_WORKERS, SCAN_SEGMENT_SIZE, BlockRangeScanner, ScanFetchError
+from database import WhaleDatabase, WriteBatch
+from etherscan_client import (
+    ETHERSCAN_API_URL,
+    ETHERSCAN_RATE_LIMIT,
+    AsyncEtherscanClient,
+    TokenBucket,
+    response_error,
+)
+from price_service import PriceService, coingecko_history
 
 # Known DEX and protocol addresses on ETH
 DEX_PROTOCOLS = {
@@ -26,28 +36,50 @@ INITIAL_WHALES_ETH = [
     '0x21a31Ee1afC51d94C2eFCAa0820f1d56E5F3C109',  # Bitfinex
 ]
 
+
+def _to_int(value: Optional[str]) -> int:
+    """Parse a quantity from the API (hex in proxy calls, decimal in account calls)"""
+    if not value:
+        return 0
+    if isinstance(value, str) and value.startswith('0x'):
+        return int(value, 16)
+    return int(value)
+
+
 class EthereumWhaleMonitor:
     """Monitor Ethereum whale transactions using Etherscan API"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 db: Optional[WhaleDatabase] = None, prices: Optional[PriceService] = None):
         self.api_key = api_key or os.getenv('ETHERSCAN_API_KEY', '')
-        self.base_url = 'https://api.etherscan.io/api'
-        self.db = WhaleDatabase()
+        self.base_url = base_url or os.getenv('ETHERSCAN_API_URL', ETHERSCAN_API_URL)
+        self.db = db or WhaleDatabase()
+        # Shared by sync and async calls, so together they stay within the quota
+        self.rate_limiter = TokenBucket(ETHERSCAN_RATE_LIMIT)
+        # USD values use the price at each transaction's time
+        self._owns_prices = prices is None
+        self.prices = prices or PriceService(self.db, {'ETH': lambda: self.get_eth_price()}, coingecko_history)
         self.min_eth_threshold = 10.0  # Minimum ETH to track
         self.min_usd_threshold = 100_000  # Minimum USD value to track
 
+    def close(self):
+        """Stop the price refresher this monitor started (a shared PriceService is left running)"""
+        if self._owns_prices:
+            self.prices.stop()
+
     def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make API request with rate limiting"""
         params['apikey'] = self.api_key
-        time.sleep(0.21)  # Rate limit: ~5 calls/second
+        self.rate_limiter.acquire()
 
         try:
             response = requests.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
 
-            if data.get('status') != '1':
-                print(f"API Error: {data.get('message', 'Unknown error')}")
+            error = response_error(data)
+            if error:
+                print(f"API Error: {error}")
                 return None
 
             return data
@@ -81,12 +113,12 @@ class EthereumWhaleMonitor:
     def get_eth_price(self) -> float:
         """Get current ETH price in USD"""
         params = {
-            'module': 'proxy',
-            'action': 'eth_getPrice',
+            'module': 'stats',
+            'action': 'ethprice',
         }
         data = self._make_request(params)
         if data and data.get('result'):
-            return float(data['result'])
+            return float(data['result'].get('ethusd', 0))
         return 0
 
     def _identify_tx_type(self, tx: Dict[str, Any]) -> tuple[str, Optional[str]]:
@@ -115,15 +147,14 @@ class EthereumWhaleMonitor:
             return known_methods.get(method, 'contract'), None
 
         # Regular transfer
-        if tx.get('value', '0x0') != '0x0':
+        if _to_int(tx.get('value')):
             return 'transfer', None
 
         return 'contract', None
 
     def _is_whale_transaction(self, tx: Dict[str, Any], eth_price: float) -> bool:
         """Check if transaction meets whale criteria"""
-        # Convert hex value to ETH
-        value_wei = int(tx.get('value', '0x0'), 16)
+        value_wei = _to_int(tx.get('value'))
         value_eth = value_wei / 1e18
         value_usd = value_eth * eth_price
 
@@ -133,6 +164,20 @@ class EthereumWhaleMonitor:
 
         return False
 
+    def _large_transfer_alert(self, address: str, value_eth: float, value_usd: float,
+                              protocol: Optional[str], tx_type: str) -> Optional[Dict[str, Any]]:
+        """Alert for very large transfers, or None"""
+        if value_eth >= 100 or value_usd >= 500_000:
+            return {
+                'alert_type': 'large_transfer',
+                'chain': 'eth',
+                'address': address,
+                'amount': value_eth,
+                'currency': 'ETH',
+                'description': f'Large transfer: {value_eth:.2f} ETH (${value_usd:,.0f}) via {protocol or tx_type}',
+            }
+        return None
+
     def monitor_wallet(self, address: str, lookback_hours: int = 24) -> List[Dict[str, Any]]:
         """Monitor a single wallet for whale transactions"""
         print(f"Monitoring ETH wallet: {address}")
@@ -143,71 +188,84 @@ class EthereumWhaleMonitor:
             print("Could not get latest block")
             return []
 
-        # Ethereum blocks are ~13 seconds, so ~6600 blocks per day
-        blocks_to_scan = int((lookback_hours / 24) * 6600)
+        blocks_to_scan = self._lookback_blocks(lookback_hours)
         start_block = max(0, current_block - blocks_to_scan)
 
         txs = self.get_address_transactions(address, start_block, current_block)
-        eth_price = self.get_eth_price()
-
-        whale_txs = []
-        for tx in txs:
-            value_wei = int(tx.get('value', '0x0'), 16)
-            value_eth = value_wei / 1e18
-            value_usd = value_eth * eth_price
 
-            if self._is_whale_transaction(tx, eth_price):
-                tx_type, protocol = self._identify_tx_type(tx)
-
-                tx_data = {
-                    'tx_hash': tx['hash'],
-                    'from_address': tx['from'],
-                    'to_address': tx.get('to', '0x0'),
-                    'value_eth': value_eth,
-                    'value_usd': value_usd,
-                    'gas_used': int(tx.get('gasUsed', '0'), 16),
-                    'gas_price': tx.get('gasPrice'),
-                    'tx_type': tx_type,
-                    'protocol': protocol,
-                    'block_number': int(tx['blockNumber'], 16),
-                    'timestamp': int(tx['timeStamp']),
-                }
+        whale_txs = self._store_wallet_txs(txs)
+        print(f"  Found {len(whale_txs)} whale transactions")
+        return whale_txs
 
-                # Store in database
-                tx_id = self.db.insert_eth_tx(tx_data)
-                tx_data['id'] = tx_id
-                whale_txs.append(tx_data)
+    def _lookback_blocks(self, lookback_hours: int) -> int:
+        # Ethereum blocks are ~13 seconds, so ~6600 blocks per day
+        return int((lookback_hours / 24) * 6600)
 
-                # Update whale wallet record
-                self.db.insert_whale_wallet(tx['from'], 'eth', value_usd)
-                if tx.get('to'):
-                    self.db.insert_whale_wallet(tx['to'], 'eth', value_usd)
-
-                # Generate alert for very large transfers
-                if value_eth >= 100 or value_usd >= 500_000:
-                    self.db.insert_whale_alert({
-                        'alert_type': 'large_transfer',
-                        'chain': 'eth',
-                        'address': tx['from'],
-                        'amount': value_eth,
-                        'currency': 'ETH',
-                        'description': f'Large transfer: {value_eth:.2f} ETH (${value_usd:,.0f}) via {protocol or tx_type}',
-                    })
+    def _store_wallet_txs(self, txs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store the whale transactions of one wallet's txlist, valued at their time"""
+        whale_txs = []
+        # One unit of work per wallet: rows are written with executemany and
+        # committed together (tx_data['id'] is filled in when they are flushed)
+        with self.db.batch() as batch:
+            for tx in txs:
+                eth_price = self.prices.price_at('ETH', _to_int(tx.get('timeStamp')))
+                value_wei = _to_int(tx.get('value'))
+                value_eth = value_wei / 1e18
+                value_usd = value_eth * eth_price
+
+                if self._is_whale_transaction(tx, eth_price):
+                    tx_type, protocol = self._identify_tx_type(tx)
+
+                    tx_data = {
+                        'tx_hash': tx['hash'],
+                        'from_address': tx['from'],
+                        'to_address': tx.get('to', '0x0'),
+                        'value_eth': value_eth,
+                        'value_usd': value_usd,
+                        'gas_used': _to_int(tx.get('gasUsed')),
+                        'gas_price': tx.get('gasPrice'),
+                        'tx_type': tx_type,
+                        'protocol': protocol,
+                        'block_number': _to_int(tx['blockNumber']),
+                        'timestamp': int(tx['timeStamp']),
+                    }
+
+                    # Store the transaction with its whale wallet updates and,
+                    # for very large transfers, an alert
+                    batch.add_eth_tx(
+                        tx_data,
+                        wallets=[(tx['from'], value_usd), (tx.get('to'), value_usd)],
+                        alert=self._large_transfer_alert(tx['from'], value_eth, value_usd, protocol, tx_type)
+                    )
+                    whale_txs.append(tx_data)
 
-        print(f"  Found {len(whale_txs)} whale transactions")
         return whale_txs
 
     def monitor_whales(self, addresses: List[str] = None, lookback_hours: int = 24) -> Dict[str, Any]:
         """Monitor multiple whale wallets"""
+        return asyncio.run(self.monitor_whales_async(addresses, lookback_hours))
+
+    async def monitor_whales_async(self, addresses: List[str] = None, lookback_hours: int = 24) -> Dict[str, Any]:
+        """Monitor multiple whale wallets, fetching them concurrently within the rate limit"""
         addresses = addresses or INITIAL_WHALES_ETH
         all_whale_txs = []
 
         print(f"Monitoring {len(addresses)} ETH wallets for last {lookback_hours} hours")
 
+        async with AsyncEtherscanClient(self.api_key, self.base_url, self.rate_limiter) as client:
+            # The block range is the same for every wallet, so fetch it once
+            current_block = await client.get_latest_block()
+            if not current_block:
+                print("Could not get latest block")
+                return {'wallets_monitored': 0, 'whale_transactions': 0, 'transactions': []}
+
+            start_block = max(0, current_block - self._lookback_blocks(lookback_hours))
+            txs_by_address = await client.get_transactions_for_addresses(addresses, start_block, current_block)
+
         for address in addresses:
-            whale_txs = self.monitor_wallet(address, lookback_hours)
+            whale_txs = self._store_wallet_txs(txs_by_address[address])
+            print(f"  {address}: {len(whale_txs)} whale transactions")
             all_whale_txs.extend(whale_txs)
-            time.sleep(0.3)  # Be nice to the API
 
         return {
             'wallets_monitored': len(addresses),
@@ -215,77 +273,99 @@ class EthereumWhaleMonitor:
             'transactions': all_whale_txs,
         }
 
-    def scan_large_blocks(self, num_blocks: int = 100, eth_price: float = None) -> List[Dict[str, Any]]:
-        """Scan recent blocks for large transactions"""
+    def _fetch_block(self, block_num: int) -> Optional[Dict[str, Any]]:
+        """Get a block with its transactions (None if it does not exist)"""
+        params = {
+            'module': 'proxy',
+            'action': 'eth_getBlockByNumber',
+            'tag': hex(block_num),
+            'boolean': 'true',
+        }
+        data = self._make_request(params)
+        if data is None:
+            raise ScanFetchError(f"could not fetch block {block_num}")
+        return data.get('result')
+
+    def _fetch_block_segment(self, first: int, last: int) -> List[Optional[Dict[str, Any]]]:
+        return [self._fetch_block(block_num) for block_num in range(first, last + 1)]
+
+    def _process_block(self, block_num: int, block: Dict[str, Any], batch: WriteBatch,
+                       whale_txs: List[Dict[str, Any]], eth_price: Optional[float] = None):
+        """Add a block's whale transactions to the batch (valued at the block time by default)"""
+        timestamp = _to_int(block.get('timestamp')) or int(time.time())
         if eth_price is None:
-            eth_price = self.get_eth_price()
+            eth_price = self.prices.price_at('ETH', timestamp)
 
-        current_block = self.get_latest_block()
-        if not current_block:
-            return []
+        for tx in block.get('transactions', []):
+            value_wei = _to_int(tx.get('value'))
+            value_eth = value_wei / 1e18
+            value_usd = value_eth * eth_price
+
+            if self._is_whale_transaction(tx, eth_price):
+                tx_type, protocol = self._identify_tx_type(tx)
 
+                tx_data = {
+                    'tx_hash': tx.get('hash', ''),
+                    'from_address': tx.get('from', ''),
+                    'to_address': tx.get('to', '0x'),
+                    'value_eth': value_eth,
+                    'value_usd': value_usd,
+                    'gas_used': _to_int(tx.get('gas')),
+                    'gas_price': tx.get('gasPrice'),
+                    'tx_type': tx_type,
+                    'protocol': protocol,
+                    'block_number': block_num,
+                    'timestamp': timestamp,
+                }
+
+                batch.add_eth_tx(
+                    tx_data,
+                    wallets=[(tx.get('from'), value_usd), (tx.get('to'), value_usd)],
+                    alert=self._large_transfer_alert(tx.get('from'), value_eth, value_usd, protocol, tx_type)
+                )
+                whale_txs.append(tx_data)
+
+    def scan_block_range(self, start: Optional[int] = None, end: Optional[int] = None,
+                         num_blocks: int = 100, eth_price: float = None,
+                         segment_size: int = SCAN_SEGMENT_SIZE,
+                         max_workers: int = SCAN_MAX_WORKERS) -> Dict[str, Any]:
+        """
+        Scan a block range for large transactions, fetching segments concurrently.
+
+        Without start, scans from the block after the checkpoint (or the last
+        num_blocks blocks on the first run) up to end (default: latest block).
+        Transactions are valued at their block's time unless eth_price is
+        given. Returns the scanner stats plus the whale transactions found.
+        """
         whale_txs = []
-        print(f"Scanning last {num_blocks} blocks for large transactions")
-
-        for block_num in range(current_block, current_block - num_blocks, -1):
-            # Get block transactions
-            params = {
-                'module': 'proxy',
-                'action': 'eth_getBlockByNumber',
-                'tag': hex(block_num),
-                'boolean': 'true',
-            }
-            data = self._make_request(params)
-
-            if data and data.get('result'):
-                block = data['result']
-                txs = block.get('transactions', [])
-
-                for tx in txs:
-                    value_wei = int(tx.get('value', '0x0'), 16)
-                    value_eth = value_wei / 1e18
-                    value_usd = value_eth * eth_price
-
-                    if self._is_whale_transaction(tx, eth_price):
-                        tx_type, protocol = self._identify_tx_type(tx)
-
-                        tx_data = {
-                            'tx_hash': tx.get('hash', ''),
-                            'from_address': tx.get('from', ''),
-                            'to_address': tx.get('to', '0x'),
-                            'value_eth': value_eth,
-                            'value_usd': value_usd,
-                            'gas_used': int(tx.get('gas', '0x0'), 16),
-                            'gas_price': tx.get('gasPrice'),
-                            'tx_type': tx_type,
-                            'protocol': protocol,
-                            'block_number': block_num,
-                            'timestamp': int(block.get('timestamp', time.time())),
-                        }
-
-                        tx_id = self.db.insert_eth_tx(tx_data)
-                        tx_data['id'] = tx_id
-                        whale_txs.append(tx_data)
-
-                        # Update whale wallets
-                        self.db.insert_whale_wallet(tx.get('from'), 'eth', value_usd)
-                        if tx.get('to'):
-                            self.db.insert_whale_wallet(tx.get('to'), 'eth', value_usd)
-
-                        # Generate alert for very large transfers
-                        if value_eth >= 100 or value_usd >= 500_000:
-                            self.db.insert_whale_alert({
-                                'alert_type': 'large_transfer',
-                                'chain': 'eth',
-                                'address': tx.get('from'),
-                                'amount': value_eth,
-                                'currency': 'ETH',
-                                'description': f'Large transfer: {value_eth:.2f} ETH (${value_usd:,.0f}) via {protocol or tx_type}',
-                            })
+        scanner = BlockRangeScanner(
+            self.db, 'eth', self._fetch_block_segment,
+            lambda block_num, block, batch: self._process_block(block_num, block, batch, whale_txs, eth_price),
+            segment_size, max_workers
+        )
+
+        if end is None:
+            end = self.get_latest_block()
+            if not end:
+                print("Could not get latest block")
+                return {'blocks': 0, 'complete': False, 'transactions': []}
+        if start is None:
+            planned = scanner.plan(end, num_blocks)
+            if planned is None:
+                print("No new blocks to scan")
+                return {'blocks': 0, 'complete': True, 'transactions': []}
+            start = planned[0]
+
+        print(f"Scanning blocks {start}-{end} for large transactions")
+        stats = scanner.scan(start, end)
 
         print(f"  Found {len(whale_txs)} whale transactions in block scan")
-        return whale_txs
+        stats['transactions'] = whale_txs
+        return stats
 
+    def scan_large_blocks(self, num_blocks: int = 100, eth_price: float = None) -> List[Dict[str, Any]]:
+        """Scan blocks since the last scan (first run: the last num_blocks) for large transactions"""
+        return self.scan_block_range(num_blocks=num_blocks, eth_price=eth_price)['transactions']
 
 if __name__ == '__main__':
     # Test the monitor
@@ -309,4 +389,5 @@ if __name__ == '__main__':
     for key, value in stats.items():
         print(f"  {key}: {value}")
 
+    monitor.close()
     monitor.db.close()
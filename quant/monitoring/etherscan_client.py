@@ -0,0 +1,199 @@
+"""
+Async Etherscan client with token-bucket rate limiting
+
+All calls made with one API key draw from a shared TokenBucket sized to the
+key's quota (free tier: 5 calls/second), so requests go out as fast as the
+quota allows instead of after a fixed sleep. AsyncEtherscanClient keeps a
+pool of keep-alive connections and lets many wallets be fetched at once;
+the bucket is thread-safe and also paces the synchronous monitor calls.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiohttp
+
+ETHERSCAN_API_URL = 'https://api.etherscan.io/api'
+
+# Calls per second allowed for the API key (free tier: 5)
+ETHERSCAN_RATE_LIMIT = float(os.getenv('ETHERSCAN_RATE_LIMIT', 5))
+
+# Concurrent keep-alive connections to the API
+ETHERSCAN_MAX_CONNECTIONS = 10
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Each call reserves a token and waits until the bucket would have held
+    it, so callers are released in order at `rate` per second after an
+    initial burst of `capacity`. Thread-safe; acquire() blocks the thread and
+    acquire_async() only the calling task.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.issued = 0  # Tokens handed out
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """Take a token, returning the seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            self.issued += 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available now, without waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.issued += 1
+            return True
+
+    def acquire(self):
+        """Wait for a token (blocking)"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def is_rate_limited(data: Dict[str, Any]) -> bool:
+    """Whether an Etherscan response reports the rate limit was exceeded"""
+    result = data.get('result')
+    return data.get('status') == '0' and isinstance(result, str) and 'rate limit' in result.lower()
+
+
+def response_error(data: Dict[str, Any]) -> Optional[str]:
+    """Error message of an Etherscan response, or None if it succeeded"""
+    # Proxy (JSON-RPC) responses carry 'error' instead of 'status'
+    if 'error' in data:
+        error = data['error']
+        return error.get('message', str(error)) if isinstance(error, dict) else str(error)
+    if 'status' in data and data['status'] != '1':
+        return data.get('message', 'Unknown error')
+    return None
+
+
+class AsyncEtherscanClient:
+    """Concurrent Etherscan API client sharing a rate limiter"""
+
+    def __init__(self, api_key: str = '', base_url: str = ETHERSCAN_API_URL,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_connections: int = ETHERSCAN_MAX_CONNECTIONS,
+                 timeout: float = 30, max_retries: int = 3):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or TokenBucket(ETHERSCAN_RATE_LIMIT)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.requests = 0
+        self.rate_limited = 0
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._session.close()
+        self._session = None
+
+    async def request(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Make API request within the rate limit, retrying rate-limited calls"""
+        params = {**params, 'apikey': self.api_key}
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            self.requests += 1
+
+            try:
+                async with self._session.get(self.base_url, params=params) as response:
+                    if response.status == 429:
+                        data = {'status': '0', 'result': 'Max rate limit reached'}
+                    else:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+            except Exception as e:
+                print(f"Request failed: {e}")
+                return None
+
+            if is_rate_limited(data):
+                # Another client is using the same key; back off and retry
+                self.rate_limited += 1
+                await asyncio.sleep((attempt + 1) / self.rate_limiter.rate)
+                continue
+
+            error = response_error(data)
+            if error:
+                print(f"API Error: {error}")
+                return None
+
+            return data
+
+        print(f"API Error: rate limit still exceeded after {self.max_retries} retries")
+        return None
+
+    async def get_latest_block(self) -> Optional[int]:
+        """Get latest block number"""
+        data = await self.request({'module': 'proxy', 'action': 'eth_blockNumber'})
+        if data:
+            return int(data.get('result', '0x0'), 16)
+        return None
+
+    async def get_address_transactions(self, address: str, start_block: int = 0,
+                                       end_block: int = 99999999) -> List[Dict[str, Any]]:
+        """Get normal transactions for an address"""
+        data = await self.request({
+            'module': 'account',
+            'action': 'txlist',
+            'address': address,
+            'startblock': start_block,
+            'endblock': end_block,
+            'sort': 'desc',
+        })
+        if data:
+            return data.get('result', [])
+        return []
+
+    async def get_transactions_for_addresses(self, addresses: Sequence[str], start_block: int = 0,
+                                             end_block: int = 99999999) -> Dict[str, List[Dict[str, Any]]]:
+        """Get normal transactions for many addresses concurrently"""
+        results = await asyncio.gather(*(
+            self.get_address_transactions(address, start_block, end_block)
+            for address in addresses
+        ))
+        return dict(zip(addresses, results))
+
+    async def get_eth_price(self) -> float:
+        """Get current ETH price in USD"""
+        data = await self.request({'module': 'stats', 'action': 'ethprice'})
+        if data and data.get('result'):
+            return float(data['result'].get('ethusd', 0))
+        return 0
@@ -0,0 +1,176 @@
+"""
+Local mock of the Etherscan API for tests and offline development
+
+Answers the calls the ETH monitor makes (eth_blockNumber,
+eth_getBlockByNumber, txlist, ethprice) with deterministic data, adds a fixed response latency, and
+enforces a calls-per-second quota the way Etherscan does: requests over the
+quota get status "0" with "Max rate limit reached".
+
+Usage:
+    python mock_etherscan.py --port 8546 --rate 5
+    ETHERSCAN_API_URL=http://localhost:8546/api python run_monitor.py --mode eth
+"""
+
+import argparse
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from etherscan_client import TokenBucket
+
+
+class BackgroundServer:
+    """aiohttp app that can be served from a background thread"""
+
+    path = '/'  # Path of the API endpoint, appended to the URL start() returns
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _runner: Optional[web.AppRunner] = None
+    _thread: Optional[threading.Thread] = None
+
+    def make_app(self) -> web.Application:
+        raise NotImplementedError
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve on a background thread; returns the API URL"""
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(self.make_app())
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, host, port)
+        self._loop.run_until_complete(site.start())
+        port = self._runner.addresses[0][1]
+
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        return f'http://{host}:{port}{self.path}'
+
+    def stop(self):
+        """Stop a server started with start()"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+
+class MockEtherscan(BackgroundServer):
+    """In-process mock Etherscan server"""
+
+    path = '/api'
+
+    def __init__(self, rate: float = 5.0, latency: float = 0.05,
+                 latest_block: int = 20_000_000, eth_price: float = 3000.0,
+                 txs_per_address: int = 20):
+        self.rate = rate
+        self.latency = latency
+        self.latest_block = latest_block
+        self.eth_price = eth_price
+        self.txs_per_address = txs_per_address
+
+        # Etherscan allows `rate` calls in any second, i.e. short bursts
+        self._quota = TokenBucket(rate, capacity=rate)
+        self.requests = 0
+        self.rate_limited = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+
+    def transactions(self, address: str) -> List[Dict[str, Any]]:
+        """Deterministic transactions for an address (decimal strings, like txlist)"""
+        txs = []
+        for i in range(self.txs_per_address):
+            digest = hashlib.sha256(f'{address}:{i}'.encode()).hexdigest()
+            # Every other transaction is a whale-sized transfer
+            value_eth = 10 + int(digest[:4], 16) % 200 if i % 2 == 0 else int(digest[:2], 16) % 5
+            block = self.latest_block - i * 250
+            txs.append({
+                'hash': '0x' + digest,
+                'from': address.lower(),
+                'to': '0x' + digest[-40:],
+                'value': str(value_eth * 10**18),
+                'blockNumber': str(block),
+                'timeStamp': str(int(time.time()) - i * 3000),
+                'gasUsed': '21000',
+                'gasPrice': '20000000000',
+                'input': '0x',
+            })
+        return txs
+
+    def block(self, number: int) -> Dict[str, Any]:
+        """Deterministic block (hex quantities, like the proxy module)"""
+        txs = []
+        for i in range(4):
+            digest = hashlib.sha256(f'block:{number}:{i}'.encode()).hexdigest()
+            value_eth = 10 + int(digest[:4], 16) % 200 if i == 0 else int(digest[:2], 16) % 5
+            txs.append({
+                'hash': '0x' + digest,
+                'from': '0x' + digest[:40],
+                'to': '0x' + digest[-40:],
+                'value': hex(value_eth * 10**18),
+                'gas': hex(21000),
+                'gasPrice': hex(20_000_000_000),
+                'input': '0x',
+            })
+        return {
+            'number': hex(number),
+            'timestamp': hex(int(time.time()) - (self.latest_block - number) * 12),
+            'transactions': txs,
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            if self._quota.try_acquire():
+                data = self._respond(request.query)
+            else:
+                self.rate_limited += 1
+                data = {'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'}
+            await asyncio.sleep(self.latency)
+            return web.json_response(data)
+        finally:
+            self._concurrent -= 1
+
+    def _respond(self, query) -> Dict[str, Any]:
+        module, action = query.get('module'), query.get('action')
+        if module == 'proxy' and action == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(self.latest_block)}
+        if module == 'stats' and action == 'ethprice':
+            return {'status': '1', 'message': 'OK',
+                    'result': {'ethusd': str(self.eth_price), 'ethusd_timestamp': str(int(time.time()))}}
+        if module == 'proxy' and action == 'eth_getBlockByNumber':
+            number = int(query.get('tag', '0x0'), 16)
+            result = self.block(number) if number <= self.latest_block else None
+            return {'jsonrpc': '2.0', 'id': 1, 'result': result}
+        if module == 'account' and action == 'txlist':
+            start = int(query.get('startblock', 0))
+            end = int(query.get('endblock', 99999999))
+            txs = [tx for tx in self.transactions(query.get('address', ''))
+                   if start <= int(tx['blockNumber']) <= end]
+            if not txs:
+                return {'status': '0', 'message': 'No transactions found', 'result': []}
+            return {'status': '1', 'message': 'OK', 'result': txs}
+
+        return {'status': '0', 'message': 'NOTOK', 'result': 'Error! Unknown action'}
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(self.path, self.handle)
+        return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock Etherscan API server')
+    parser.add_argument('--port', type=int, default=8546, help='Port to listen on')
+    parser.add_argument('--rate', type=float, default=5.0, help='Allowed calls per second')
+    parser.add_argument('--latency', type=float, default=0.05, help='Response latency in seconds')
+    args = parser.parse_args()
+
+    mock = MockEtherscan(rate=args.rate, latency=args.latency)
+    print(f"Mock Etherscan on http://localhost:{args.port}/api ({args.rate:g} calls/s)")
+    web.run_app(mock.make_app(), port=args.port, print=None)
@@ -0,0 +1,155 @@
+"""
+Local mock of a Solana JSON-RPC endpoint for tests and offline development
+
+Answers the calls the SOL monitor makes (getSlot, getSignaturesForAddress,
+getTransaction, getBlock) with deterministic jsonParsed data, single or as
+JSON-RPC batches, after a fixed latency per HTTP request. Every tenth slot
+(ending in 7) is skipped, and getBlock can be made to fail from a slot on
+to simulate an outage.
+
+Usage:
+    python mock_solana_rpc.py --port 8899
+"""
+
+import argparse
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from mock_etherscan import BackgroundServer
+
+SYSTEM_PROGRAM = '11111111111111111111111111111111'
+
+
+class MockSolanaRpc(BackgroundServer):
+    """In-process mock Solana RPC server"""
+
+    def __init__(self, latency: float = 0.05, latest_slot: int = 250_000_000,
+                 sigs_per_address: int = 1000, max_batch_size: int = 1000):
+        self.latency = latency
+        self.latest_slot = latest_slot
+        self.sigs_per_address = sigs_per_address
+        self.max_batch_size = max_batch_size
+        self.fail_from: Optional[int] = None  # getBlock fails for slots >= this
+
+        self.requests = 0  # HTTP requests
+        self.calls = 0     # RPC calls, counting each call in a batch
+        self.max_batch = 0
+        self.max_concurrent = 0  # HTTP requests in flight at once
+        self._concurrent = 0
+
+    @staticmethod
+    def _digest(*parts: Any) -> str:
+        return hashlib.sha256(':'.join(map(str, parts)).encode()).hexdigest()
+
+    def signature(self, address: str, i: int) -> str:
+        return self._digest('sig', address, i)
+
+    def transaction(self, signature: str, slot: Optional[int] = None) -> Dict[str, Any]:
+        """Deterministic transfer; about one in four is whale-sized"""
+        digest = self._digest('tx', signature)
+        if int(digest[:2], 16) % 4 == 0:
+            lamports = (1000 + int(digest[2:6], 16) % 20_000) * 10**9
+        else:
+            lamports = int(digest[2:6], 16) * 10**6
+        slot = slot if slot is not None else self.latest_slot - int(digest[6:10], 16)
+        return {
+            'slot': slot,
+            'blockTime': int(time.time()) - (self.latest_slot - slot) // 2,
+            'meta': {'fee': 5000, 'err': None, 'innerInstructions': []},
+            'transaction': {
+                'signatures': [signature],
+                'message': {
+                    'accountKeys': [],
+                    'instructions': [{
+                        'programId': SYSTEM_PROGRAM,
+                        'parsed': {
+                            'type': 'transfer',
+                            'info': {
+                                'source': 'src' + digest[10:50],
+                                'destination': 'dst' + digest[50:],
+                                'lamports': lamports,
+                            },
+                        },
+                    }],
+                },
+            },
+        }
+
+    @staticmethod
+    def is_skipped(slot: int) -> bool:
+        return slot % 10 == 7
+
+    def block(self, slot: int) -> Dict[str, Any]:
+        """Deterministic block of a few transfers"""
+        return {
+            'blockTime': int(time.time()) - (self.latest_slot - slot) // 2,
+            'transactions': [self.transaction(self._digest('block', slot, i), slot) for i in range(4)],
+        }
+
+    def _call(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        method, params = call.get('method'), call.get('params') or []
+        response = {'jsonrpc': '2.0', 'id': call.get('id')}
+
+        if method == 'getSlot':
+            response['result'] = self.latest_slot
+        elif method == 'getSignaturesForAddress':
+            limit = (params[1] if len(params) > 1 else {}).get('limit', 1000)
+            response['result'] = [
+                {'signature': self.signature(params[0], i), 'slot': self.latest_slot - i, 'err': None}
+                for i in range(min(limit, self.sigs_per_address))
+            ]
+        elif method == 'getTransaction':
+            response['result'] = self.transaction(params[0])
+        elif method == 'getBlock':
+            slot = params[0]
+            if self.fail_from is not None and slot >= self.fail_from:
+                response['error'] = {'code': -32603, 'message': 'Internal error'}
+            elif slot > self.latest_slot or self.is_skipped(slot):
+                response['error'] = {'code': -32007, 'message': f'Slot {slot} was skipped'}
+            else:
+                response['result'] = self.block(slot)
+        else:
+            response['error'] = {'code': -32601, 'message': 'Method not found'}
+        return response
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            payload = await request.json()
+            await asyncio.sleep(self.latency)
+
+            if not isinstance(payload, list):
+                return web.json_response(self._call(payload))
+
+            self.max_batch = max(self.max_batch, len(payload))
+            if len(payload) > self.max_batch_size:
+                return web.json_response({
+                    'jsonrpc': '2.0', 'id': None,
+                    'error': {'code': -32600, 'message': f'Batch size exceeds {self.max_batch_size}'},
+                })
+            return web.json_response([self._call(call) for call in payload])
+        finally:
+            self._concurrent -= 1
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock Solana JSON-RPC server')
+    parser.add_argument('--port', type=int, default=8899, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.05, help='Response latency in seconds')
+    args = parser.parse_args()
+
+    mock = MockSolanaRpc(latency=args.latency)
+    print(f"Mock Solana RPC on http://localhost:{args.port}/")
+    web.run_app(mock.make_app(), port=args.port, print=None)
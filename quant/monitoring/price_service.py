@@ -0,0 +1,314 @@
+"""
+Minute-level USD price service for whale valuations
+
+Prices are kept as a per-minute time series in the price_history table,
+so transactions are valued at the price of their own minute:
+
+- price_at(symbol, timestamp) returns the latest stored price at or before
+  the transaction's minute (at most MAX_PRICE_GAP older), memoised in an
+  in-memory LRU;
+- a background thread refreshes the spot price every ttl seconds and
+  records it in the series, so lookups never wait on a price HTTP call
+  (only the very first lookup on an empty database fetches once);
+- when the thread starts it backfills recent history, and lookups the series
+  cannot answer wait for that first catch-up, so transactions from before
+  the process started are not valued at today's price;
+- an older transaction outside the series backfills the hour around its
+  minute on demand; if history has no point there either it is valued at 0
+  (counted in `unpriced`) rather than at today's price.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from database import WhaleDatabase
+
+# Seconds between spot price refreshes
+PRICE_TTL = 60
+
+# Minute prices memoised in memory
+PRICE_LRU_SIZE = 4096
+
+# Oldest stored price (seconds before the minute) that still values a transaction
+MAX_PRICE_GAP = 3600
+
+# History fetched when the refresher starts (the default monitoring lookback)
+BACKFILL_SECONDS = 86400
+
+COINGECKO_IDS = {
+    'ETH': 'ethereum',
+    'SOL': 'solana',
+}
+
+SpotFetcher = Callable[[], float]
+HistoryFetcher = Callable[[str, int, int], List[Tuple[int, float]]]
+
+
+def coingecko_history(symbol: str, start: int, end: int) -> List[Tuple[int, float]]:
+    """(timestamp, USD price) points from CoinGecko (5-minute for ranges up to a day, else hourly)"""
+    try:
+        response = requests.get(
+            f'https://api.coingecko.com/api/v3/coins/{COINGECKO_IDS[symbol]}/market_chart/range',
+            params={'vs_currency': 'usd', 'from': start, 'to': end},
+            timeout=30
+        )
+        response.raise_for_status()
+        return [(int(ms) // 1000, float(price)) for ms, price in response.json().get('prices', [])]
+    except Exception as e:
+        print(f"Failed to get {symbol} price history: {e}")
+        return []
+
+
+def _minute(timestamp: float) -> int:
+    return int(timestamp) // 60 * 60
+
+
+class PriceService:
+    """USD prices by minute, with a cached, background-refreshed latest price"""
+
+    def __init__(self, db: WhaleDatabase, spot: Dict[str, SpotFetcher],
+                 history: Optional[HistoryFetcher] = None, ttl: float = PRICE_TTL,
+                 lru_size: int = PRICE_LRU_SIZE, max_gap: int = MAX_PRICE_GAP,
+                 backfill_seconds: int = BACKFILL_SECONDS, background: bool = True,
+                 clock: Callable[[], float] = time.time):
+        """
+        spot maps each symbol to a function returning its current USD price
+        (0 on failure); history(symbol, start, end) returns past
+        (timestamp, price) points, or None to skip backfills. With
+        background=False no refresher thread is started and the caller
+        drives catch_up()/refresh() itself. clock gives the current time.
+        """
+        self.spot = spot
+        self.history = history
+        self.ttl = ttl
+        self.lru_size = lru_size
+        self.max_gap = max_gap
+        self.backfill_seconds = backfill_seconds
+        self.background = background
+        self.clock = clock
+
+        # Own connection: the refresher thread writes through it too
+        self._conn = sqlite3.connect(db.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[Tuple[str, int], float]' = OrderedDict()
+        self._newest: Dict[str, Optional[int]] = {}  # Newest stored minute per symbol
+        self._latest: Dict[str, float] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._caught_up = threading.Event()  # Set once the first catch_up() finishes
+        self._gaps: Dict[str, List[Tuple[int, int]]] = {}  # Ranges backfilled on demand
+
+        self.hits = 0
+        self.misses = 0
+        self.unpriced = 0  # Lookups with no stored or fetchable price near them
+
+    def start(self):
+        """Start the background refresher (idempotent; raises once stopped)"""
+        with self._lock:
+            if self._stopping.is_set():
+                raise RuntimeError("PriceService has been stopped")
+            if self._thread is not None or not self.background:
+                return
+            # Backfill from where the series ended before this process records anything
+            backfill_from = {symbol: self._newest_minute_locked(symbol) for symbol in self.spot}
+            self._thread = threading.Thread(target=self._run, args=(backfill_from,),
+                                            name='price-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher and close the connection (idempotent)"""
+        with self._lock:
+            self._stopping.set()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self, backfill_from: Dict[str, Optional[int]]):
+        self.catch_up(backfill_from)
+        while not self._stopping.wait(self.ttl):
+            for symbol in self.spot:
+                self.refresh(symbol)
+
+    def catch_up(self, backfill_from: Optional[Dict[str, Optional[int]]] = None):
+        """
+        Refresh every spot price, then backfill each series from where it
+        ended (backfill_from: newest minute per symbol, read now by default)
+        """
+        if backfill_from is None:
+            backfill_from = {symbol: self._newest_minute(symbol) for symbol in self.spot}
+        try:
+            for symbol in self.spot:
+                self.refresh(symbol)
+            if self.history is not None:
+                for symbol in self.spot:
+                    end = int(self.clock())
+                    self.backfill(symbol, max(backfill_from[symbol] or 0, end - self.backfill_seconds), end)
+        finally:
+            self._caught_up.set()  # Release lookups waiting on the first catch-up
+
+    def refresh(self, symbol: str) -> float:
+        """Fetch and record the spot price (0 if it could not be fetched)"""
+        self._check_running()
+        try:
+            price = self.spot[symbol]()
+        except Exception as e:
+            print(f"Failed to get {symbol} price: {e}")
+            price = 0
+        if price:
+            self._latest[symbol] = price
+            self.record(symbol, [(self.clock(), price)], source='spot')
+        return price or 0
+
+    def backfill(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """Record history from start (default: the newest stored minute, at most backfill_seconds ago) to end"""
+        self._check_running()
+        end = int(end or self.clock())
+        if start is None:
+            start = max(self._newest_minute(symbol) or 0, end - self.backfill_seconds)
+        if self.history is None or start >= end:
+            return 0
+        points = self.history(symbol, start, end)
+        self.record(symbol, points, source='history')
+        return len(points)
+
+    def record(self, symbol: str, points: Iterable[Tuple[float, float]], source: str = 'spot'):
+        """Store (timestamp, price) points at their minutes"""
+        rows = [(symbol, _minute(timestamp), price, source) for timestamp, price in points]
+        if not rows:
+            return
+
+        with self._lock:
+            newest = self._newest_minute_locked(symbol)
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO price_history (symbol, minute, price_usd, source)
+                VALUES (?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+
+            first = min(row[1] for row in rows)
+            if newest is not None and first <= newest:
+                # Points inside the series can change memoised lookups
+                self._cache.clear()
+            self._newest[symbol] = max([row[1] for row in rows] + ([newest] if newest is not None else []))
+
+    def latest(self, symbol: str) -> float:
+        """Newest known price, without waiting on the network once any price is stored"""
+        self.start()
+        price = self._latest.get(symbol)
+        if price:
+            return price
+
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT price_usd FROM price_history
+                WHERE symbol = ? ORDER BY minute DESC LIMIT 1
+            """, (symbol,)).fetchone()
+        if row:
+            return row[0]
+
+        # Empty series: the one synchronous fetch
+        return self.refresh(symbol)
+
+    def price_at(self, symbol: str, timestamp: Optional[float]) -> float:
+        """
+        USD price of a symbol at a timestamp, by minute
+
+        Returns 0 for a transaction older than max_gap that neither the
+        series nor a history fetch has a price near.
+        """
+        self.start()
+        if not timestamp:
+            return self.latest(symbol)
+
+        minute = _minute(timestamp)
+        price = self._lookup(symbol, minute)
+        if price is not None:
+            return price
+
+        if self._thread is not None and not self._caught_up.is_set():
+            # The startup backfill has not reached the series yet
+            self._caught_up.wait()
+            price = self._lookup(symbol, minute)
+            if price is not None:
+                return price
+
+        if minute >= _minute(self.clock()) - self.max_gap:
+            # Recent enough for the current price
+            return self.latest(symbol)
+
+        if self._backfill_gap(symbol, minute):
+            price = self._lookup(symbol, minute)
+            if price is not None:
+                return price
+
+        self.unpriced += 1
+        return 0
+
+    def _lookup(self, symbol: str, minute: int) -> Optional[float]:
+        """Latest stored price at or before the minute, at most max_gap older (None if none)"""
+        key = (symbol, minute)
+
+        with self._lock:
+            price = self._cache.get(key)
+            if price is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return price
+
+            self.misses += 1
+            row = self._conn.execute("""
+                SELECT minute, price_usd FROM price_history
+                WHERE symbol = ? AND minute <= ?
+                ORDER BY minute DESC LIMIT 1
+            """, (symbol, minute)).fetchone()
+
+            if row is None or minute - row[0] > self.max_gap:
+                return None
+
+            # Minutes past the newest point may still get a closer price
+            newest = self._newest_minute_locked(symbol)
+            if newest is not None and minute <= newest:
+                self._cache[key] = row[1]
+                if len(self._cache) > self.lru_size:
+                    self._cache.popitem(last=False)
+            return row[1]
+
+    def _backfill_gap(self, symbol: str, minute: int) -> bool:
+        """
+        Fetch history around a minute the series does not cover (each range at
+        most once). Returns False if there is nothing new to fetch.
+        """
+        if self.history is None:
+            return False
+        with self._lock:
+            gaps = self._gaps.setdefault(symbol, [])
+            if any(start <= minute <= end for start, end in gaps):
+                return False
+            start, end = minute - self.max_gap, min(minute + self.max_gap, int(self.clock()))
+            gaps.append((start, end))
+        return self.backfill(symbol, start, end) > 0
+
+    def _check_running(self):
+        # The refresher's own calls finish before stop() closes the connection
+        if self._stopping.is_set() and threading.current_thread() is not self._thread:
+            raise RuntimeError("PriceService has been stopped")
+
+    def _newest_minute(self, symbol: str) -> Optional[int]:
+        with self._lock:
+            return self._newest_minute_locked(symbol)
+
+    def _newest_minute_locked(self, symbol: str) -> Optional[int]:
+        if symbol not in self._newest:
+            row = self._conn.execute(
+                "SELECT MAX(minute) FROM price_history WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            self._newest[symbol] = row[0]
+        return self._newest[symbol]
@@ -24,6 +24,7 @@ def run_eth_monitoring(hours: int = 24):
     print("\nScanning recent blocks...")
     block_txs = monitor.scan_large_blocks(num_blocks=100)
 
+    monitor.close()
     monitor.db.close()
 
     return {
@@ -45,6 +46,7 @@ def run_sol_monitoring(limit: int = 500):
     print("\nScanning recent slots...")
     block_txs = monitor.scan_recent_blocks(num_blocks=100)
 
+    monitor.close()
     monitor.db.close()
 
     return {
@@ -62,7 +64,7 @@ def run_cross_chain_analysis(hours: int = 24):
     analyzer = CrossChainCorrelation()
     results = analyzer.analyze_patterns(hours=hours)
 
-    analyzer.db.close()
+    analyzer.close()
 
     return results
 
@@ -90,6 +90,23 @@ CREATE TABLE IF NOT EXISTS whale_alerts (
     FOREIGN KEY (correlation_id) REFERENCES cross_chain_events(id)
 );
 
+-- Block scan progress: per-chain high-water mark (every block up to
+-- last_block has been scanned)
+CREATE TABLE IF NOT EXISTS scan_checkpoints (
+    chain TEXT PRIMARY KEY CHECK(chain IN ('eth', 'sol')),
+    last_block INTEGER NOT NULL,
+    updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+);
+
+-- USD prices by minute (minute = unix timestamp floored to the minute)
+CREATE TABLE IF NOT EXISTS price_history (
+    symbol TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    price_usd REAL NOT NULL,
+    source TEXT,
+    PRIMARY KEY (symbol, minute)
+) WITHOUT ROWID;
+
 -- Create indexes for performance
 CREATE INDEX IF NOT EXISTS idx_whale_wallets_address ON whale_wallets(address);
 CREATE INDEX IF NOT EXISTS idx_whale_wallets_chain ON whale_wallets(chain);
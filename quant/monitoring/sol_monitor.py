@@ -2,12 +2,17 @@
 Solana whale monitor using public RPC APIs
 """
 
+import os
 import requests
+import threading
 import time
 import struct
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
 from datetime import datetime, timedelta
-from database import WhaleDatabase
+from block_scanner import SCAN_MAX_WORKERS, SCAN_SEGMENT_SIZE, BlockRangeScanner, ScanFetchError
+from database import WhaleDatabase, WriteBatch
+from price_service import PriceService, coingecko_history
 import base58
 
 # Solana public RPC endpoints (free)
@@ -17,6 +22,15 @@ RPC_ENDPOINTS = [
     'https://rpc.ankr.com/solana',
 ]
 
+# Calls per JSON-RPC batch request (public endpoints cap batch sizes)
+RPC_BATCH_SIZE = int(os.getenv('SOL_RPC_BATCH_SIZE', 50))
+
+# getBlock errors for slots without a block (skipped, or not in storage)
+SKIPPED_SLOT_ERRORS = (-32007, -32009)
+
+# Result placeholder for batched calls that failed on every endpoint
+_FAILED = object()
+
 # Known Solana DEX and program addresses
 DEX_PROGRAMS = {
     'jupiter': 'JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4',
@@ -37,12 +51,39 @@ INITIAL_WHALES_SOL = [
 class SolanaWhaleMonitor:
     """Monitor Solana whale transactions using public RPC"""
 
-    def __init__(self, rpc_url: Optional[str] = None):
-        self.rpc_url = rpc_url or RPC_ENDPOINTS[0]
-        self.db = WhaleDatabase()
+    def __init__(self, rpc_url: Optional[str] = None, endpoints: Optional[Sequence[str]] = None,
+                 db: Optional[WhaleDatabase] = None, batch_size: int = RPC_BATCH_SIZE,
+                 prices: Optional[PriceService] = None):
+        self.endpoints = list(endpoints or RPC_ENDPOINTS)
+        self.rpc_url = rpc_url or self.endpoints[0]
+        self.db = db or WhaleDatabase()
         self.min_sol_threshold = 1000.0  # Minimum SOL to track
         self.min_usd_threshold = 50_000  # Minimum USD value to track
         self.rpc_index = 0
+        self.batch_size = batch_size
+        # One keep-alive session per endpoint, used by one request at a time,
+        # and one pool sending batches to the endpoints for the monitor's life
+        self._sessions = {url: requests.Session() for url in self.endpoints}
+        self._endpoint_locks = {url: threading.Lock() for url in self.endpoints}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.endpoints), thread_name_prefix='sol-rpc')
+        # USD values use the price at each transaction's time
+        self._owns_prices = prices is None
+        self.prices = prices or PriceService(self.db, {'SOL': lambda: self.get_sol_price()}, coingecko_history)
+
+    def close(self):
+        """Stop the batch request pool, the endpoint sessions and the price refresher this monitor started"""
+        self._executor.shutdown(wait=True)
+        for session in self._sessions.values():
+            session.close()
+        if self._owns_prices:
+            self.prices.stop()
+
+    def _post(self, url: str, payload: Any) -> Any:
+        """POST a JSON-RPC payload over the endpoint's keep-alive session, one request in flight per endpoint"""
+        with self._endpoint_locks[url]:
+            response = self._sessions[url].post(url, json=payload, timeout=30)
+            response.raise_for_status()
+            return response.json()
 
     def _make_rpc_request(self, method: str, params: list = None) -> Optional[Any]:
         """Make RPC request with failover"""
@@ -57,11 +98,9 @@ class SolanaWhaleMonitor:
         }
 
         # Try each endpoint
-        for i, url in enumerate(RPC_ENDPOINTS):
+        for i, url in enumerate(self.endpoints):
             try:
-                response = requests.post(url, json=payload, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+                data = self._post(url, payload)
 
                 if 'error' in data:
                     print(f"RPC Error from {url}: {data['error']}")
@@ -74,6 +113,70 @@ class SolanaWhaleMonitor:
 
         return None
 
+    def _make_rpc_batch_request(self, method: str, params_list: List[list],
+                                failed: Any = None) -> List[Optional[Any]]:
+        """
+        Make one call per params as JSON-RPC batch requests.
+
+        Calls are sent in batches of batch_size from the monitor's pool, and
+        each batch starts on a different endpoint. Each endpoint has at most
+        one request in flight, across all callers (e.g. concurrent scan
+        segments). Calls that fail are retried on the other endpoints;
+        results of calls that fail everywhere are `failed`.
+        """
+        results: List[Optional[Any]] = [failed] * len(params_list)
+        chunks = [range(start, min(start + self.batch_size, len(params_list)))
+                  for start in range(0, len(params_list), self.batch_size)]
+        if not chunks:
+            return results
+
+        futures = [self._executor.submit(self._send_batch, method, params_list, chunk, i)
+                   for i, chunk in enumerate(chunks)]
+        for future in futures:
+            for index, result in future.result().items():
+                results[index] = result
+
+        return results
+
+    def _send_batch(self, method: str, params_list: List[list], indexes: Sequence[int],
+                    first_endpoint: int) -> Dict[int, Any]:
+        """Send one batch with failover; returns results by params index"""
+        results = {}
+        pending = list(indexes)
+
+        for attempt in range(len(self.endpoints)):
+            url = self.endpoints[(first_endpoint + attempt) % len(self.endpoints)]
+            payload = [
+                {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params_list[i]}
+                for i in pending
+            ]
+            try:
+                data = self._post(url, payload)
+            except Exception as e:
+                print(f"RPC batch request failed to {url}: {e}")
+                continue
+
+            # Endpoints that reject the batch answer with a single error
+            if not isinstance(data, list):
+                print(f"RPC Error from {url}: {data.get('error') if isinstance(data, dict) else data}")
+                continue
+
+            for item in data:
+                if item.get('id') not in pending:
+                    continue
+                if 'error' not in item:
+                    results[item['id']] = item.get('result')
+                elif (method == 'getBlock' and isinstance(item['error'], dict)
+                      and item['error'].get('code') in SKIPPED_SLOT_ERRORS):
+                    results[item['id']] = None
+
+            pending = [i for i in pending if i not in results]
+            if not pending:
+                break
+            print(f"RPC Error from {url}: {len(pending)} of {len(payload)} batched calls failed")
+
+        return results
+
     def get_sol_price(self) -> float:
         """Get SOL price via CoinGecko (free, no API key)"""
         try:
@@ -112,6 +215,13 @@ class SolanaWhaleMonitor:
             return result
         return None
 
+    def get_transactions(self, signatures: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get transaction details for many signatures, in batched requests"""
+        return self._make_rpc_batch_request('getTransaction', [
+            [signature, {'encoding': 'jsonParsed', 'maxSupportedTransactionVersion': 0}]
+            for signature in signatures
+        ])
+
     def _parse_transfer_amount(self, instruction: Any) -> tuple[float, str, str]:
         """Parse transfer instruction to get amount, from, to"""
         try:
@@ -209,88 +319,83 @@ class SolanaWhaleMonitor:
         amount_usd = amount_sol * sol_price
         return amount_sol >= self.min_sol_threshold or amount_usd >= self.min_usd_threshold
 
+    def _large_transfer_alert(self, address: str, amount_sol: float, sol_price: float,
+                              protocol: Optional[str], tx_type: str) -> Optional[Dict[str, Any]]:
+        """Alert for very large transfers, or None"""
+        if amount_sol >= 10000 or (amount_sol * sol_price) >= 500_000:
+            return {
+                'alert_type': 'large_transfer',
+                'chain': 'sol',
+                'address': address,
+                'amount': amount_sol,
+                'currency': 'SOL',
+                'description': f'Large transfer: {amount_sol:.2f} SOL (${amount_sol * sol_price:,.0f}) via {protocol or tx_type}',
+            }
+        return None
+
     def monitor_wallet(self, address: str, limit: int = 1000) -> List[Dict[str, Any]]:
         """Monitor a single wallet for whale transactions"""
         print(f"Monitoring SOL wallet: {address}")
 
-        sol_price = self.get_sol_price()
-        if not sol_price:
-            print("Could not get SOL price, using $0")
-            sol_price = 0
-
-        signatures = self.get_signatures_for_address(address, limit=limit)
+        signatures = [sig_info['signature'] for sig_info in self.get_signatures_for_address(address, limit=limit)
+                      if sig_info.get('signature')]
+        txs = self.get_transactions(signatures)
         whale_txs = []
 
-        for sig_info in signatures:
-            signature = sig_info.get('signature')
-            if not signature:
-                continue
-
-            tx = self.get_transaction(signature)
-            if not tx or not tx.get('meta'):
-                continue
-
-            meta = tx['meta']
-            message = tx.get('transaction', {}).get('message', {})
-            instructions = message.get('instructions', [])
+        # One unit of work per wallet: rows are written with executemany and
+        # committed together (tx_data['id'] is filled in when they are flushed)
+        with self.db.batch() as batch:
+            for signature, tx in zip(signatures, txs):
+                if not tx or not tx.get('meta'):
+                    continue
 
-            total_amount = 0
-            from_addr = address
-            to_addr = None
+                meta = tx['meta']
+                message = tx.get('transaction', {}).get('message', {})
+                instructions = message.get('instructions', [])
+                sol_price = self.prices.price_at('SOL', tx.get('blockTime'))
 
-            # Parse all instructions to find transfers
-            for instr in instructions:
-                amount, src, dst = self._parse_transfer_amount(instr)
-                if amount > 0:
-                    total_amount += amount
-                    if src and (not from_addr or src.lower() == address.lower()):
-                        from_addr = src
-                    if dst:
-                        to_addr = dst
+                total_amount = 0
+                from_addr = address
+                to_addr = None
 
-            # Check if this is a whale transaction
-            if total_amount > 0 and self._is_whale_transaction(total_amount, sol_price):
-                tx_type, protocol = self._classify_transaction(tx)
+                # Parse all instructions to find transfers
+                for instr in instructions:
+                    amount, src, dst = self._parse_transfer_amount(instr)
+                    if amount > 0:
+                        total_amount += amount
+                        if src and (not from_addr or src.lower() == address.lower()):
+                            from_addr = src
+                        if dst:
+                            to_addr = dst
 
-                # Get fee
-                fee = meta.get('fee', 0)
+                # Check if this is a whale transaction
+                if total_amount > 0 and self._is_whale_transaction(total_amount, sol_price):
+                    tx_type, protocol = self._classify_transaction(tx)
 
-                tx_data = {
-                    'tx_sig': signature,
-                    'from_address': from_addr,
-                    'to_address': to_addr or address,
-                    'amount_sol': total_amount,
-                    'amount_usd': total_amount * sol_price,
-                    'fee_lamports': fee,
-                    'tx_type': tx_type,
-                    'protocol': protocol,
-                    'slot': tx.get('slot'),
-                    'timestamp': int(tx.get('blockTime', time.time())),
-                }
+                    # Get fee
+                    fee = meta.get('fee', 0)
 
-                # Store in database
-                tx_id = self.db.insert_sol_tx(tx_data)
-                tx_data['id'] = tx_id
-                whale_txs.append(tx_data)
+                    tx_data = {
+                        'tx_sig': signature,
+                        'from_address': from_addr,
+                        'to_address': to_addr or address,
+                        'amount_sol': total_amount,
+                        'amount_usd': total_amount * sol_price,
+                        'fee_lamports': fee,
+                        'tx_type': tx_type,
+                        'protocol': protocol,
+                        'slot': tx.get('slot'),
+                        'timestamp': int(tx.get('blockTime', time.time())),
+                    }
 
-                # Update whale wallet record
-                self.db.insert_whale_wallet(from_addr, 'sol', total_amount * sol_price)
-                if to_addr:
-                    self.db.insert_whale_wallet(to_addr, 'sol', total_amount * sol_price)
-
-                # Generate alert for very large transfers
-                if total_amount >= 10000 or (total_amount * sol_price) >= 500_000:
-                    self.db.insert_whale_alert({
-                        'alert_type': 'large_transfer',
-                        'chain': 'sol',
-                        'address': from_addr,
-                        'amount': total_amount,
-                        'currency': 'SOL',
-                        'description': f'Large transfer: {total_amount:.2f} SOL (${total_amount * sol_price:,.0f}) via {protocol or tx_type}',
-                    })
-
-            # Rate limiting
-            time.sleep(0.1)
+                    # Store the transaction with its whale wallet updates and,
+                    # for very large transfers, an alert
+                    batch.add_sol_tx(
+                        tx_data,
+                        wallets=[(from_addr, total_amount * sol_price), (to_addr, total_amount * sol_price)],
+                        alert=self._large_transfer_alert(from_addr, total_amount, sol_price, protocol, tx_type)
+                    )
+                    whale_txs.append(tx_data)
 
         print(f"  Found {len(whale_txs)} whale transactions")
         return whale_txs
@@ -313,93 +418,111 @@ class SolanaWhaleMonitor:
             'transactions': all_whale_txs,
         }
 
-    def scan_recent_blocks(self, num_blocks: int = 100) -> List[Dict[str, Any]]:
-        """Scan recent blocks for large transactions"""
-        sol_price = self.get_sol_price()
-        if not sol_price:
-            sol_price = 0
-
-        latest_slot = self.get_latest_slot()
-        if not latest_slot:
-            print("Could not get latest slot")
-            return []
-
-        whale_txs = []
-        print(f"Scanning last {num_blocks} slots for large transactions")
-
-        # Scan blocks in batches
-        start_slot = latest_slot
-        for i in range(num_blocks):
-            slot = start_slot - i
-
-            # Get block
-            result = self._make_rpc_request(
-                'getBlock',
-                [slot, {'encoding': 'jsonParsed', 'maxSupportedTransactionVersion': 0, 'transactionsDetails': 'full'}]
-            )
+    def _fetch_slot_segment(self, first: int, last: int) -> List[Optional[Dict[str, Any]]]:
+        """Get the blocks of slots first..last in batched requests (None for skipped slots)"""
+        slots = range(first, last + 1)
+        blocks = self._make_rpc_batch_request('getBlock', [
+            [slot, {'encoding': 'jsonParsed', 'maxSupportedTransactionVersion': 0,
+                    'transactionDetails': 'full', 'rewards': False}]
+            for slot in slots
+        ], failed=_FAILED)
+
+        missing = [slot for slot, block in zip(slots, blocks) if block is _FAILED]
+        if missing:
+            raise ScanFetchError(f"could not fetch {len(missing)} slots from {missing[0]}")
+        return blocks
+
+    def _process_block(self, slot: int, block: Dict[str, Any], batch: WriteBatch,
+                       whale_txs: List[Dict[str, Any]]):
+        """Add a block's whale transactions to the batch, valued at the block time"""
+        sol_price = self.prices.price_at('SOL', block.get('blockTime'))
+
+        for tx in block.get('transactions', []):
+            meta = tx.get('meta', {})
+            message = tx.get('transaction', {}).get('message', {})
 
-            if not result:
+            if not message:
                 continue
 
-            block = result
-            transactions = block.get('transactions', [])
-
-            for tx in transactions:
-                meta = tx.get('meta', {})
-                message = tx.get('transaction', {}).get('message', {})
-
-                if not message:
-                    continue
+            instructions = message.get('instructions', [])
+            total_amount = 0
+            from_addr = None
+            to_addr = None
 
-                instructions = message.get('instructions', [])
-                total_amount = 0
-                from_addr = None
-                to_addr = None
+            # Parse transfers
+            for instr in instructions:
+                amount, src, dst = self._parse_transfer_amount(instr)
+                if amount > 0:
+                    total_amount += amount
+                    if not from_addr:
+                        from_addr = src
+                    if dst:
+                        to_addr = dst
 
-                # Parse transfers
-                for instr in instructions:
-                    amount, src, dst = self._parse_transfer_amount(instr)
-                    if amount > 0:
-                        total_amount += amount
-                        if not from_addr:
-                            from_addr = src
-                        if dst:
-                            to_addr = dst
+            # Check whale criteria
+            if total_amount > 0 and self._is_whale_transaction(total_amount, sol_price):
+                tx_type, protocol = self._classify_transaction(tx)
+                fee = meta.get('fee', 0)
+                signature = tx.get('transaction', {}).get('signatures', [''])[0]
 
-                # Check whale criteria
-                if total_amount > 0 and self._is_whale_transaction(total_amount, sol_price):
-                    tx_type, protocol = self._classify_transaction(tx)
-                    fee = meta.get('fee', 0)
-                    signature = tx.get('transaction', {}).get('signatures', [''])[0]
+                tx_data = {
+                    'tx_sig': signature,
+                    'from_address': from_addr or 'unknown',
+                    'to_address': to_addr or 'unknown',
+                    'amount_sol': total_amount,
+                    'amount_usd': total_amount * sol_price,
+                    'fee_lamports': fee,
+                    'tx_type': tx_type,
+                    'protocol': protocol,
+                    'slot': slot,
+                    'timestamp': int(block.get('blockTime') or time.time()),
+                }
 
-                    tx_data = {
-                        'tx_sig': signature,
-                        'from_address': from_addr or 'unknown',
-                        'to_address': to_addr or 'unknown',
-                        'amount_sol': total_amount,
-                        'amount_usd': total_amount * sol_price,
-                        'fee_lamports': fee,
-                        'tx_type': tx_type,
-                        'protocol': protocol,
-                        'slot': slot,
-                        'timestamp': int(block.get('blockTime', time.time())),
-                    }
+                batch.add_sol_tx(
+                    tx_data,
+                    wallets=[(from_addr, total_amount * sol_price), (to_addr, total_amount * sol_price)]
+                )
+                whale_txs.append(tx_data)
 
-                    tx_id = self.db.insert_sol_tx(tx_data)
-                    tx_data['id'] = tx_id
-                    whale_txs.append(tx_data)
+    def scan_slot_range(self, start: Optional[int] = None, end: Optional[int] = None,
+                        num_blocks: int = 100, segment_size: int = SCAN_SEGMENT_SIZE,
+                        max_workers: int = SCAN_MAX_WORKERS) -> Dict[str, Any]:
+        """
+        Scan a slot range for large transactions, fetching segments concurrently.
 
-                    # Update whale wallets
-                    if from_addr:
-                        self.db.insert_whale_wallet(from_addr, 'sol', total_amount * sol_price)
-                    if to_addr:
-                        self.db.insert_whale_wallet(to_addr, 'sol', total_amount * sol_price)
+        Without start, scans from the slot after the checkpoint (or the last
+        num_blocks slots on the first run) up to end (default: latest slot).
+        Returns the scanner stats plus the whale transactions found.
+        """
+        whale_txs = []
+        scanner = BlockRangeScanner(
+            self.db, 'sol', self._fetch_slot_segment,
+            lambda slot, block, batch: self._process_block(slot, block, batch, whale_txs),
+            segment_size, max_workers
+        )
 
-            time.sleep(0.05)  # Rate limiting
+        if end is None:
+            end = self.get_latest_slot()
+            if not end:
+                print("Could not get latest slot")
+                return {'blocks': 0, 'complete': False, 'transactions': []}
+        if start is None:
+            planned = scanner.plan(end, num_blocks)
+            if planned is None:
+                print("No new slots to scan")
+                return {'blocks': 0, 'complete': True, 'transactions': []}
+            start = planned[0]
+
+        print(f"Scanning slots {start}-{end} for large transactions")
+        stats = scanner.scan(start, end)
 
         print(f"  Found {len(whale_txs)} whale transactions in block scan")
-        return whale_txs
+        stats['transactions'] = whale_txs
+        return stats
 
+    def scan_recent_blocks(self, num_blocks: int = 100) -> List[Dict[str, Any]]:
+        """Scan slots since the last scan (first run: the last num_blocks) for large transactions"""
+        return self.scan_slot_range(num_blocks=num_blocks)['transactions']
 
 if __name__ == '__main__':
     # Test the monitor
@@ -423,4 +546,5 @@ if __name__ == '__main__':
     for key, value in stats.items():
         print(f"  {key}: {value}")
 
+    monitor.close()
     monitor.db.close()
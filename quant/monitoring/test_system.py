@@ -3,8 +3,11 @@
 Test script for cross-chain whale monitoring - without external APIs
 """
 
+import os
+import tempfile
 import time
 from database import WhaleDatabase
+from price_service import PriceService
 
 
 def test_database():
@@ -123,6 +126,7 @@ def test_schema():
         'sol_whale_txs',
         'cross_chain_events',
         'whale_alerts',
+        'scan_checkpoints',
     ]
 
     print(f"  Tables created: {len(tables)}")
@@ -142,6 +146,362 @@ def test_schema():
         return False
 
 
+def test_batch_writes():
+    """Test batched unit-of-work writes"""
+    print("Testing batched writes...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = WhaleDatabase(os.path.join(tmp_dir, 'batch.db'))
+        whale = '0x' + '3' * 40
+
+        def eth_tx(i):
+            return {
+                'tx_hash': f'0xbatch{i:060d}',
+                'from_address': whale,
+                'to_address': '0x' + '4' * 40,
+                'value_eth': 150.0,
+                'value_usd': 300_000,
+                'tx_type': 'transfer',
+                'block_number': 20_000_000 + i,
+                'timestamp': int(time.time()) - 60,
+            }
+
+        alert = {
+            'alert_type': 'large_transfer',
+            'chain': 'eth',
+            'address': whale,
+            'amount': 150.0,
+            'currency': 'ETH',
+            'description': 'Large transfer: 150.00 ETH ($300,000)',
+        }
+
+        txs = [eth_tx(i) for i in range(10)]
+        with db.batch(max_rows=1000, max_seconds=60) as batch:
+            for tx in txs:
+                batch.add_eth_tx(tx, wallets=[(whale, 300_000), (tx['to_address'], 300_000)], alert=alert)
+            # Nothing is written until the batch is flushed
+            assert db.get_stats()['eth_whale_txs'] == 0
+            assert batch.pending == 40
+
+        stats = db.get_stats()
+        assert stats['eth_whale_txs'] == 10
+        assert stats['whale_wallets'] == 2
+        assert stats['whale_alerts'] == 10
+        assert batch.commits == 1
+        assert all(tx['id'] for tx in txs)
+        print(f"  Wrote {batch.rows_written} rows in {batch.commits} commit")
+
+        # Upserts of the same wallet are merged into one row per batch
+        wallet = [w for w in db.get_whale_wallets(chain='eth') if w['address'] == whale][0]
+        assert wallet['tx_count'] == 10
+        assert wallet['total_tx_value'] == 3_000_000
+
+        # Re-adding stored transactions skips them and their wallet updates
+        with db.batch() as batch:
+            for tx in [eth_tx(i) for i in range(5, 15)]:
+                batch.add_eth_tx(tx, wallets=[(whale, 300_000)])
+        wallet = [w for w in db.get_whale_wallets(chain='eth') if w['address'] == whale][0]
+        assert db.get_stats()['eth_whale_txs'] == 15
+        assert wallet['tx_count'] == 15
+        print("  Duplicate transactions skipped")
+
+        # Size-based flush
+        with db.batch(max_rows=4) as batch:
+            for i in range(15, 23):
+                batch.add_eth_tx(eth_tx(i), wallets=[(whale, 1)])
+            assert batch.commits == 4
+        assert db.get_stats()['eth_whale_txs'] == 23
+
+        # Unflushed rows are discarded when the unit of work fails
+        try:
+            with db.batch() as batch:
+                batch.add_eth_tx(eth_tx(99), wallets=[(whale, 1)])
+                raise RuntimeError('scan failed')
+        except RuntimeError:
+            pass
+        assert db.get_stats()['eth_whale_txs'] == 23
+
+        db.close()
+
+    print("\n✓ Batched write test passed!")
+    return True
+
+
+def test_async_etherscan_client():
+    """Test concurrent wallet monitoring against the mock Etherscan API"""
+    from eth_monitor import EthereumWhaleMonitor
+    from etherscan_client import TokenBucket
+    from mock_etherscan import MockEtherscan
+
+    print("Testing async Etherscan client...")
+
+    rate = 20
+    mock = MockEtherscan(rate=rate, latency=0.05, txs_per_address=10)
+    base_url = mock.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = WhaleDatabase(os.path.join(tmp_dir, 'async.db'))
+            prices = PriceService(db, {'ETH': lambda: 3000.0})
+            monitor = EthereumWhaleMonitor(api_key='test', base_url=base_url, db=db, prices=prices)
+            monitor.rate_limiter = TokenBucket(rate)
+
+            addresses = ['0x' + f'{i:040x}' for i in range(1, 21)]
+            started = time.perf_counter()
+            results = monitor.monitor_whales(addresses, lookback_hours=24)
+            elapsed = time.perf_counter() - started
+
+            # Latest block + one txlist per wallet, each behind a token, none
+            # over the mock's quota, several in flight at once
+            calls = len(addresses) + 1
+            assert mock.requests == calls
+            assert monitor.rate_limiter.issued == calls
+            assert mock.rate_limited == 0
+            assert mock.max_concurrent > 1
+            # Tokens after the first are paced at the rate (no upper bound:
+            # a slow machine only takes longer)
+            assert elapsed >= 0.9 * (calls - 1) / rate
+
+            # Every other mock transaction is whale-sized
+            assert results['wallets_monitored'] == len(addresses)
+            assert results['whale_transactions'] == len(addresses) * 5
+            assert db.get_stats()['eth_whale_txs'] == len(addresses) * 5
+            print(f"  {calls} calls in {elapsed:.2f}s at {rate} calls/s, "
+                  f"up to {mock.max_concurrent} in flight")
+
+            prices.stop()
+            db.close()
+    finally:
+        mock.stop()
+
+    print("\n✓ Async Etherscan client test passed!")
+    return True
+
+
+def test_solana_batch_rpc():
+    """Test batched JSON-RPC transaction fetching against mock Solana endpoints"""
+    from mock_solana_rpc import MockSolanaRpc
+    from sol_monitor import SolanaWhaleMonitor
+
+    print("Testing batched Solana RPC...")
+
+    # Two healthy endpoints and one that rejects batches of this size
+    mocks = [MockSolanaRpc(), MockSolanaRpc(), MockSolanaRpc(max_batch_size=10)]
+    endpoints = [mock.start() for mock in mocks]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = WhaleDatabase(os.path.join(tmp_dir, 'sol.db'))
+            prices = PriceService(db, {'SOL': lambda: 150.0})
+            monitor = SolanaWhaleMonitor(endpoints=endpoints, db=db, batch_size=50, prices=prices)
+
+            address = 'whale' + '1' * 39
+            started = time.perf_counter()
+            whale_txs = monitor.monitor_wallet(address, limit=1000)
+            elapsed = time.perf_counter() - started
+
+            # Every transaction was fetched despite the rejecting endpoint
+            expected = sum(
+                1 for i in range(1000)
+                if mocks[0].transaction(mocks[0].signature(address, i))['transaction']['message']
+                ['instructions'][0]['parsed']['info']['lamports'] >= monitor.min_sol_threshold * 1e9
+            )
+            assert expected > 0
+            assert len(whale_txs) == expected
+            assert db.get_stats()['sol_whale_txs'] == expected
+
+            # 1000 signatures in batches of 50, spread over the healthy endpoints
+            healthy = mocks[0].requests + mocks[1].requests
+            assert healthy == 1 + 1000 // 50
+            assert mocks[0].requests > 1 and mocks[1].requests > 1
+            assert mocks[0].max_batch == 50
+            # Never more than one batch in flight per endpoint
+            assert all(mock.max_concurrent == 1 for mock in mocks)
+            print(f"  1000 transactions in {healthy + mocks[2].requests} requests, {elapsed:.2f}s")
+
+            monitor.close()
+            prices.stop()
+            db.close()
+    finally:
+        for mock in mocks:
+            mock.stop()
+
+    print("\n✓ Batched Solana RPC test passed!")
+    return True
+
+
+def test_block_range_scanner():
+    """Test checkpointed parallel block scans against the mock endpoints"""
+    from eth_monitor import EthereumWhaleMonitor
+    from etherscan_client import TokenBucket
+    from mock_etherscan import MockEtherscan
+    from mock_solana_rpc import MockSolanaRpc
+    from sol_monitor import SolanaWhaleMonitor
+
+    print("Testing block range scanner...")
+
+    sol_mock = MockSolanaRpc(latency=0.02)
+    eth_mock = MockEtherscan(rate=100, latency=0.02)
+    sol_url, eth_url = sol_mock.start(), eth_mock.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = WhaleDatabase(os.path.join(tmp_dir, 'scan.db'))
+            prices = PriceService(db, {'SOL': lambda: 150.0, 'ETH': lambda: 3000.0})
+            monitor = SolanaWhaleMonitor(endpoints=[sol_url], db=db, batch_size=10, prices=prices)
+
+            def expected_whales(first, last):
+                return sum(
+                    1 for slot in range(first, last + 1) if not sol_mock.is_skipped(slot)
+                    for tx in sol_mock.block(slot)['transactions']
+                    if monitor._is_whale_transaction(
+                        tx['transaction']['message']['instructions'][0]['parsed']['info']['lamports'] / 1e9, 150.0)
+                )
+
+            latest = sol_mock.latest_slot
+            first = latest - 199
+
+            # The first run scans the last 200 slots but fails partway through
+            sol_mock.fail_from = latest - 100
+            stats = monitor.scan_slot_range(num_blocks=200, segment_size=20, max_workers=4)
+            assert not stats['complete']
+            checkpoint = db.get_scan_checkpoint('sol')
+            assert checkpoint == first + stats['blocks'] - 1 < latest - 100
+            assert db.get_stats()['sol_whale_txs'] == expected_whales(first, checkpoint)
+
+            # The next run resumes after the checkpoint
+            sol_mock.fail_from = None
+            stats = monitor.scan_slot_range(num_blocks=200, segment_size=20, max_workers=4)
+            assert stats['complete'] and stats['start'] == checkpoint + 1
+            assert db.get_scan_checkpoint('sol') == latest
+            assert db.get_stats()['sol_whale_txs'] == expected_whales(first, latest)
+
+            # Later runs only scan new slots
+            sol_mock.latest_slot += 50
+            stats = monitor.scan_slot_range(num_blocks=200, segment_size=20, max_workers=4)
+            assert stats['blocks'] == 50
+            assert db.get_stats()['sol_whale_txs'] == expected_whales(first, latest + 50)
+            assert monitor.scan_slot_range()['blocks'] == 0
+            # Concurrent segments still share the endpoint one request at a time
+            assert sol_mock.max_concurrent == 1
+            print(f"  SOL: {stats['blocks_per_sec']:.0f} slots/s")
+            monitor.close()
+
+            # ETH block scans share the scanner and checkpoint table
+            eth_monitor = EthereumWhaleMonitor(api_key='test', base_url=eth_url, db=db, prices=prices)
+            eth_monitor.rate_limiter = TokenBucket(100)
+            stats = eth_monitor.scan_block_range(num_blocks=40, segment_size=5)
+            assert stats['complete'] and len(stats['transactions']) == 40
+            assert db.get_scan_checkpoint('eth') == eth_mock.latest_block
+            eth_mock.latest_block += 10
+            assert eth_monitor.scan_block_range(num_blocks=40)['blocks'] == 10
+
+            prices.stop()
+            db.close()
+    finally:
+        sol_mock.stop()
+        eth_mock.stop()
+
+    print("\n✓ Block range scanner test passed!")
+    return True
+
+
+def test_price_service():
+    """Test minute-level price lookups, catch-up backfills and refreshes"""
+    print("Testing price service...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = WhaleDatabase(os.path.join(tmp_dir, 'prices.db'))
+        now = int(time.time()) // 60 * 60 + 30
+        hour_ago = now // 60 * 60 - 3600
+
+        # History: one point every 5 minutes, 1 dollar apart, going back 3 days
+        history_calls = []
+
+        def history(symbol, start, end):
+            history_calls.append((symbol, start, end))
+            first = hour_ago - (hour_ago - max(start, now - 3 * 86400)) // 300 * 300
+            return [(t, 2000.0 + (t - hour_ago) / 300) for t in range(first, min(end, now - 60), 300)]
+
+        spot_calls = []
+
+        def spot():
+            spot_calls.append(now)
+            return 2500.0 + len(spot_calls)
+
+        # Driven by hand at a fixed time; no refresher thread
+        prices = PriceService(db, {'ETH': spot}, history=history, background=False, clock=lambda: now)
+
+        # Catching up refreshes the spot price, then backfills the empty series
+        prices.catch_up()
+        assert spot_calls == [now]
+        assert history_calls == [('ETH', now - prices.backfill_seconds, now)]
+        assert prices.latest('ETH') == 2501.0
+
+        # Transactions are valued at the latest point at or before their minute
+        assert prices.price_at('ETH', hour_ago + 30) == 2000.0
+        assert prices.price_at('ETH', hour_ago + 299) == 2000.0
+        assert prices.price_at('ETH', hour_ago + 600) == 2002.0
+        assert prices.price_at('ETH', hour_ago + 610) == 2002.0
+        assert prices.price_at('ETH', now) == 2501.0
+
+        # Repeated lookups are served from the LRU
+        misses = prices.misses
+        for _ in range(100):
+            prices.price_at('ETH', hour_ago + 610)
+        assert prices.misses == misses and prices.hits >= 100
+
+        # Older than the series: the hour around the minute is backfilled once
+        old = hour_ago - 29 * 3600
+        assert prices.price_at('ETH', old + 30) == 2000.0 - 29 * 12
+        assert history_calls[-1] == ('ETH', old - prices.max_gap, old + prices.max_gap)
+        assert prices.price_at('ETH', old + 600) == 2000.0 - 29 * 12 + 2
+        assert len(history_calls) == 2
+
+        # Older than any history: unpriced, never today's price
+        ancient = hour_ago - 4 * 86400
+        assert prices.price_at('ETH', ancient) == 0
+        assert prices.price_at('ETH', ancient + 60) == 0
+        assert len(history_calls) == 3 and prices.unpriced == 2
+
+        # A refresh replaces the latest price and its minute in the series
+        assert prices.refresh('ETH') == 2502.0
+        assert prices.latest('ETH') == 2502.0
+        assert prices.price_at('ETH', now) == 2502.0
+        assert len(spot_calls) == 2
+        stored = db.conn.execute("SELECT COUNT(*) FROM price_history WHERE source = 'spot'").fetchone()[0]
+        assert stored == 1
+        print(f"  {len(spot_calls)} refreshes, {prices.hits} cache hits, {prices.misses} misses")
+
+        # A stopped service refuses lookups instead of restarting its refresher
+        prices.stop()
+        try:
+            prices.price_at('ETH', hour_ago)
+            assert False, "lookup after stop() succeeded"
+        except RuntimeError:
+            pass
+        prices.stop()
+        db.close()
+
+        # Startup: the first lookups wait for the refresher's backfill instead
+        # of taking the spot price (the slow fetch makes the race likely)
+        db = WhaleDatabase(os.path.join(tmp_dir, 'startup.db'))
+
+        def slow_history(symbol, start, end):
+            time.sleep(0.1)
+            return history(symbol, start, end)
+
+        prices = PriceService(db, {'ETH': lambda: 3000.0}, history=slow_history, clock=lambda: now)
+        six_hours_ago = hour_ago - 5 * 3600
+        assert prices.price_at('ETH', six_hours_ago + 30) == 2000.0 - 5 * 12
+        assert prices.price_at('ETH', now) == 3000.0
+        prices.stop()
+        db.close()
+
+    print("\n✓ Price service test passed!")
+    return True
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("CROSS-CHAIN WHALE MONITORING - TEST SUITE")
@@ -158,6 +518,36 @@ if __name__ == '__main__':
     if not test_database():
         exit(1)
 
+    print()
+
+    # Test 3: Batched writes
+    if not test_batch_writes():
+        exit(1)
+
+    print()
+
+    # Test 4: Async Etherscan client
+    if not test_async_etherscan_client():
+        exit(1)
+
+    print()
+
+    # Test 5: Batched Solana RPC
+    if not test_solana_batch_rpc():
+        exit(1)
+
+    print()
+
+    # Test 6: Block range scanner
+    if not test_block_range_scanner():
+        exit(1)
+
+    print()
+
+    # Test 7: Price service
+    if not test_price_service():
+        exit(1)
+
     print()
     print("=" * 60)
     print("ALL TESTS PASSED ✓")
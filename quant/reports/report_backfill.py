@@ -0,0 +1,310 @@
+"""
+Historical Report Backfill
+
+Regenerates daily confidence reports for a date range from the
+smart_money_confidence score history, as they would have looked at the end
+of each day (UTC).
+
+History is processed as daily partitions. The state carried from one day to
+the next is, per wallet, the last score calculated so far plus the one
+before it (enough for the summary, rankings and alerts). After each complete
+day that state is cached as a snapshot, so:
+
+- a day is rendered from the previous day's snapshot plus that day's rows,
+  without replaying earlier history;
+- re-running one day reads one snapshot and one day of rows, and leaves
+  every other day's report and snapshot alone;
+- days whose report and snapshot already exist are skipped unless forced.
+
+Without a usable snapshot the state is seeded from history with one
+windowed query. A snapshot is only used if the history before its day end
+still has the same row count and last id, so rows inserted into the past
+invalidate it.
+
+Usage:
+    python reports/report_backfill.py 2026-09-01 2026-09-30
+"""
+
+import calendar
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from signals.smart_money_confidence import (
+    SECONDS_PER_DAY,
+    ConfidenceScore,
+    ScoreCategory,
+    build_confidence_alert,
+    get_connection_pool,
+    window_start
+)
+from reports.smart_money_confidence_report import ConfidenceReportGenerator
+
+
+CACHE_DIR = '.backfill'
+
+# Per-wallet state: the history row of the latest score, then the previous
+# score and when it was calculated (None before a wallet's second score)
+STATE_COLUMNS = (
+    'id', 'calculated_at', 'overall_score', 'win_rate_score',
+    'trade_count_score', 'avg_notional_score', 'consistency_score',
+    'market_timing_score', 'category', 'trend'
+)
+PREVIOUS_SCORE = len(STATE_COLUMNS)
+PREVIOUS_CALCULATED_AT = PREVIOUS_SCORE + 1
+
+HISTORY_SELECT = 'wallet_address, ' + ', '.join(STATE_COLUMNS)
+
+WalletState = Dict[str, list]
+
+
+def day_bounds(day: date) -> Tuple[int, int]:
+    """Unix timestamps of the start and end of a UTC day."""
+    start = calendar.timegm(day.timetuple())
+    return start, start + SECONDS_PER_DAY
+
+
+class ReportBackfill:
+    """Render historical daily reports from score history, one day at a time."""
+
+    def __init__(self, db_path: str = 'quant/data/trading.db',
+                 output_dir: str = 'quant/reports',
+                 alert_threshold: float = 90.0,
+                 alert_drop_threshold: float = 10.0,
+                 alert_days: int = 7):
+        """
+        Initialize the backfill.
+
+        Args:
+            db_path: Path to SQLite database
+            output_dir: Directory for reports (snapshots go in CACHE_DIR under it)
+            alert_threshold: Minimum score of wallets that can raise alerts
+            alert_drop_threshold: Minimum drop that raises an alert
+            alert_days: Only compare scores calculated in the N days before
+                the end of the report day
+        """
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.cache_dir = os.path.join(output_dir, CACHE_DIR)
+        self.alert_threshold = alert_threshold
+        self.alert_drop_threshold = alert_drop_threshold
+        self.alert_days = alert_days
+        self.generator = ConfidenceReportGenerator(db_path)
+
+    def report_path(self, day: date) -> str:
+        """Path of a day's report (same name as the daily report)."""
+        return os.path.join(self.output_dir, f"smart_money_confidence_{day.strftime('%Y%m%d')}.md")
+
+    def _snapshot_path(self, day: date) -> str:
+        return os.path.join(self.cache_dir, f"state-{day.strftime('%Y%m%d')}.json.gz")
+
+    def run(self, start: date, end: date, force: bool = False) -> List[str]:
+        """
+        Generate reports for every day from start to end (inclusive).
+
+        Args:
+            start: First day
+            end: Last day (clamped to today)
+            force: Regenerate days whose report and snapshot already exist
+
+        Returns:
+            Paths of the reports written
+        """
+        end = min(end, datetime.utcnow().date())
+        if start > end:
+            return []
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        written = []
+
+        pool = get_connection_pool(self.db_path, readonly=True)
+        with pool.connection() as conn:
+            # One read transaction, so every day comes from the same history
+            conn.execute("BEGIN")
+            try:
+                state: Optional[WalletState] = None
+                rows = max_id = 0
+                day = start
+
+                while day <= end:
+                    day_start, day_end = day_bounds(day)
+                    complete = day_end <= time.time()
+
+                    if (not force and complete and os.path.exists(self.report_path(day))
+                            and os.path.exists(self._snapshot_path(day))):
+                        state = None  # Picked up from this day's snapshot if needed
+                        day += timedelta(days=1)
+                        continue
+
+                    began = time.perf_counter()
+                    if state is None:
+                        state, rows, max_id = self._load_state(conn, day - timedelta(days=1), day_start)
+
+                    day_rows, day_max_id = self._fold(conn.execute(f"""
+                        SELECT {HISTORY_SELECT}
+                        FROM smart_money_confidence
+                        WHERE calculated_at >= ? AND calculated_at < ?
+                        ORDER BY calculated_at, id
+                    """, (day_start, day_end)), state)
+                    rows += day_rows
+                    max_id = max(max_id, day_max_id)
+
+                    if complete:
+                        self._save_snapshot(day, state, rows, max_id)
+
+                    written.append(self._render(day, state))
+                    print(f"  {day.isoformat()}: {len(state)} wallets, "
+                          f"{day_rows} new scores ({time.perf_counter() - began:.2f}s)")
+
+                    day += timedelta(days=1)
+            finally:
+                conn.rollback()
+
+        return written
+
+    def _load_state(self, conn: sqlite3.Connection, day: date,
+                    day_end: int) -> Tuple[WalletState, int, int]:
+        """
+        State at the end of a day, from its snapshot or else from history.
+
+        Returns:
+            (state, history rows up to day_end, last history id up to day_end)
+        """
+        rows, max_id = conn.execute("""
+            SELECT COUNT(*), COALESCE(MAX(id), 0)
+            FROM smart_money_confidence
+            WHERE calculated_at < ?
+        """, (day_end,)).fetchone()
+
+        try:
+            with gzip.open(self._snapshot_path(day), 'rt') as f:
+                snapshot = json.load(f)
+            if snapshot['rows'] == rows and snapshot['max_id'] == max_id:
+                return snapshot['wallets'], rows, max_id
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+        # Seed from the last two scores of each wallet before day_end
+        state: WalletState = {}
+        self._fold(conn.execute(f"""
+            SELECT {HISTORY_SELECT}
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY wallet_address
+                    ORDER BY calculated_at DESC, id DESC
+                ) AS recency
+                FROM smart_money_confidence
+                WHERE calculated_at < ?
+            )
+            WHERE recency <= 2
+            ORDER BY calculated_at, id
+        """, (day_end,)), state)
+        return state, rows, max_id
+
+    @staticmethod
+    def _fold(cursor: sqlite3.Cursor, state: WalletState) -> Tuple[int, int]:
+        """
+        Apply history rows (in calculation order) to the state.
+
+        Returns:
+            (rows applied, last id applied or 0)
+        """
+        count = max_id = 0
+        for row in cursor:
+            row = tuple(row)
+            wallet_address = row[0]
+            previous = state.get(wallet_address)
+            state[wallet_address] = list(row[1:]) + (
+                [previous[2], previous[1]] if previous is not None else [None, None]
+            )
+            count += 1
+            max_id = max(max_id, row[1])
+        return count, max_id
+
+    def _save_snapshot(self, day: date, state: WalletState, rows: int, max_id: int) -> None:
+        path = self._snapshot_path(day)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        # json.dumps (unlike json.dump) encodes in C, several times faster
+        payload = json.dumps({'day': day.isoformat(), 'rows': rows, 'max_id': max_id,
+                              'wallets': state}, separators=(',', ':'))
+        with gzip.open(tmp_path, 'wt', compresslevel=1) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _render(self, day: date, state: WalletState) -> str:
+        """Write a day's report from the state at its end."""
+        _, day_end = day_bounds(day)
+        since = window_start(self.alert_days, now=day_end)
+
+        scores = []
+        alerts = []
+        for wallet_address, wallet in state.items():
+            scores.append(ConfidenceScore(
+                wallet_address=wallet_address,
+                overall_score=wallet[2],
+                win_rate_score=wallet[3],
+                trade_count_score=wallet[4],
+                avg_notional_score=wallet[5],
+                consistency_score=wallet[6],
+                market_timing_score=wallet[7],
+                category=ScoreCategory(wallet[8]),
+                calculated_at=datetime.fromtimestamp(wallet[1]),
+                trend=wallet[9]
+            ))
+
+            # Same rule as get_confidence_alerts, evaluated at the day end
+            previous_score = wallet[PREVIOUS_SCORE]
+            if (previous_score is not None
+                    and wallet[2] >= self.alert_threshold and wallet[9] == 'down'
+                    and wallet[1] >= since and wallet[PREVIOUS_CALCULATED_AT] >= since
+                    and previous_score - wallet[2] >= self.alert_drop_threshold):
+                alerts.append(build_confidence_alert(wallet_address, previous_score, wallet[2]))
+
+        scores.sort(key=lambda s: (s.overall_score, s.wallet_address), reverse=True)
+        alerts.sort(key=lambda a: (a['previous_score'] - a['current_score'], a['wallet_address']), reverse=True)
+
+        self.generator.report_date = datetime.utcfromtimestamp(day_end - 1)
+        path = self.report_path(day)
+        self.generator.render_report(scores, alerts, path)
+        return path
+
+
+def backfill_reports(start: date, end: date,
+                     output_dir: str = 'quant/reports',
+                     db_path: str = 'quant/data/trading.db',
+                     force: bool = False) -> List[str]:
+    """
+    Generate historical daily reports.
+
+    Args:
+        start: First day
+        end: Last day (inclusive)
+        output_dir: Directory to save reports
+        db_path: Path to database
+        force: Regenerate days that were already backfilled
+
+    Returns:
+        Paths of the reports written
+    """
+    return ReportBackfill(db_path, output_dir).run(start, end, force)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("Usage: python reports/report_backfill.py START END [--force]")
+        sys.exit(1)
+
+    paths = backfill_reports(
+        date.fromisoformat(sys.argv[1]),
+        date.fromisoformat(sys.argv[2]),
+        force='--force' in sys.argv[3:]
+    )
+    print(f"Generated {len(paths)} reports")
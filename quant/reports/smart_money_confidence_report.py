@@ -10,11 +10,17 @@ Report Contents:
 - Recent score changes
 - Confidence trends
 - Alerts for declining elite wallets
+
+The latest score of every wallet is read once (already ordered by score) and
+folded into a ReportAggregates in a single pass; each section only formats
+its pre-computed view, so the report scales to the full wallet set.
 """
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+import heapq
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import sys
 
 # Add parent directory to path for imports
@@ -27,6 +33,108 @@ from signals.smart_money_confidence import (
 )
 
 
+TOP_N = 5  # Rows in each "top" table
+
+# Component columns with a "top performers" table, in report order
+TOP_COMPONENTS = (
+    'win_rate_score',
+    'consistency_score',
+    'market_timing_score',
+    'trade_count_score',
+)
+
+
+@dataclass
+class ReportAggregates:
+    """
+    Everything the report sections need, computed in one pass.
+
+    Built from scores ordered by overall score (highest first), so every list
+    view below is already in ranking order and never re-sorted.
+    """
+    total: int = 0
+    category_counts: Dict[str, int] = field(default_factory=dict)
+    trend_counts: Dict[str, int] = field(default_factory=lambda: {'up': 0, 'down': 0, 'neutral': 0})
+    sums: Dict[str, float] = field(default_factory=dict)
+
+    # Per-category views (score order) and sums for the category averages
+    by_category: Dict[ScoreCategory, List[ConfidenceScore]] = field(default_factory=dict)
+    category_score_sums: Dict[ScoreCategory, float] = field(default_factory=dict)
+    category_trade_sums: Dict[ScoreCategory, float] = field(default_factory=dict)
+
+    trending_up: List[ConfidenceScore] = field(default_factory=list)
+    trending_down: List[ConfidenceScore] = field(default_factory=list)
+    near_elite: List[ConfidenceScore] = field(default_factory=list)
+    at_risk: List[Tuple[str, ConfidenceScore]] = field(default_factory=list)
+
+    # Component -> TOP_N highest scores on that component
+    top_components: Dict[str, List[ConfidenceScore]] = field(default_factory=dict)
+
+    @classmethod
+    def from_scores(cls, scores: List[ConfidenceScore]) -> 'ReportAggregates':
+        """
+        Aggregate scores for the report.
+
+        Args:
+            scores: Latest scores, highest overall score first
+
+        Returns:
+            ReportAggregates
+        """
+        aggregates = cls(total=len(scores))
+        aggregates.by_category = {category: [] for category in ScoreCategory}
+        aggregates.category_score_sums = {category: 0.0 for category in ScoreCategory}
+        aggregates.category_trade_sums = {category: 0.0 for category in ScoreCategory}
+
+        overall_sum = win_rate_sum = consistency_sum = 0.0
+
+        for score in scores:
+            category = score.category
+            aggregates.by_category[category].append(score)
+            aggregates.category_score_sums[category] += score.overall_score
+            aggregates.category_trade_sums[category] += score.trade_count_score
+
+            overall_sum += score.overall_score
+            win_rate_sum += score.win_rate_score
+            consistency_sum += score.consistency_score
+
+            trend = score.trend
+            aggregates.trend_counts[trend] = aggregates.trend_counts.get(trend, 0) + 1
+
+            if trend == 'up':
+                aggregates.trending_up.append(score)
+                if 85 <= score.overall_score < 90:
+                    aggregates.near_elite.append(score)
+            elif trend == 'down':
+                aggregates.trending_down.append(score)
+                if category == ScoreCategory.ELITE:
+                    aggregates.at_risk.append(('Elite', score))
+                elif category == ScoreCategory.STRONG:
+                    aggregates.at_risk.append(('Strong', score))
+
+        aggregates.category_counts = {
+            category.value: len(cat_scores)
+            for category, cat_scores in aggregates.by_category.items()
+        }
+        aggregates.sums = {
+            'overall_score': overall_sum,
+            'win_rate_score': win_rate_sum,
+            'consistency_score': consistency_sum,
+        }
+
+        # Heap selection: O(n log k) per component instead of a full sort
+        for component in TOP_COMPONENTS:
+            aggregates.top_components[component] = heapq.nlargest(
+                TOP_N, scores, key=lambda s, c=component: getattr(s, c)
+            )
+
+        return aggregates
+
+    def average(self, column: str) -> float:
+        """Mean of a summed column over all wallets."""
+        return self.sums[column] / self.total if self.total else 0.0
+
+
 class ConfidenceReportGenerator:
     """Generate markdown reports for Smart Money Confidence Scores."""
 
@@ -51,12 +159,36 @@ class ConfidenceReportGenerator:
         Returns:
             Markdown report content
         """
-        # Get latest scores
-        all_scores = self.calculator.get_latest_confidence_scores(limit=1000)
+        # Latest score of every wallet, highest first
+        all_scores = self.calculator.get_latest_confidence_scores(limit=None)
 
         if not all_scores:
             return "# Smart Money Confidence Report\n\nNo data available."
 
+        # Elite wallets with a significant decline over the last week, from
+        # one windowed query rather than each wallet's history
+        alerts = self.calculator.get_confidence_alerts(threshold=90.0, drop_threshold=10.0, days=7)
+
+        return self.render_report(all_scores, alerts, output_path)
+
+    def render_report(self, scores: List[ConfidenceScore], alerts: List[Dict],
+                      output_path: str = None) -> str:
+        """
+        Render a report from already loaded scores and alerts.
+
+        Args:
+            scores: Latest score of each wallet, highest overall score first
+            alerts: Alert dicts (see build_confidence_alert), largest drop first
+            output_path: Path to save report (optional)
+
+        Returns:
+            Markdown report content
+        """
+        if not scores:
+            return "# Smart Money Confidence Report\n\nNo data available."
+
+        aggregates = ReportAggregates.from_scores(scores)
+
         # Generate report sections
         markdown = []
 
@@ -64,25 +196,25 @@ class ConfidenceReportGenerator:
         markdown.append(self._generate_header())
 
         # Summary statistics
-        markdown.append(self._generate_summary(all_scores))
+        markdown.append(self._generate_summary(aggregates))
 
         # Category breakdown
-        markdown.append(self._generate_category_breakdown(all_scores))
+        markdown.append(self._generate_category_breakdown(aggregates))
 
         # Elite wallet rankings
-        markdown.append(self._generate_elite_rankings(all_scores))
+        markdown.append(self._generate_elite_rankings(aggregates))
 
         # Top performers by component
-        markdown.append(self._generate_top_performers(all_scores))
+        markdown.append(self._generate_top_performers(aggregates))
 
         # Recent score changes
-        markdown.append(self._generate_recent_changes(all_scores))
+        markdown.append(self._generate_recent_changes(aggregates))
 
         # Confidence trends
-        markdown.append(self._generate_trends(all_scores))
+        markdown.append(self._generate_trends(aggregates))
 
         # Alerts
-        markdown.append(self._generate_alerts(all_scores))
+        markdown.append(self._generate_alerts(alerts))
 
         # Methodology
         markdown.append(self._generate_methodology())
@@ -137,25 +269,15 @@ The confidence score combines five weighted factors:
 
 """
 
-    def _generate_summary(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_summary(self, aggregates: ReportAggregates) -> str:
         """Generate summary statistics section."""
-        total_wallets = len(scores)
-
-        # Count by category
-        category_counts = {}
-        for score in scores:
-            category = score.category.value
-            category_counts[category] = category_counts.get(category, 0) + 1
+        total_wallets = aggregates.total
+        category_counts = aggregates.category_counts
+        trend_counts = aggregates.trend_counts
 
-        # Calculate average scores
-        avg_overall = sum(s.overall_score for s in scores) / total_wallets
-        avg_win_rate = sum(s.win_rate_score for s in scores) / total_wallets
-        avg_consistency = sum(s.consistency_score for s in scores) / total_wallets
-
-        # Trend distribution
-        trend_counts = {'up': 0, 'down': 0, 'neutral': 0}
-        for score in scores:
-            trend_counts[score.trend] += 1
+        avg_overall = aggregates.average('overall_score')
+        avg_win_rate = aggregates.average('win_rate_score')
+        avg_consistency = aggregates.average('consistency_score')
 
         return f"""## Summary Statistics
 
@@ -189,29 +311,16 @@ The confidence score combines five weighted factors:
 
 """
 
-    def _generate_category_breakdown(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_category_breakdown(self, aggregates: ReportAggregates) -> str:
         """Generate category breakdown section."""
-        categories = {
-            ScoreCategory.ELITE: [],
-            ScoreCategory.STRONG: [],
-            ScoreCategory.MODERATE: [],
-            ScoreCategory.WEAK: [],
-            ScoreCategory.POOR: []
-        }
-
-        for score in scores:
-            categories[score.category].append(score)
-
         markdown = ["## Category Breakdown\n"]
 
-        for category, cat_scores in categories.items():
+        for category, cat_scores in aggregates.by_category.items():
             if not cat_scores:
                 continue
 
-            cat_scores.sort(key=lambda x: x.overall_score, reverse=True)
-
-            avg_score = sum(s.overall_score for s in cat_scores) / len(cat_scores)
-            avg_trades = sum(s.trade_count_score for s in cat_scores) / len(cat_scores) / 2  # Convert to 0-100 scale
+            avg_score = aggregates.category_score_sums[category] / len(cat_scores)
+            avg_trades = aggregates.category_trade_sums[category] / len(cat_scores) / 2  # Convert to 0-100 scale
 
             markdown.append(f"### {category.value} ({len(cat_scores)} wallets)")
             markdown.append(f"**Average Score:** {avg_score:.2f}")
@@ -232,10 +341,9 @@ The confidence score combines five weighted factors:
 
         return '\n'.join(markdown)
 
-    def _generate_elite_rankings(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_elite_rankings(self, aggregates: ReportAggregates) -> str:
         """Generate elite wallet rankings section."""
-        elite = [s for s in scores if s.category == ScoreCategory.ELITE]
-        elite.sort(key=lambda x: x.overall_score, reverse=True)
+        elite = aggregates.by_category[ScoreCategory.ELITE]
 
         if not elite:
             return "## Elite Wallet Rankings\n\nNo elite wallets found.\n\n---\n"
@@ -255,56 +363,53 @@ The confidence score combines five weighted factors:
 
         return '\n'.join(markdown)
 
-    def _generate_top_performers(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_top_performers(self, aggregates: ReportAggregates) -> str:
         """Generate top performers by component section."""
-        if not scores:
+        if not aggregates.total:
             return ""
 
         markdown = ["## Top Performers by Component\n"]
 
         # Top win rate
-        sorted_win_rate = sorted(scores, key=lambda x: x.win_rate_score, reverse=True)
+        sorted_win_rate = aggregates.top_components['win_rate_score']
         markdown.append("### 🎯 Highest Win Rate")
         markdown.append("| Rank | Wallet | Score |")
         markdown.append("|------|--------|------|")
-        for i, score in enumerate(sorted_win_rate[:5], 1):
+        for i, score in enumerate(sorted_win_rate, 1):
             markdown.append(f"| {i} | `{score.wallet_address[:10]}...` | {score.win_rate_score:.1f} |")
 
         # Top consistency
-        sorted_consistency = sorted(scores, key=lambda x: x.consistency_score, reverse=True)
+        sorted_consistency = aggregates.top_components['consistency_score']
         markdown.append("\n### 📊 Most Consistent")
         markdown.append("| Rank | Wallet | Score |")
         markdown.append("|------|--------|------|")
-        for i, score in enumerate(sorted_consistency[:5], 1):
+        for i, score in enumerate(sorted_consistency, 1):
             markdown.append(f"| {i} | `{score.wallet_address[:10]}...` | {score.consistency_score:.1f} |")
 
         # Top market timing
-        sorted_timing = sorted(scores, key=lambda x: x.market_timing_score, reverse=True)
+        sorted_timing = aggregates.top_components['market_timing_score']
         markdown.append("\n### ⏰ Best Market Timing")
         markdown.append("| Rank | Wallet | Score |")
         markdown.append("|------|--------|------|")
-        for i, score in enumerate(sorted_timing[:5], 1):
+        for i, score in enumerate(sorted_timing, 1):
             markdown.append(f"| {i} | `{score.wallet_address[:10]}...` | {score.market_timing_score:.1f} |")
 
         # Most active (highest trade count)
-        sorted_activity = sorted(scores, key=lambda x: x.trade_count_score, reverse=True)
+        sorted_activity = aggregates.top_components['trade_count_score']
         markdown.append("\n### 🔥 Most Active")
         markdown.append("| Rank | Wallet | Score |")
         markdown.append("|------|--------|------|")
-        for i, score in enumerate(sorted_activity[:5], 1):
+        for i, score in enumerate(sorted_activity, 1):
             markdown.append(f"| {i} | `{score.wallet_address[:10]}...` | {score.trade_count_score:.1f} |")
 
         markdown.append("\n---\n")
 
         return '\n'.join(markdown)
 
-    def _generate_recent_changes(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_recent_changes(self, aggregates: ReportAggregates) -> str:
         """Generate recent score changes section."""
-        trending_up = [s for s in scores if s.trend == 'up']
-        trending_down = [s for s in scores if s.trend == 'down']
-
-        trending_up.sort(key=lambda x: x.overall_score, reverse=True)
-        trending_down.sort(key=lambda x: x.overall_score, reverse=True)
+        trending_up = aggregates.trending_up
+        trending_down = aggregates.trending_down
 
         markdown = ["## Recent Score Changes\n"]
 
@@ -326,16 +431,12 @@ The confidence score combines five weighted factors:
 
         return '\n'.join(markdown)
 
-    def _generate_trends(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_trends(self, aggregates: ReportAggregates) -> str:
         """Generate confidence trends section."""
         markdown = ["## Confidence Trends Analysis\n"]
 
         # Wallets approaching elite status
-        near_elite = [
-            s for s in scores
-            if 85 <= s.overall_score < 90 and s.trend == 'up'
-        ]
-        near_elite.sort(key=lambda x: x.overall_score, reverse=True)
+        near_elite = aggregates.near_elite
 
         if near_elite:
             markdown.append(f"### 🚀 Approaching Elite Status ({len(near_elite)} wallets)")
@@ -346,12 +447,7 @@ The confidence score combines five weighted factors:
                 markdown.append(f"| `{score.wallet_address[:10]}...` | {score.overall_score:.1f} | ↑ |")
 
         # Wallets at risk of dropping categories
-        at_risk = []
-        for score in scores:
-            if score.category == ScoreCategory.ELITE and score.trend == 'down':
-                at_risk.append(('Elite', score))
-            elif score.category == ScoreCategory.STRONG and score.trend == 'down':
-                at_risk.append(('Strong', score))
+        at_risk = aggregates.at_risk
 
         if at_risk:
             markdown.append(f"\n### ⚠️ At Risk of Downgrade ({len(at_risk)} wallets)")
@@ -365,37 +461,15 @@ The confidence score combines five weighted factors:
 
         return '\n'.join(markdown)
 
-    def _generate_alerts(self, scores: List[ConfidenceScore]) -> str:
+    def _generate_alerts(self, alerts: List[Dict]) -> str:
         """Generate alerts section."""
-        alerts = []
-
-        # Elite wallets with significant decline
-        for score in scores:
-            if score.category == ScoreCategory.ELITE and score.trend == 'down':
-                # Get recent history to check for significant drop
-                history = self.calculator.get_wallet_history(score.wallet_address, days=7)
-
-                if len(history) >= 2:
-                    previous_score = history[-2].overall_score
-                    current_score = score.overall_score
-                    drop = previous_score - current_score
-
-                    if drop >= 10:  # Significant drop
-                        alerts.append({
-                            'type': 'CRITICAL' if drop >= 20 else 'WARNING',
-                            'wallet': score.wallet_address,
-                            'previous': previous_score,
-                            'current': current_score,
-                            'drop': drop
-                        })
-
         markdown = ["## 🚨 Alerts\n"]
 
         if not alerts:
             markdown.append("**No alerts at this time.** All elite wallets are stable or improving.")
         else:
-            critical = [a for a in alerts if a['type'] == 'CRITICAL']
-            warnings = [a for a in alerts if a['type'] == 'WARNING']
+            critical = [a for a in alerts if a['alert_level'] == 'CRITICAL']
+            warnings = [a for a in alerts if a['alert_level'] == 'WARNING']
 
             if critical:
                 markdown.append(f"### CRITICAL Alerts ({len(critical)})")
@@ -404,7 +478,7 @@ The confidence score combines five weighted factors:
                 markdown.append("|--------|----------|---------|------|")
                 for alert in critical:
                     markdown.append(
-                        f"| `{alert['wallet'][:10]}...` | {alert['previous']:.1f} | {alert['current']:.1f} | -{alert['drop']:.1f} |"
+                        f"| `{alert['wallet_address'][:10]}...` | {alert['previous_score']:.1f} | {alert['current_score']:.1f} | -{alert['drop']:.1f} |"
                     )
 
             if warnings:
@@ -414,7 +488,7 @@ The confidence score combines five weighted factors:
                 markdown.append("|--------|----------|---------|------|")
                 for alert in warnings[:5]:  # Limit warnings
                     markdown.append(
-                        f"| `{alert['wallet'][:10]}...` | {alert['previous']:.1f} | {alert['current']:.1f} | -{alert['drop']:.1f} |"
+                        f"| `{alert['wallet_address'][:10]}...` | {alert['previous_score']:.1f} | {alert['current_score']:.1f} | -{alert['drop']:.1f} |"
                     )
 
         markdown.append("\n---\n")
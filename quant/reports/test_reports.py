@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the Smart Money Confidence reports - without external services
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from smart_money_confidence_report import (
+    TOP_COMPONENTS, TOP_N, ConfidenceReportGenerator, ReportAggregates
+)
+from report_backfill import ReportBackfill, day_bounds
+from signals.smart_money_confidence import (
+    ConfidenceScore, ScoreCategory, SmartMoneyConfidenceCalculator
+)
+
+
+def random_scores(rng: random.Random, wallet_count: int, now: float) -> List[ConfidenceScore]:
+    """Scores with coarse values, so rankings have ties"""
+    scores = []
+    for n in range(wallet_count):
+        overall_score = rng.randint(0, 200) / 2
+        category = next(category for bound, category in (
+            (90, ScoreCategory.ELITE), (75, ScoreCategory.STRONG),
+            (60, ScoreCategory.MODERATE), (40, ScoreCategory.WEAK), (0, ScoreCategory.POOR)
+        ) if overall_score >= bound)
+        scores.append(ConfidenceScore(
+            wallet_address=f'0xwallet{n:05d}',
+            overall_score=overall_score,
+            win_rate_score=float(rng.randint(0, 20) * 5),
+            trade_count_score=float(rng.randint(0, 10) * 10),
+            avg_notional_score=float(rng.randint(0, 100)),
+            consistency_score=float(rng.randint(0, 20) * 5),
+            market_timing_score=float(rng.randint(0, 4) * 25),
+            category=category,
+            calculated_at=datetime.fromtimestamp(now - rng.randint(0, 3600)),
+            trend=rng.choice(['up', 'down', 'neutral'])
+        ))
+    return scores
+
+
+def test_aggregates_match_filters():
+    """Test that the single-pass report aggregates equal filtering and sorting the scores"""
+    print("Testing report aggregates against per-section filters...")
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        calculator = SmartMoneyConfidenceCalculator(db_path)
+        # More wallets than the old 1000-score cap
+        assert calculator.save_confidence_scores(random_scores(rng, 1500, time.time()))
+
+        scores = calculator.get_latest_confidence_scores(limit=None)
+        assert len(scores) == 1500
+        aggregates = ReportAggregates.from_scores(scores)
+
+        assert aggregates.total == len(scores)
+        for category in ScoreCategory:
+            in_category = [s for s in scores if s.category == category]
+            assert aggregates.by_category[category] == in_category
+            assert aggregates.category_counts[category.value] == len(in_category)
+            assert abs(aggregates.category_score_sums[category] - sum(s.overall_score for s in in_category)) < 1e-6
+            assert abs(aggregates.category_trade_sums[category] - sum(s.trade_count_score for s in in_category)) < 1e-6
+
+        for column in ('overall_score', 'win_rate_score', 'consistency_score'):
+            expected = sum(getattr(s, column) for s in scores) / len(scores)
+            assert abs(aggregates.average(column) - expected) < 1e-9, column
+
+        for trend in ('up', 'down', 'neutral'):
+            assert aggregates.trend_counts[trend] == len([s for s in scores if s.trend == trend])
+        assert aggregates.trending_up == [s for s in scores if s.trend == 'up']
+        assert aggregates.trending_down == [s for s in scores if s.trend == 'down']
+        assert aggregates.near_elite == [s for s in scores if s.trend == 'up' and 85 <= s.overall_score < 90]
+        assert aggregates.at_risk == [
+            (s.category.value.title(), s) for s in scores
+            if s.trend == 'down' and s.category in (ScoreCategory.ELITE, ScoreCategory.STRONG)
+        ]
+
+        # Ties keep ranking order, as a stable sort would
+        for component in TOP_COMPONENTS:
+            expected = sorted(scores, key=lambda s: getattr(s, component), reverse=True)[:TOP_N]
+            assert aggregates.top_components[component] == expected, component
+        print(f"  {aggregates.total} wallets, {aggregates.category_counts['ELITE']} elite, "
+              f"{len(aggregates.at_risk)} at risk")
+
+        report = ConfidenceReportGenerator(db_path).generate_report(os.path.join(tmp, 'report.md'))
+        assert "**Total Wallets Analyzed:** 1500" in report
+        assert f"**Total Elite Wallets:** {len(aggregates.by_category[ScoreCategory.ELITE])}" in report
+        with open(os.path.join(tmp, 'report.md')) as f:
+            assert f.read() == report
+
+    print("✓ Report aggregate test passed")
+    return True
+
+
+def test_backfill_rerun_skips_finished_days():
+    """Test that re-running a backfill only renders days that are missing or not over"""
+    print("Testing backfill reruns...")
+
+    rng = random.Random(5)
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        output_dir = os.path.join(tmp, 'reports')
+        calculator = SmartMoneyConfidenceCalculator(db_path)
+        for offset in range(6):
+            day_start, _ = day_bounds(start + timedelta(days=offset))
+            scores = random_scores(rng, 40, day_start + 86400)
+            assert calculator.save_confidence_scores(rng.sample(scores, 25))
+
+        def read_reports():
+            reports = {}
+            for name in sorted(os.listdir(output_dir)):
+                if name.endswith('.md'):
+                    with open(os.path.join(output_dir, name)) as f:
+                        reports[name] = f.read()
+            return reports
+
+        backfill = ReportBackfill(db_path, output_dir)
+        written = backfill.run(start, today)
+        assert written == [backfill.report_path(start + timedelta(days=n)) for n in range(6)]
+        reports = read_reports()
+        modified = {path: os.stat(path).st_mtime_ns for path in written}
+
+        # Finished days are skipped; today is not over, so it is rendered again
+        time.sleep(0.01)
+        assert backfill.run(start, today) == [backfill.report_path(today)]
+        for path in written[:-1]:
+            assert os.stat(path).st_mtime_ns == modified[path], path
+        assert read_reports() == reports
+
+        # A missing report is rendered alone, from the state at the end of the day before
+        os.remove(written[2])
+        rerun = ReportBackfill(db_path, output_dir)
+        seeded = []
+        load_state = rerun._load_state
+
+        def record(conn, day, day_end):
+            state, rows, max_id = load_state(conn, day, day_end)
+            seeded.append(day)
+            return state, rows, max_id
+
+        rerun._load_state = record
+        assert rerun.run(start, today - timedelta(days=1)) == [written[2]]
+        print(f"  Reran {os.path.basename(written[2])} from the state of {seeded[0]}")
+        assert seeded == [start + timedelta(days=1)]
+        assert read_reports() == reports
+
+        # Forced reruns render every day the same way
+        assert backfill.run(start, today, force=True) == written
+        assert read_reports() == reports
+
+    print("✓ Backfill rerun test passed")
+    return True
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SMART MONEY CONFIDENCE REPORTS - TEST SUITE")
+    print("=" * 60)
+    print()
+
+    # Test 1: Single-pass aggregates equal per-section filters
+    if not test_aggregates_match_filters():
+        exit(1)
+
+    print()
+
+    # Test 2: Backfill reruns skip finished days
+    if not test_backfill_rerun_skips_finished_days():
+        exit(1)
+
+    print()
+    print("=" * 60)
+    print("ALL TESTS PASSED ✓")
+    print("=" * 60)
@@ -0,0 +1,456 @@
+"""
+Local OHLCV Candle Store
+
+Stores candles in one memory-mapped columnar file per symbol and interval, so
+market timing can compare a trade against the price action over its holding
+period without touching SQLite.
+
+File layout (little-endian, all fields 8 bytes wide):
+
+    header      magic, candle count, interval seconds
+    timestamp   int64[count]    candle open time (Unix seconds, ascending)
+    open        float64[count]
+    high        float64[count]
+    low         float64[count]
+    close       float64[count]
+    volume      float64[count]
+    cum_pv      float64[count + 1]  prefix sums of typical price * volume
+    cum_volume  float64[count + 1]  prefix sums of volume
+
+Holding-period lookups binary search the timestamp column and read VWAP from
+the prefix sums. The low/high range comes from per-block extrema with a
+sparse table over the blocks (built when the file is mapped), so a lookup
+reads at most two partial blocks however long the holding period is.
+"""
+
+import csv
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+MAGIC = b'OHLCV\x00\x00\x01'
+HEADER = struct.Struct('<8sqq')
+
+EXTREMA_BLOCK = 64  # Candles per precomputed min/max block
+
+# Supported candle intervals, in seconds
+INTERVALS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+
+Candle = Tuple[int, float, float, float, float, float]  # ts, open, high, low, close, volume
+
+
+@dataclass
+class HoldingPeriodStats:
+    """Price action over a trade's holding period."""
+    vwap: float
+    low: float
+    high: float
+    candle_count: int
+
+
+class RangeExtremum:
+    """
+    Minimum or maximum of any slice of a column without scanning it.
+
+    The column is split into blocks of EXTREMA_BLOCK values. Level k of the
+    sparse table holds the extremum of every run of 2**k consecutive blocks,
+    so the whole blocks of a slice are covered by two overlapping runs and
+    only the partial blocks at either end are scanned.
+    """
+
+    def __init__(self, column, fn, block: int = EXTREMA_BLOCK):
+        """
+        Precompute block and sparse-table extrema.
+
+        Args:
+            column: Sequence of floats (e.g. a memoryview column)
+            fn: min or max
+            block: Values per block
+        """
+        self.column = column
+        self.fn = fn
+        self.block = block
+
+        level = array('d', (fn(column[i:i + block]) for i in range(0, len(column), block)))
+        self.levels = [level]
+        blocks = len(level)
+        width = 1
+        while 2 * width <= blocks:
+            previous = level
+            level = array('d', (fn(previous[i], previous[i + width])
+                                for i in range(len(previous) - width)))
+            self.levels.append(level)
+            width *= 2
+
+    def query(self, first: int, last: int) -> float:
+        """Extremum of column[first:last] (first < last)."""
+        fn = self.fn
+        block = self.block
+        first_block = -(-first // block)  # First whole block
+        last_block = last // block        # One past the last whole block
+        if first_block >= last_block:
+            return fn(self.column[first:last])
+
+        parts = []
+        if first < first_block * block:
+            parts.append(fn(self.column[first:first_block * block]))
+        if last_block * block < last:
+            parts.append(fn(self.column[last_block * block:last]))
+
+        k = (last_block - first_block).bit_length() - 1
+        level = self.levels[k]
+        parts.append(level[first_block])
+        parts.append(level[last_block - (1 << k)])
+        return fn(parts)
+
+
+class CandleSeries:
+    """Read-only, memory-mapped view of one symbol/interval candle file."""
+
+    def __init__(self, path: str):
+        """
+        Map a candle file.
+
+        Args:
+            path: Path to a file written by write_candle_file
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, interval = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a candle file: {path}")
+
+        self.count = count
+        self.interval = interval
+
+        self._view = memoryview(self._mmap)
+        offset = HEADER.size
+        columns = []
+        for fmt, length in [('q', count)] + [('d', count)] * 5 + [('d', count + 1)] * 2:
+            columns.append(self._view[offset:offset + 8 * length].cast(fmt))
+            offset += 8 * length
+
+        (self.timestamps, self.open, self.high, self.low, self.close,
+         self.volume, self.cum_pv, self.cum_volume) = columns
+
+        self._lows = RangeExtremum(self.low, min)
+        self._highs = RangeExtremum(self.high, max)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close_file(self) -> None:
+        """Release the column views and unmap the file."""
+        for column in (self.timestamps, self.open, self.high, self.low,
+                       self.close, self.volume, self.cum_pv, self.cum_volume):
+            column.release()
+        self._view.release()
+        self._mmap.close()
+
+    def index_range(self, start_ts: int, end_ts: int) -> Tuple[int, int]:
+        """
+        Find the candles overlapping [start_ts, end_ts].
+
+        Returns:
+            (first, last) slice indices; first == last if there are none
+        """
+        # First candle that closes after start_ts, through the last that opens by end_ts
+        first = bisect_right(self.timestamps, start_ts - self.interval)
+        last = bisect_right(self.timestamps, end_ts)
+        return first, max(first, last)
+
+    def holding_period(self, start_ts: int, end_ts: int) -> Optional[HoldingPeriodStats]:
+        """
+        VWAP and price range over a holding period.
+
+        Only returns stats when the candles cover both the entry and the exit,
+        so trades outside the stored history fall back to price-only scoring.
+
+        Args:
+            start_ts: Entry Unix timestamp
+            end_ts: Exit Unix timestamp
+
+        Returns:
+            HoldingPeriodStats, or None if the period is not covered
+        """
+        first, last = self.index_range(start_ts, end_ts)
+        if first == last:
+            return None
+        if self.timestamps[first] > start_ts or self.timestamps[last - 1] + self.interval < end_ts:
+            return None
+
+        low = self._lows.query(first, last)
+        high = self._highs.query(first, last)
+
+        volume = self.cum_volume[last] - self.cum_volume[first]
+        if volume > 0:
+            vwap = (self.cum_pv[last] - self.cum_pv[first]) / volume
+        else:
+            vwap = (low + high) / 2  # No traded volume, use the range midpoint
+
+        return HoldingPeriodStats(vwap=vwap, low=low, high=high, candle_count=last - first)
+
+
+def write_candle_file(path: str, candles: Iterable[Candle], interval: int) -> int:
+    """
+    Write candles to a columnar candle file.
+
+    Candles are sorted by timestamp and de-duplicated (the last row for a
+    timestamp wins). The file is written next to the target and renamed over
+    it, so readers never see a partial file.
+
+    Args:
+        path: Output path
+        candles: (timestamp, open, high, low, close, volume) rows
+        interval: Candle interval in seconds
+
+    Returns:
+        Number of candles written
+    """
+    by_timestamp = {int(candle[0]): candle for candle in candles}
+    rows = [by_timestamp[ts] for ts in sorted(by_timestamp)]
+    count = len(rows)
+
+    cum_pv = [0.0] * (count + 1)
+    cum_volume = [0.0] * (count + 1)
+    for i, (ts, open_, high, low, close, volume) in enumerate(rows):
+        typical = (high + low + close) / 3
+        cum_pv[i + 1] = cum_pv[i] + typical * volume
+        cum_volume[i + 1] = cum_volume[i] + volume
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, interval))
+        f.write(struct.pack(f'<{count}q', *(int(row[0]) for row in rows)))
+        for column in range(1, 6):
+            f.write(struct.pack(f'<{count}d', *(float(row[column]) for row in rows)))
+        f.write(struct.pack(f'<{count + 1}d', *cum_pv))
+        f.write(struct.pack(f'<{count + 1}d', *cum_volume))
+
+    os.replace(tmp_path, path)
+    return count
+
+
+class CandleStore:
+    """
+    Directory of candle files, one per symbol and interval.
+
+    Files live at <root>/<SYMBOL>/<interval>.ohlcv. Series are mapped lazily
+    and cached. A file is checked for changes (and remapped if a loader
+    rewrote it) on its first lookup after refresh(), which scoring calls once
+    per run, so lookups within a run never touch the file system.
+    """
+
+    def __init__(self, root: str = 'quant/data/candles', interval: str = '1m'):
+        """
+        Initialize the candle store.
+
+        Args:
+            root: Directory holding candle files
+            interval: Interval used for holding-period lookups
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+
+        self.root = root
+        self.interval = interval
+        self._series: Dict[Tuple[str, str], Optional[CandleSeries]] = {}
+        self._checked: Set[Tuple[str, str]] = set()  # Keys checked since refresh()
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Re-check every candle file (including missing ones) on its next lookup."""
+        self._checked = set()
+
+    def path(self, symbol: str, interval: str) -> str:
+        """Path of the candle file for a symbol and interval."""
+        return os.path.join(self.root, symbol.upper().replace('/', '-'), f"{interval}.ohlcv")
+
+    def series(self, symbol: str, interval: Optional[str] = None) -> Optional[CandleSeries]:
+        """
+        Get the mapped series for a symbol.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval (defaults to the store interval)
+
+        Returns:
+            CandleSeries, or None if no candles are stored
+        """
+        key = (symbol, interval or self.interval)
+        checked = self._checked
+
+        # Fast path: already checked in this run
+        if key in checked:
+            return self._series.get(key)
+
+        series = self._series.get(key)
+        if series is not None:
+            try:
+                if os.stat(series.path).st_mtime_ns == series.mtime:
+                    checked.add(key)
+                    return series
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            path = self.path(*key)
+            try:
+                self._series[key] = CandleSeries(path)
+            except FileNotFoundError:
+                self._series[key] = None
+            # The replaced mapping is left to the garbage collector, since
+            # another thread may still be reading from it.
+            checked.add(key)
+            return self._series[key]
+
+    def holding_period(self, symbol: str, entry_timestamp: int,
+                       exit_timestamp: int) -> Optional[HoldingPeriodStats]:
+        """
+        VWAP and price range of a symbol between entry and exit.
+
+        Args:
+            symbol: Trading symbol
+            entry_timestamp: Entry Unix timestamp
+            exit_timestamp: Exit Unix timestamp
+
+        Returns:
+            HoldingPeriodStats, or None if the period is not covered
+        """
+        if not symbol or entry_timestamp is None or exit_timestamp is None:
+            return None
+
+        series = self.series(symbol)
+        if series is None:
+            return None
+
+        return series.holding_period(int(entry_timestamp), int(exit_timestamp))
+
+    def load(self, symbol: str, candles: Iterable[Candle],
+             interval: Optional[str] = None) -> int:
+        """
+        Merge candles into a symbol's file.
+
+        Existing candles are kept; incoming candles replace any with the same
+        timestamp.
+
+        Args:
+            symbol: Trading symbol
+            candles: (timestamp, open, high, low, close, volume) rows
+            interval: Candle interval (defaults to the store interval)
+
+        Returns:
+            Number of candles in the file after the merge
+        """
+        interval = interval or self.interval
+        existing: List[Candle] = []
+
+        series = self.series(symbol, interval)
+        if series is not None:
+            existing = list(zip(series.timestamps, series.open, series.high,
+                                series.low, series.close, series.volume))
+
+        path = self.path(symbol, interval)
+        count = write_candle_file(path, existing + list(candles), INTERVALS[interval])
+        self._series.pop((symbol, interval), None)
+        self._checked.discard((symbol, interval))
+        return count
+
+    def load_csv(self, symbol: str, csv_path: str,
+                 interval: Optional[str] = None) -> int:
+        """
+        Load candles from a CSV file.
+
+        The CSV needs timestamp, open, high, low, close and volume columns
+        (timestamps in Unix seconds or milliseconds).
+
+        Args:
+            symbol: Trading symbol
+            csv_path: Path to CSV file
+            interval: Candle interval (defaults to the store interval)
+
+        Returns:
+            Number of candles in the file after the merge
+        """
+        candles = []
+        with open(csv_path, newline='') as f:
+            for row in csv.DictReader(f):
+                ts = int(float(row['timestamp']))
+                if ts > 10_000_000_000:  # Milliseconds
+                    ts //= 1000
+                candles.append((
+                    ts,
+                    float(row['open']),
+                    float(row['high']),
+                    float(row['low']),
+                    float(row['close']),
+                    float(row['volume'])
+                ))
+
+        return self.load(symbol, candles, interval)
+
+
+def score_trade_timing_ohlcv(side: str, entry_price: float, exit_price: float,
+                             stats: HoldingPeriodStats) -> float:
+    """
+    Calculate the timing score (0-100) of a trade against its holding period.
+
+    Averages two components:
+      - Range: where entry and exit sit within the period's low-high range
+        (a long that buys the low and sells the high scores 100).
+      - VWAP: the return from entry to exit measured against the period VWAP,
+        mapped like the price-only score (50 + gain% / 2, or 50 - loss%).
+
+    Args:
+        side: Trade side ('buy' for long, anything else for short)
+        entry_price: Entry price
+        exit_price: Exit price
+        stats: Holding period stats from the candle store
+
+    Returns:
+        Score from 0-100
+    """
+    is_long = side.lower() == 'buy'
+    price_range = stats.high - stats.low
+
+    if price_range > 0:
+        if is_long:
+            entry_position = (stats.high - entry_price) / price_range
+            exit_position = (exit_price - stats.low) / price_range
+        else:
+            entry_position = (entry_price - stats.low) / price_range
+            exit_position = (stats.high - exit_price) / price_range
+        range_score = 50 * (
+            min(1, max(0, entry_position)) + min(1, max(0, exit_position))
+        )
+    else:
+        range_score = 50
+
+    edge = (exit_price - entry_price) if is_long else (entry_price - exit_price)
+    edge_pct = edge / stats.vwap * 100 if stats.vwap > 0 else 0
+    if edge_pct > 0:
+        vwap_score = min(100, 50 + edge_pct / 2)
+    else:
+        vwap_score = max(0, 50 + edge_pct)
+
+    return (range_score + vwap_score) / 2
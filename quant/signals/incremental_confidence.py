@@ -0,0 +1,449 @@
+"""
+Incremental Smart Money Confidence Scoring
+
+Keeps running per-wallet aggregates so a confidence score can be refreshed in
+constant time when a trade closes, instead of rescanning the wallet's whole
+analysis window with SmartMoneyConfidenceCalculator.calculate_confidence.
+
+Aggregates are kept per wallet in a ring buffer of daily buckets (keyed by the
+UTC day of the trade's entry timestamp). Buckets are expired as they leave the
+window, so the window edge is aligned to UTC day boundaries rather than to the
+exact second.
+
+The consistency score is maintained with Welford's algorithm over the daily
+win rates, so it is available without re-aggregating the wallet's history.
+"""
+
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from signals.smart_money_confidence import (
+        SmartMoneyConfidenceCalculator,
+        ConfidenceScore,
+        RunningStats,
+        SECONDS_PER_DAY
+    )
+    from signals.candle_store import CandleStore, score_trade_timing_ohlcv
+except ImportError:
+    from smart_money_confidence import (
+        SmartMoneyConfidenceCalculator,
+        ConfidenceScore,
+        RunningStats,
+        SECONDS_PER_DAY
+    )
+    from candle_store import CandleStore, score_trade_timing_ohlcv
+
+
+MIN_TRADES_PER_DAY = 3  # Days with fewer trades are left out of consistency
+
+
+class DailyRing:
+    """
+    Per-day counters for one wallet in fixed-size arrays indexed by day.
+
+    Slot i holds the day with day % capacity == i. A slot is reused once its
+    day has fallen out of the window, so memory stays constant per wallet.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Allocate the ring.
+
+        Args:
+            capacity: Number of days held (the window length plus one)
+        """
+        self.capacity = capacity
+        self.day = array('q', [-1]) * capacity  # -1 marks an empty slot
+        self.trade_count = array('l', [0]) * capacity
+        self.win_count = array('l', [0]) * capacity
+        self.notional_sum = array('d', [0.0]) * capacity
+        self.pnl_sum = array('d', [0.0]) * capacity
+        self.timing_sum = array('d', [0.0]) * capacity
+        self.timing_count = array('l', [0]) * capacity
+
+    def clear(self, slot: int) -> None:
+        """Empty a slot."""
+        self.day[slot] = -1
+        self.trade_count[slot] = 0
+        self.win_count[slot] = 0
+        self.notional_sum[slot] = 0.0
+        self.pnl_sum[slot] = 0.0
+        self.timing_sum[slot] = 0.0
+        self.timing_count[slot] = 0
+
+    def live_slots(self) -> List[int]:
+        """Occupied slots, oldest day first."""
+        return sorted(
+            (slot for slot in range(self.capacity) if self.day[slot] >= 0),
+            key=self.day.__getitem__
+        )
+
+    def win_rate(self, slot: int) -> float:
+        """Win rate percentage of a slot's day."""
+        return self.win_count[slot] * 100.0 / self.trade_count[slot]
+
+
+@dataclass
+class WalletAggregates:
+    """
+    Running totals and consistency statistics over a wallet's daily ring.
+
+    `settled` holds Welford statistics over the qualifying days before the
+    newest day, added oldest first. The newest day is still receiving trades,
+    so its win rate is folded in only when the score is read. Trades for an
+    older day and expirations rebuild both from the ring.
+    """
+    ring: DailyRing
+    trade_count: int = 0
+    win_count: int = 0
+    notional_sum: float = 0.0
+    pnl_sum: float = 0.0
+    timing_sum: float = 0.0
+    timing_count: int = 0
+    oldest_day: int = -1
+    newest_day: int = -1
+    settled: RunningStats = field(default_factory=RunningStats)
+    previous_score: Optional[float] = None
+
+    def add(self, day: int, is_win: bool, notional: float,
+            pnl: float, timing_score: Optional[float]) -> bool:
+        """
+        Add one closed trade to its day and to the running totals.
+
+        Returns:
+            False if the day is older than the ring holds (trade ignored)
+        """
+        ring = self.ring
+        slot = day % ring.capacity
+
+        rebuild = False
+        if ring.day[slot] > day:
+            return False
+        if ring.day[slot] != day:
+            if ring.day[slot] >= 0:
+                ring.clear(slot)  # Reuse a slot whose day has left the window
+                rebuild = True
+            ring.day[slot] = day
+
+        if day > self.newest_day:
+            # The previous newest day is complete; add it to the settled stats
+            if self.newest_day >= 0:
+                newest_slot = self.newest_day % ring.capacity
+                if (ring.day[newest_slot] == self.newest_day
+                        and ring.trade_count[newest_slot] >= MIN_TRADES_PER_DAY):
+                    self.settled.add(ring.win_rate(newest_slot))
+            self.newest_day = day
+        elif day < self.newest_day:
+            rebuild = True  # Late trade changes a settled day
+
+        if self.oldest_day < 0 or day < self.oldest_day:
+            self.oldest_day = day
+
+        ring.trade_count[slot] += 1
+        ring.notional_sum[slot] += notional
+        ring.pnl_sum[slot] += pnl
+        self.trade_count += 1
+        self.notional_sum += notional
+        self.pnl_sum += pnl
+
+        if is_win:
+            ring.win_count[slot] += 1
+            self.win_count += 1
+
+        if timing_score is not None:
+            ring.timing_sum[slot] += timing_score
+            ring.timing_count[slot] += 1
+            self.timing_sum += timing_score
+            self.timing_count += 1
+
+        if rebuild:
+            self.rebuild()
+
+        return True
+
+    def expire(self, first_day: int) -> bool:
+        """
+        Drop days older than first_day.
+
+        Returns:
+            True if any day was dropped
+        """
+        if self.oldest_day < 0 or self.oldest_day >= first_day:
+            return False
+
+        ring = self.ring
+        expired = False
+        for slot in range(ring.capacity):
+            if 0 <= ring.day[slot] < first_day:
+                ring.clear(slot)
+                expired = True
+
+        if expired:
+            self.rebuild()
+
+        return expired
+
+    def rebuild(self) -> None:
+        """
+        Recompute totals and settled statistics from the live days.
+
+        Totals are rebuilt rather than decremented, so floating point drift
+        never accumulates across expirations.
+        """
+        ring = self.ring
+        slots = ring.live_slots()
+
+        self.trade_count = sum(ring.trade_count[slot] for slot in slots)
+        self.win_count = sum(ring.win_count[slot] for slot in slots)
+        self.notional_sum = sum(ring.notional_sum[slot] for slot in slots)
+        self.pnl_sum = sum(ring.pnl_sum[slot] for slot in slots)
+        self.timing_sum = sum(ring.timing_sum[slot] for slot in slots)
+        self.timing_count = sum(ring.timing_count[slot] for slot in slots)
+
+        self.oldest_day = ring.day[slots[0]] if slots else -1
+        self.newest_day = ring.day[slots[-1]] if slots else -1
+        self.settled = RunningStats()
+        for slot in slots[:-1]:
+            if ring.trade_count[slot] >= MIN_TRADES_PER_DAY:
+                self.settled.add(ring.win_rate(slot))
+
+    def consistency_stats(self) -> RunningStats:
+        """Welford statistics over all qualifying days, including the newest."""
+        stats = RunningStats(self.settled.count, self.settled.mean, self.settled.m2)
+
+        if self.newest_day >= 0:
+            slot = self.newest_day % self.ring.capacity
+            if self.ring.trade_count[slot] >= MIN_TRADES_PER_DAY:
+                stats.add(self.ring.win_rate(slot))
+
+        return stats
+
+
+class IncrementalConfidenceScorer:
+    """
+    Maintains per-wallet aggregates and rescores wallets on trade close.
+
+    Typical use in a fill handler:
+
+        scorer = IncrementalConfidenceScorer('quant/data/trading.db')
+        scorer.warm()  # One scan at startup
+
+        def on_trade_closed(trade):
+            score = scorer.on_trade_closed(trade)
+    """
+
+    def __init__(self, db_path: str = 'quant/data/trading.db', days: int = 30,
+                 candle_store: Optional[CandleStore] = None):
+        """
+        Initialize the incremental scorer.
+
+        Args:
+            db_path: Path to SQLite database containing trade data
+            days: Number of days in the analysis window
+            candle_store: Local OHLCV candles for market timing
+        """
+        self.db_path = db_path
+        self.days = days
+        self.calculator = SmartMoneyConfidenceCalculator(db_path, candle_store=candle_store)
+        self.wallets: Dict[str, WalletAggregates] = {}
+
+    def _first_day(self, now: Optional[float] = None) -> int:
+        """First UTC day still inside the analysis window."""
+        now = time.time() if now is None else now
+        return int(now - self.days * SECONDS_PER_DAY) // SECONDS_PER_DAY
+
+    def warm(self, now: Optional[float] = None) -> int:
+        """
+        Load aggregates for all wallets from the database in one scan.
+
+        Args:
+            now: Reference Unix time (defaults to current time)
+
+        Returns:
+            Number of wallets loaded
+        """
+        first_day = self._first_day(now)
+        if self.calculator.candle_store is not None:
+            self.calculator.candle_store.refresh()
+        with self.calculator.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT agent_id, symbol, side, quantity, entry_price, exit_price,
+                       pnl, entry_timestamp, exit_timestamp
+                FROM agent_trades
+                WHERE entry_timestamp >= ?
+                  AND status = 'closed'
+                ORDER BY entry_timestamp  -- Days arrive in order, so none is rebuilt
+            """, (first_day * SECONDS_PER_DAY,))
+
+            self.wallets = {}
+            for row in cursor.fetchall():
+                self._apply(dict(row))
+
+        self.calculator.previous_scores.refresh()
+        for wallet_address, previous in self.calculator.previous_scores.get_all().items():
+            self._wallet(wallet_address).previous_score = previous
+
+        return len(self.wallets)
+
+    def _wallet(self, wallet_address: str) -> WalletAggregates:
+        aggregates = self.wallets.get(wallet_address)
+        if aggregates is None:
+            # The window spans days + 1 UTC days (see _first_day)
+            aggregates = self.wallets[wallet_address] = WalletAggregates(DailyRing(self.days + 1))
+        return aggregates
+
+    def _timing_score(self, trade: Dict) -> Optional[float]:
+        """Timing score of a closed trade, or None if it has no exit price."""
+        exit_price = trade.get('exit_price')
+        if exit_price is None or exit_price <= 0:
+            return None
+
+        candle_store = self.calculator.candle_store
+        if candle_store is not None:
+            stats = candle_store.holding_period(
+                trade.get('symbol'), trade['entry_timestamp'], trade.get('exit_timestamp')
+            )
+            if stats is not None:
+                return score_trade_timing_ohlcv(trade['side'], trade['entry_price'],
+                                                exit_price, stats)
+
+        return self.calculator.score_trade_timing(trade['side'], trade['entry_price'], exit_price)
+
+    def _apply(self, trade: Dict) -> WalletAggregates:
+        """Fold one closed trade into the wallet's daily bucket."""
+        aggregates = self._wallet(trade['agent_id'])
+
+        pnl = trade.get('pnl') or 0
+        aggregates.add(
+            int(trade['entry_timestamp']) // SECONDS_PER_DAY,
+            is_win=pnl > 0,
+            notional=abs(trade['entry_price'] * trade['quantity']),
+            pnl=pnl,
+            timing_score=self._timing_score(trade)
+        )
+        return aggregates
+
+    def on_trade_closed(self, trade: Dict, save: bool = True,
+                        now: Optional[float] = None) -> ConfidenceScore:
+        """
+        Update a wallet's aggregates with a closed trade and rescore it.
+
+        Args:
+            trade: Closed trade with agent_id, side, quantity, entry_price,
+                   exit_price, pnl and entry_timestamp (agent_trades columns);
+                   symbol and exit_timestamp enable candle-based timing
+            save: If True, persist the new score
+            now: Reference Unix time (defaults to current time)
+
+        Returns:
+            Updated ConfidenceScore
+        """
+        wallet_address = trade['agent_id']
+
+        if int(trade['entry_timestamp']) // SECONDS_PER_DAY >= self._first_day(now):
+            if self.calculator.candle_store is not None:
+                self.calculator.candle_store.refresh()
+            self._apply(trade)
+
+        score = self.score(wallet_address, now=now)
+
+        if save:
+            self.calculator.save_confidence_score(score)
+
+        return score
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Drop buckets that have left the window for every wallet.
+
+        Args:
+            now: Reference Unix time (defaults to current time)
+
+        Returns:
+            Number of wallets whose aggregates changed
+        """
+        first_day = self._first_day(now)
+        return sum(1 for aggregates in self.wallets.values() if aggregates.expire(first_day))
+
+    def get_wallet_statistics(self, wallet_address: str) -> Dict:
+        """
+        Get basic statistics from the running aggregates.
+
+        Returns:
+            Dictionary shaped like SmartMoneyConfidenceCalculator.get_wallet_statistics
+        """
+        aggregates = self.wallets.get(wallet_address)
+
+        if not aggregates or aggregates.trade_count == 0:
+            return {
+                'win_rate': 0,
+                'trade_count': 0,
+                'avg_notional': 0,
+                'total_pnl': 0,
+                'avg_pnl': 0
+            }
+
+        return {
+            'win_rate': (aggregates.win_count / aggregates.trade_count) * 100,
+            'trade_count': aggregates.trade_count,
+            'avg_notional': aggregates.notional_sum / aggregates.trade_count,
+            'total_pnl': aggregates.pnl_sum,
+            'avg_pnl': aggregates.pnl_sum / aggregates.trade_count
+        }
+
+    def consistency_score(self, wallet_address: str, now: Optional[float] = None) -> float:
+        """
+        Consistency score (0-100) from the wallet's daily ring, without a query.
+
+        Equals the SQL-aggregated score (calculate_consistency_score) for a
+        window starting at the same UTC midnight.
+
+        Args:
+            wallet_address: Wallet address
+            now: Reference Unix time (defaults to current time)
+
+        Returns:
+            Score from 0-100
+        """
+        aggregates = self._wallet(wallet_address)
+        aggregates.expire(self._first_day(now))
+        return self.calculator.score_consistency(aggregates.consistency_stats())
+
+    def score(self, wallet_address: str, now: Optional[float] = None) -> ConfidenceScore:
+        """
+        Score a wallet from its running aggregates without touching the database.
+
+        Args:
+            wallet_address: Wallet address
+            now: Reference Unix time (defaults to current time)
+
+        Returns:
+            ConfidenceScore object
+        """
+        aggregates = self._wallet(wallet_address)
+        consistency_score = self.consistency_score(wallet_address, now)
+
+        timing_score = (
+            aggregates.timing_sum / aggregates.timing_count
+            if aggregates.timing_count else 0
+        )
+
+        score = self.calculator.build_confidence_score(
+            wallet_address,
+            self.get_wallet_statistics(wallet_address),
+            consistency_score,
+            timing_score,
+            trend_fn=lambda overall: self.calculator.classify_trend(
+                overall, aggregates.previous_score
+            ),
+            calculated_at=datetime.utcnow()
+        )
+        aggregates.previous_score = score.overall_score
+
+        return score
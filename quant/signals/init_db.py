@@ -7,6 +7,89 @@ Creates and initializes the smart_money_confidence table and related structures.
 import sqlite3
 import os
 from datetime import datetime
+from typing import List
+
+try:
+    from signals.smart_money_confidence import (
+        ACTIVE_WALLETS_SQL, BATCH_DAILY_WIN_RATES_SQL, BATCH_STATISTICS_SQL,
+        BATCH_TIMING_TRADES_SQL, CONFIDENCE_ALERTS_SQL, DAILY_WIN_RATES_SQL,
+        LATEST_SCORE_COLUMNS, LATEST_SCORES_SINCE_SQL, TIMING_TRADES_SQL,
+        WALLET_HISTORY_SQL, WALLET_STATISTICS_SQL, WINDOW_PREVIOUS_SCORES_SQL,
+        ensure_confidence_schema, latest_score_page_sql, window_daily_counts_sql,
+        window_statistics_sql
+    )
+    from signals.snapshot_export import EXPORT_TABLES, ensure_export_schema, export_sql
+except ImportError:
+    from smart_money_confidence import (
+        ACTIVE_WALLETS_SQL, BATCH_DAILY_WIN_RATES_SQL, BATCH_STATISTICS_SQL,
+        BATCH_TIMING_TRADES_SQL, CONFIDENCE_ALERTS_SQL, DAILY_WIN_RATES_SQL,
+        LATEST_SCORE_COLUMNS, LATEST_SCORES_SINCE_SQL, TIMING_TRADES_SQL,
+        WALLET_HISTORY_SQL, WALLET_STATISTICS_SQL, WINDOW_PREVIOUS_SCORES_SQL,
+        ensure_confidence_schema, latest_score_page_sql, window_daily_counts_sql,
+        window_statistics_sql
+    )
+    from snapshot_export import EXPORT_TABLES, ensure_export_schema, export_sql
+
+
+# Composite covering indexes matched to the confidence scoring queries.
+# Each scoring query filters on agent_id = ? AND status = 'closed' AND
+# entry_timestamp >= ?, so the equality columns lead and the range column
+# follows; the remaining columns let SQLite answer from the index alone.
+SCORING_INDEXES = {
+    # Per-wallet statistics, consistency and market timing queries
+    'idx_agent_trades_scoring': '''
+        CREATE INDEX IF NOT EXISTS idx_agent_trades_scoring
+        ON agent_trades(agent_id, status, entry_timestamp, pnl, entry_price,
+                        quantity, exit_price, side, symbol, exit_timestamp)
+    ''',
+    # Batch (all-wallet) scoring queries over the analysis window
+    'idx_agent_trades_window': '''
+        CREATE INDEX IF NOT EXISTS idx_agent_trades_window
+        ON agent_trades(status, entry_timestamp, agent_id, pnl, entry_price,
+                        quantity, exit_price, side, symbol, exit_timestamp)
+    ''',
+    # Previous-score (trend) and history lookups
+    'idx_smart_money_confidence_wallet_time': '''
+        CREATE INDEX IF NOT EXISTS idx_smart_money_confidence_wallet_time
+        ON smart_money_confidence(wallet_address, calculated_at DESC)
+    ''',
+}
+
+# Indexes replaced by later ones, dropped by migrate_database
+OBSOLETE_INDEXES = [
+    # Superseded by idx_smart_money_confidence_latest_keyset
+    'idx_smart_money_confidence_latest_score',
+    # Closed trades are exported through agent_trade_closes
+    'idx_agent_trades_closed',
+]
+
+# Hot queries checked by verify_query_plans, with placeholder parameters.
+# Every statement is the one SmartMoneyConfidenceCalculator and the snapshot
+# exporter issue, built from the same module constants and builders.
+_WINDOWS = (7, 30, 90)
+_WINDOW_PARAMS = {'since': 0, **{f'since_{days}': 0 for days in _WINDOWS}}
+_PAGE_PARAMS = {'after_score': 50.0, 'after_wallet': '0x0', 'limit': 100}
+
+HOT_QUERIES = {
+    'wallet_statistics': (WALLET_STATISTICS_SQL, ('0x0', 0)),
+    'consistency': (DAILY_WIN_RATES_SQL, ('0x0', 0)),
+    'market_timing': (TIMING_TRADES_SQL, ('0x0', 0)),
+    'batch_statistics': (BATCH_STATISTICS_SQL.format(wallet_filter=''), {'since': 0}),
+    'batch_consistency': (BATCH_DAILY_WIN_RATES_SQL.format(wallet_filter=''), {'since': 0}),
+    'batch_timing': (BATCH_TIMING_TRADES_SQL.format(wallet_filter=''), {'since': 0}),
+    'active_wallets': (ACTIVE_WALLETS_SQL, (0,)),
+    'window_statistics': (window_statistics_sql(_WINDOWS), _WINDOW_PARAMS),
+    'window_consistency': (window_daily_counts_sql(_WINDOWS), _WINDOW_PARAMS),
+    'window_previous_scores': (WINDOW_PREVIOUS_SCORES_SQL.format(placeholders='?, ?, ?'), _WINDOWS),
+    'previous_score_refresh': (LATEST_SCORES_SINCE_SQL, (0,)),
+    'wallet_history': (WALLET_HISTORY_SQL, ('0x0', 0)),
+    'score_page': (latest_score_page_sql(LATEST_SCORE_COLUMNS, after=True), _PAGE_PARAMS),
+    'score_page_category': (latest_score_page_sql(LATEST_SCORE_COLUMNS, by_category=True, after=True),
+                            {'category': 'ELITE', **_PAGE_PARAMS}),
+    'export_trades': (export_sql(EXPORT_TABLES['agent_trades'], ['id'], True), (0,)),
+    'export_scores': (export_sql(EXPORT_TABLES['smart_money_confidence'], ['id'], True), (0,)),
+    'confidence_alerts': (CONFIDENCE_ALERTS_SQL, {'threshold': 90.0, 'drop_threshold': 10.0, 'since': 0}),
+}
 
 
 def init_database(db_path: str = 'quant/data/trading.db') -> bool:
@@ -114,13 +197,24 @@ def init_database(db_path: str = 'quant/data/trading.db') -> bool:
             ON smart_money_confidence(category)
         ''')
 
+        for index_sql in SCORING_INDEXES.values():
+            cursor.execute(index_sql)
+
         conn.commit()
 
+        # Latest-score table and the trigger that maintains it
+        ensure_confidence_schema(conn)
+
+        # Trade close log for snapshot exports
+        ensure_export_schema(conn)
+
         print("Database initialized successfully.")
         print(f"Database path: {db_path}")
         print("\nTables created:")
         print("  - agent_trades")
         print("  - smart_money_confidence")
+        print("  - smart_money_confidence_latest")
+        print("  - agent_trade_closes")
         print("\nIndexes created for performance optimization.")
 
         return True
@@ -134,6 +228,100 @@ def init_database(db_path: str = 'quant/data/trading.db') -> bool:
         conn.close()
 
 
+def migrate_database(db_path: str = 'quant/data/trading.db') -> bool:
+    """
+    Add the composite scoring indexes and the latest-score table to an
+    existing database, backfilling latest scores from history, and drop
+    the indexes they replace.
+
+    Safe to run repeatedly. Refreshes planner statistics with ANALYZE so
+    SQLite picks the new indexes.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        True if successful, False otherwise
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        for name, index_sql in SCORING_INDEXES.items():
+            cursor.execute(index_sql)
+            print(f"  - {name}")
+
+        conn.commit()
+
+        ensure_confidence_schema(conn)
+        print("  - smart_money_confidence_latest")
+
+        ensure_export_schema(conn)
+        print("  - agent_trade_closes")
+
+        for name in OBSOLETE_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+        conn.commit()
+
+        cursor.execute('ANALYZE')
+        conn.commit()
+
+        print("Scoring indexes migrated successfully.")
+        return True
+
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+        conn.rollback()
+        return False
+
+    finally:
+        conn.close()
+
+
+def verify_query_plans(cursor: sqlite3.Cursor) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN on every hot scoring query.
+
+    A query fails when any step of its plan is a SCAN (a full table or full
+    index scan) rather than an index SEARCH, or when an agent_trades search
+    neither constrains entry_timestamp through the index nor looks trades up
+    by primary key (SQLite picked a single-column index and filters the
+    remaining rows one by one). Scans of
+    subquery and CTE results (e.g. window function output) are not table
+    scans and are allowed.
+
+    Args:
+        cursor: Database cursor
+
+    Returns:
+        Names of the hot queries that fall back to a scan
+    """
+    failing = []
+
+    print("\nQuery plans:")
+    for name, (sql, params) in HOT_QUERIES.items():
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        steps = [row[3] for row in cursor.fetchall()]
+        intermediate = {
+            step.split(' ', 1)[1] for step in steps
+            if step.startswith(('CO-ROUTINE ', 'MATERIALIZE '))
+        }
+        scans = [
+            step for step in steps
+            if (step.startswith('SCAN') and step[5:] not in intermediate)
+            or (step.startswith('SEARCH agent_trades')
+                and 'entry_timestamp' not in step and 'PRIMARY KEY' not in step)
+        ]
+
+        status = 'FAIL' if scans else 'ok'
+        print(f"  [{status}] {name}: {'; '.join(steps)}")
+
+        if scans:
+            failing.append(name)
+
+    return failing
+
+
 def add_sample_data(db_path: str = 'quant/data/trading.db') -> bool:
     """
     Add sample trade data for testing purposes.
@@ -253,12 +441,14 @@ def add_sample_data(db_path: str = 'quant/data/trading.db') -> bool:
         conn.close()
 
 
-def verify_database(db_path: str = 'quant/data/trading.db') -> bool:
+def verify_database(db_path: str = 'quant/data/trading.db',
+                    check_query_plans: bool = True) -> bool:
     """
     Verify database structure and content.
 
     Args:
         db_path: Path to SQLite database
+        check_query_plans: Fail if any hot scoring query plan uses a scan
 
     Returns:
         True if verification successful, False otherwise
@@ -325,11 +515,17 @@ def verify_database(db_path: str = 'quant/data/trading.db') -> bool:
                 trend_emoji = {'up': '↑', 'down': '↓', 'neutral': '→'}
                 print(f"{row[0]:<25} {row[1]:<10.2f} {row[2]:<10} {trend_emoji[row[3]]:<10}")
 
+        failing = verify_query_plans(cursor) if check_query_plans else []
+
         print("\n" + "="*60)
-        print("Verification complete.")
+        if failing:
+            print(f"Verification failed: {len(failing)} hot queries fall back to a scan.")
+            print("Run migrate_database() to add the scoring indexes.")
+        else:
+            print("Verification complete.")
         print("="*60)
 
-        return True
+        return not failing
 
     except Exception as e:
         print(f"Error verifying database: {e}")
@@ -360,6 +556,8 @@ def reset_database(db_path: str = 'quant/data/trading.db') -> bool:
 
     try:
         # Drop tables
+        cursor.execute('DROP TABLE IF EXISTS smart_money_confidence_windows')
+        cursor.execute('DROP TABLE IF EXISTS smart_money_confidence_latest')
         cursor.execute('DROP TABLE IF EXISTS smart_money_confidence')
         cursor.execute('DROP TABLE IF EXISTS agent_trades')
 
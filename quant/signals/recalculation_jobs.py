@@ -0,0 +1,236 @@
+"""
+Background Recalculation Jobs
+
+Bulk confidence recalculation runs as jobs on a small pool of worker threads,
+so a request to rescore many wallets returns a job id immediately instead of
+holding an HTTP worker for the whole run.
+
+Wallets are queued individually and de-duplicated: a wallet that is already
+waiting in the queue (for the same window) is not queued again, and finishing
+it advances every job that asked for it. Workers drain up to `batch_size`
+queued wallets at a time and score them with the set-based
+calculate_all_confidences, saving each batch in one transaction.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from signals.smart_money_confidence import SmartMoneyConfidenceCalculator
+    from signals.candle_store import CandleStore
+except ImportError:
+    from smart_money_confidence import SmartMoneyConfidenceCalculator
+    from candle_store import CandleStore
+
+
+WalletKey = Tuple[str, int]  # wallet address, window days
+
+
+@dataclass
+class RecalculationJob:
+    """Progress of one bulk recalculation request."""
+    job_id: str
+    days: int
+    total: int
+    created_at: float = field(default_factory=time.time)
+    status: str = 'queued'  # queued, running, completed
+    completed: int = 0
+    failed: int = 0
+    deduplicated: int = 0  # Wallets already queued by an earlier job
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0  # Bumped on every change, for progress waiters
+
+    def to_dict(self) -> Dict:
+        """Convert to a JSON-serializable dict."""
+        done = self.completed + self.failed
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'days': self.days,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'deduplicated': self.deduplicated,
+            'progress': round(done / self.total * 100, 2) if self.total else 100.0,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'version': self.version
+        }
+
+
+class RecalculationQueue:
+    """
+    De-duplicating wallet queue served by a pool of scoring threads.
+
+    Workers are started on the first submission. Finished jobs are kept for
+    polling until `max_jobs` newer jobs have been submitted.
+    """
+
+    def __init__(self, db_path: str = 'quant/data/trading.db', workers: int = 2,
+                 batch_size: int = 100, candle_store: Optional[CandleStore] = None,
+                 max_jobs: int = 1000):
+        """
+        Initialize the queue.
+
+        Args:
+            db_path: Path to SQLite database
+            workers: Number of scoring threads
+            batch_size: Most wallets a worker scores (and saves) at once
+            candle_store: Local OHLCV candles for market timing
+            max_jobs: Jobs remembered for status lookups
+        """
+        self.calculator = SmartMoneyConfidenceCalculator(db_path, candle_store=candle_store)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+
+        self._wallets: queue.Queue = queue.Queue()
+        self._waiting: Dict[WalletKey, List[RecalculationJob]] = {}
+        self._jobs: OrderedDict = OrderedDict()
+        self._changed = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, wallet_addresses: Optional[Sequence[str]] = None,
+               days: int = 30) -> RecalculationJob:
+        """
+        Queue wallets for recalculation.
+
+        Args:
+            wallet_addresses: Wallets to rescore; None for every active wallet
+            days: Number of days to analyze
+
+        Returns:
+            The new job
+        """
+        if wallet_addresses is None:
+            wallet_addresses = self.calculator.get_active_wallets(days)
+        wallets = list(dict.fromkeys(wallet_addresses))
+
+        job = RecalculationJob(job_id=uuid.uuid4().hex, days=days, total=len(wallets))
+
+        with self._changed:
+            self._start_workers()
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+            for wallet_address in wallets:
+                key = (wallet_address, days)
+                waiting = self._waiting.get(key)
+                if waiting is not None:
+                    waiting.append(job)
+                    job.deduplicated += 1
+                else:
+                    self._waiting[key] = [job]
+                    self._wallets.put(key)
+
+            if not wallets:
+                job.status = 'completed'
+                job.finished_at = time.time()
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job's progress, or None if it is unknown."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def wait(self, job_id: str, version: int, timeout: float) -> Optional[Dict]:
+        """
+        Wait for a job to change.
+
+        Args:
+            job_id: Job id
+            version: Last version the caller saw
+            timeout: Seconds to wait
+
+        Returns:
+            The job's progress (unchanged if the wait timed out), or None if
+            it is unknown
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id].version != version,
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def pending(self) -> int:
+        """Number of wallets waiting to be scored."""
+        with self._changed:
+            return len(self._waiting)
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"recalculation-{len(self._threads)}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _take_batch(self) -> Dict[int, Dict[str, List[RecalculationJob]]]:
+        """Block for the next wallet, then drain up to a batch, grouped by window."""
+        keys = [self._wallets.get()]
+        while len(keys) < self.batch_size:
+            try:
+                keys.append(self._wallets.get_nowait())
+            except queue.Empty:
+                break
+
+        batch: Dict[int, Dict[str, List[RecalculationJob]]] = {}
+        now = time.time()
+        with self._changed:
+            for wallet_address, days in keys:
+                jobs = self._waiting.pop((wallet_address, days))
+                batch.setdefault(days, {})[wallet_address] = jobs
+                for job in jobs:
+                    if job.status == 'queued':
+                        job.status = 'running'
+                        job.started_at = now
+                        job.version += 1
+            self._changed.notify_all()
+
+        return batch
+
+    def _work(self) -> None:
+        while True:
+            for days, jobs_by_wallet in self._take_batch().items():
+                wallets = list(jobs_by_wallet)
+                try:
+                    scores = self.calculator.calculate_all_confidences(days, wallet_addresses=wallets)
+                    saved = self.calculator.save_confidence_scores(scores)
+                except Exception as e:
+                    print(f"Error recalculating {len(wallets)} wallets: {e}")
+                    saved = False
+
+                self._finish(jobs_by_wallet, saved)
+
+    def _finish(self, jobs_by_wallet: Dict[str, List[RecalculationJob]], saved: bool) -> None:
+        now = time.time()
+        with self._changed:
+            touched = {}
+            for jobs in jobs_by_wallet.values():
+                for job in jobs:
+                    if saved:
+                        job.completed += 1
+                    else:
+                        job.failed += 1
+                    touched[job.job_id] = job
+
+            for job in touched.values():
+                if job.completed + job.failed >= job.total:
+                    job.status = 'completed'
+                    job.finished_at = now
+                job.version += 1
+            self._changed.notify_all()
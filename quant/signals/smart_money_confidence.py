@@ -19,12 +19,165 @@ Score Categories:
 - 0-39: POOR (Unreliable)
 """
 
+import atexit
+import json
+import math
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.request import pathname2url
 from dataclasses import dataclass
 from enum import Enum
-import statistics
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; timing scores fall back to pure Python
+    np = None
+
+try:
+    from signals.candle_store import CandleStore, score_trade_timing_ohlcv
+except ImportError:
+    from candle_store import CandleStore, score_trade_timing_ohlcv
+
+
+def market_timing_score(side, entry_price: float, exit_price: float) -> float:
+    """
+    Calculate the price-only market timing score (0-100) of one trade.
+
+    Gains score 50 + gain% / 2 (capped at 100), losses score 50 - loss%
+    (floored at 0). A trade without a positive entry price has no return
+    and scores a neutral 50.
+
+    Args:
+        side: Trade side ('buy' for long, anything else for short) or long flag
+        entry_price: Entry price
+        exit_price: Exit price
+
+    Returns:
+        Score from 0-100
+    """
+    if entry_price <= 0:
+        return 50
+    is_long = side if isinstance(side, bool) else side.lower() == 'buy'
+    gain_pct = ((exit_price - entry_price) if is_long else (entry_price - exit_price)) / entry_price * 100
+    if gain_pct > 0:
+        return min(100, 50 + gain_pct / 2)  # Base 50, bonus for gains
+    return max(0, 50 + gain_pct)            # Penalize losses
+
+
+def market_timing_scores(sides, entry_prices, exit_prices):
+    """
+    Calculate per-trade market timing scores (0-100) as array operations.
+
+    A trade's signed return is taken from the entry and exit price columns
+    with a side mask (long for 'buy', short otherwise), and scored as in
+    market_timing_score (trades without a positive entry price score 50).
+
+    Accepts Python sequences or pre-loaded NumPy arrays, so batch scoring
+    and streaming callers can share it. `sides` may be side strings or a
+    boolean long mask.
+
+    Args:
+        sides: Trade sides ('buy'/'sell', case-insensitive) or long mask
+        entry_prices: Entry prices
+        exit_prices: Exit prices
+
+    Returns:
+        NumPy array of scores when NumPy is installed, otherwise a list
+    """
+    if np is not None:
+        sides = np.asarray(sides)
+        if sides.dtype == bool:
+            is_long = sides
+        else:
+            is_long = np.char.lower(sides.astype(str)) == 'buy'
+
+        entry = np.asarray(entry_prices, dtype=float)
+        exit_ = np.asarray(exit_prices, dtype=float)
+
+        gain_pct = np.divide(
+            np.where(is_long, exit_ - entry, entry - exit_) * 100, entry,
+            out=np.zeros_like(entry), where=entry > 0
+        )
+        return np.where(
+            gain_pct > 0,
+            np.minimum(100, 50 + gain_pct / 2),  # Base 50, bonus for gains
+            np.maximum(0, 50 + gain_pct)         # Penalize losses
+        )
+
+    return [market_timing_score(side, entry, exit_)
+            for side, entry, exit_ in zip(sides, entry_prices, exit_prices)]
+
+
+def mean_timing_score(timing_scores: Sequence[float]) -> float:
+    """
+    Average per-trade timing scores into a wallet's market timing score.
+
+    Uses an exactly rounded sum, so the result does not depend on trade
+    order or on whether NumPy is installed.
+
+    Args:
+        timing_scores: Timing score per closed trade (0-100)
+
+    Returns:
+        Score from 0-100 (0 if there are no trades)
+    """
+    if len(timing_scores) == 0:
+        return 0
+    return math.fsum(timing_scores) / len(timing_scores)
+
+
+SECONDS_PER_DAY = 86400
+
+# Columns of smart_money_confidence_latest that listings may project
+LATEST_SCORE_COLUMNS = (
+    'wallet_address', 'overall_score', 'win_rate_score', 'trade_count_score',
+    'avg_notional_score', 'consistency_score', 'market_timing_score',
+    'category', 'trend', 'calculated_at'
+)
+DEFAULT_WINDOWS = (7, 30, 90)  # Multi-window scoring lengths, in days
+
+
+def window_start(days: int, now: Optional[float] = None) -> int:
+    """
+    Unix timestamp at which a scoring window of `days` days begins.
+
+    Window bounds are passed to SQL as parameters, so every window length
+    shares one prepared statement.
+
+    Args:
+        days: Window length in days
+        now: Reference Unix time (defaults to current time)
+
+    Returns:
+        Start of the window, in whole Unix seconds
+    """
+    now = time.time() if now is None else now
+    return int(now) - days * SECONDS_PER_DAY
+
+
+def parse_windows(windows_arg: str) -> List[int]:
+    """
+    Parse a comma-separated list of window lengths.
+
+    Args:
+        windows_arg: Window lengths in days, e.g. "7,30,90"
+
+    Returns:
+        Distinct window lengths, shortest first
+
+    Raises:
+        ValueError: If a length is not a positive whole number of days
+    """
+    windows = sorted({int(days) for days in windows_arg.split(',')})
+    if not windows or windows[0] <= 0:
+        raise ValueError(f"Window lengths must be positive: {windows_arg}")
+    return windows
 
 
 class ScoreCategory(Enum):
@@ -49,6 +202,840 @@ class ConfidenceScore:
     trend: str = "neutral"  # up, down, neutral
 
 
+@dataclass
+class RunningStats:
+    """Mean and sample variance accumulated in one pass (Welford's algorithm)."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0  # Sum of squared differences from the mean
+
+    def add(self, value: float) -> None:
+        """Fold one value into the running mean and variance."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation (0 with fewer than two values)."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+# Confidence score schema; applied once per database when its connection
+# pool is created rather than on every save.
+#
+# smart_money_confidence is the append-only score history.
+# smart_money_confidence_latest holds one row per wallet (the most recently
+# inserted score) and is kept in step by a trigger, so the upsert happens in
+# the same transaction as the history insert and "latest" reads are an
+# indexed lookup that does not slow down as history grows. Its keyset and
+# category indexes match the (overall_score, wallet_address) listing order, so
+# paged listings seek straight to the next page.
+# smart_money_confidence_windows holds the latest multi-window scores, one row
+# per wallet and window length, so short- and long-term scores sit side by side.
+CONFIDENCE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS smart_money_confidence (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        wallet_address TEXT NOT NULL,
+        overall_score REAL NOT NULL,
+        win_rate_score REAL NOT NULL,
+        trade_count_score REAL NOT NULL,
+        avg_notional_score REAL NOT NULL,
+        consistency_score REAL NOT NULL,
+        market_timing_score REAL NOT NULL,
+        category TEXT NOT NULL,
+        trend TEXT DEFAULT 'neutral',
+        calculated_at INTEGER NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now'))
+    );
+
+    CREATE TABLE IF NOT EXISTS smart_money_confidence_latest (
+        wallet_address TEXT PRIMARY KEY,
+        history_id INTEGER NOT NULL,
+        overall_score REAL NOT NULL,
+        win_rate_score REAL NOT NULL,
+        trade_count_score REAL NOT NULL,
+        avg_notional_score REAL NOT NULL,
+        consistency_score REAL NOT NULL,
+        market_timing_score REAL NOT NULL,
+        category TEXT NOT NULL,
+        trend TEXT DEFAULT 'neutral',
+        calculated_at INTEGER NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_smart_money_confidence_latest_keyset
+    ON smart_money_confidence_latest(overall_score DESC, wallet_address DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_smart_money_confidence_latest_category
+    ON smart_money_confidence_latest(category, overall_score DESC, wallet_address DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_smart_money_confidence_latest_history
+    ON smart_money_confidence_latest(history_id, wallet_address, overall_score);
+
+    CREATE TRIGGER IF NOT EXISTS trg_smart_money_confidence_latest
+    AFTER INSERT ON smart_money_confidence
+    BEGIN
+        INSERT INTO smart_money_confidence_latest (
+            wallet_address, history_id, overall_score, win_rate_score,
+            trade_count_score, avg_notional_score, consistency_score,
+            market_timing_score, category, trend, calculated_at
+        ) VALUES (
+            NEW.wallet_address, NEW.id, NEW.overall_score, NEW.win_rate_score,
+            NEW.trade_count_score, NEW.avg_notional_score, NEW.consistency_score,
+            NEW.market_timing_score, NEW.category, NEW.trend, NEW.calculated_at
+        )
+        ON CONFLICT(wallet_address) DO UPDATE SET
+            history_id = excluded.history_id,
+            overall_score = excluded.overall_score,
+            win_rate_score = excluded.win_rate_score,
+            trade_count_score = excluded.trade_count_score,
+            avg_notional_score = excluded.avg_notional_score,
+            consistency_score = excluded.consistency_score,
+            market_timing_score = excluded.market_timing_score,
+            category = excluded.category,
+            trend = excluded.trend,
+            calculated_at = excluded.calculated_at;
+    END;
+
+    CREATE TABLE IF NOT EXISTS smart_money_confidence_windows (
+        wallet_address TEXT NOT NULL,
+        window_days INTEGER NOT NULL,
+        overall_score REAL NOT NULL,
+        win_rate_score REAL NOT NULL,
+        trade_count_score REAL NOT NULL,
+        avg_notional_score REAL NOT NULL,
+        consistency_score REAL NOT NULL,
+        market_timing_score REAL NOT NULL,
+        category TEXT NOT NULL,
+        trend TEXT DEFAULT 'neutral',
+        calculated_at INTEGER NOT NULL,
+        PRIMARY KEY (wallet_address, window_days)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_smart_money_confidence_windows_score
+    ON smart_money_confidence_windows(window_days, overall_score DESC);
+"""
+
+# Populates smart_money_confidence_latest from history that predates it.
+BACKFILL_LATEST_SQL = """
+    INSERT OR IGNORE INTO smart_money_confidence_latest (
+        wallet_address, history_id, overall_score, win_rate_score,
+        trade_count_score, avg_notional_score, consistency_score,
+        market_timing_score, category, trend, calculated_at
+    )
+    SELECT
+        wallet_address, id, overall_score, win_rate_score,
+        trade_count_score, avg_notional_score, consistency_score,
+        market_timing_score, category, trend, calculated_at
+    FROM smart_money_confidence
+    WHERE id IN (
+        SELECT MAX(id)
+        FROM smart_money_confidence
+        GROUP BY wallet_address
+    )
+"""
+
+# Wallets with any trade (open or closed) in a scoring window. Shared by every
+# scoring path so they all score the same set of wallets. The unary + keeps
+# SQLite from scanning a whole agent_id-first index to get DISTINCT for free
+# instead of seeking to the window.
+ACTIVE_WALLETS_SQL = """
+    SELECT DISTINCT +agent_id AS agent_id
+    FROM agent_trades
+    WHERE entry_timestamp >= ?
+"""
+
+# Per-wallet statistics for several windows in one pass over the longest
+# window (:since); each window's columns only count trades from its own
+# :since_<days> bound. Filled in by window_statistics_sql().
+WINDOW_STATISTICS_SQL = """
+    SELECT agent_id,
+    {columns}
+    FROM agent_trades
+    WHERE entry_timestamp >= :since
+      AND status = 'closed'
+      {wallet_filter}
+    GROUP BY agent_id
+"""
+
+WINDOW_STATISTICS_COLUMNS = """
+        SUM(CASE WHEN entry_timestamp >= :since_{days} THEN 1 ELSE 0 END) as total_trades_{days},
+        SUM(CASE WHEN entry_timestamp >= :since_{days} AND pnl > 0 THEN 1 ELSE 0 END) as winning_trades_{days},
+        AVG(CASE WHEN entry_timestamp >= :since_{days} THEN ABS(entry_price * quantity) END) as avg_notional_{days},
+        SUM(CASE WHEN entry_timestamp >= :since_{days} THEN pnl END) as total_pnl_{days},
+        AVG(CASE WHEN entry_timestamp >= :since_{days} THEN pnl END) as avg_pnl_{days}"""
+
+# Score history of one wallet since a time, oldest first
+WALLET_HISTORY_SQL = """
+    SELECT
+        wallet_address, overall_score, win_rate_score,
+        trade_count_score, avg_notional_score,
+        consistency_score, market_timing_score,
+        category, trend, calculated_at
+    FROM smart_money_confidence
+    WHERE wallet_address = ?
+      AND calculated_at >= ?
+    ORDER BY calculated_at ASC
+"""
+
+# Closed-trade statistics of one wallet since a time
+WALLET_STATISTICS_SQL = """
+    SELECT
+        COUNT(*) as total_trades,
+        SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) as winning_trades,
+        AVG(ABS(entry_price * quantity)) as avg_notional,
+        SUM(pnl) as total_pnl,
+        AVG(pnl) as avg_pnl
+    FROM agent_trades
+    WHERE agent_id = ?
+      AND entry_timestamp >= ?
+      AND status = 'closed'
+"""
+
+# Win rate of each of one wallet's days with enough closed trades since a time
+DAILY_WIN_RATES_SQL = """
+    SELECT
+        DATE(entry_timestamp, 'unixepoch') as trade_date,
+        SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as daily_win_rate
+    FROM agent_trades
+    WHERE agent_id = ?
+      AND entry_timestamp >= ?
+      AND status = 'closed'
+    GROUP BY trade_date
+    HAVING COUNT(*) >= 3  -- Only include days with sufficient trades
+"""
+
+# Closed trades of one wallet since a time, with what timing is scored from
+TIMING_TRADES_SQL = """
+    SELECT
+        symbol,
+        side,
+        entry_price,
+        exit_price,
+        entry_timestamp,
+        exit_timestamp
+    FROM agent_trades
+    WHERE agent_id = ?
+      AND entry_timestamp >= ?
+      AND status = 'closed'
+      AND exit_price IS NOT NULL
+      AND exit_price > 0
+"""
+
+# All-wallet versions of the queries above, over trades since :since.
+# {wallet_filter} limits the wallets scored (see wallet_filter_sql).
+BATCH_STATISTICS_SQL = """
+    SELECT
+        agent_id,
+        COUNT(*) as total_trades,
+        SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) as winning_trades,
+        AVG(ABS(entry_price * quantity)) as avg_notional,
+        SUM(pnl) as total_pnl,
+        AVG(pnl) as avg_pnl
+    FROM agent_trades
+    WHERE entry_timestamp >= :since
+      AND status = 'closed'
+      {wallet_filter}
+    GROUP BY agent_id
+"""
+
+BATCH_DAILY_WIN_RATES_SQL = """
+    SELECT
+        agent_id,
+        DATE(entry_timestamp, 'unixepoch') as trade_date,
+        SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as daily_win_rate
+    FROM agent_trades
+    WHERE entry_timestamp >= :since
+      AND status = 'closed'
+      {wallet_filter}
+    GROUP BY agent_id, trade_date
+    HAVING COUNT(*) >= 3  -- Only include days with sufficient trades
+"""
+
+BATCH_TIMING_TRADES_SQL = """
+    SELECT agent_id, symbol, side, entry_price, exit_price,
+           entry_timestamp, exit_timestamp
+    FROM agent_trades
+    WHERE entry_timestamp >= :since
+      AND status = 'closed'
+      AND exit_price IS NOT NULL
+      AND exit_price > 0
+      {wallet_filter}
+"""
+
+# Daily trade and win counts per wallet for several windows in one pass over
+# the longest window. The oldest day of a window is partial, so counts are
+# per window. Filled in by window_daily_counts_sql().
+WINDOW_DAILY_COUNTS_SQL = """
+    SELECT agent_id,
+           DATE(entry_timestamp, 'unixepoch') as trade_date,
+    {columns}
+    FROM agent_trades
+    WHERE entry_timestamp >= :since
+      AND status = 'closed'
+      {wallet_filter}
+    GROUP BY agent_id, trade_date
+    HAVING COUNT(*) >= 3  -- No shorter window can qualify a day the longest does not
+    ORDER BY agent_id, trade_date
+"""
+
+WINDOW_DAILY_COUNT_COLUMNS = """
+        SUM(CASE WHEN entry_timestamp >= :since_{days} THEN 1 ELSE 0 END) as trades_{days},
+        SUM(CASE WHEN entry_timestamp >= :since_{days} AND pnl > 0 THEN 1 ELSE 0 END) as wins_{days}"""
+
+# Latest saved multi-window scores; {placeholders} holds one ? per window
+WINDOW_PREVIOUS_SCORES_SQL = """
+    SELECT wallet_address, window_days, overall_score
+    FROM smart_money_confidence_windows
+    WHERE window_days IN ({placeholders})
+"""
+
+# Latest scores saved after a history id, in save order
+LATEST_SCORES_SINCE_SQL = """
+    SELECT history_id, wallet_address, overall_score
+    FROM smart_money_confidence_latest
+    WHERE history_id > ?
+    ORDER BY history_id
+"""
+
+# Elite wallets trending down whose latest score dropped by :drop_threshold or
+# more from the one before it (LAG over the wallet's history since :since)
+CONFIDENCE_ALERTS_SQL = """
+    WITH recent AS (
+        SELECT
+            h.wallet_address,
+            h.overall_score,
+            LAG(h.overall_score) OVER wallet_history AS previous_score,
+            LEAD(h.id) OVER wallet_history AS next_id
+        FROM smart_money_confidence_latest l
+        JOIN smart_money_confidence h
+          ON h.wallet_address = l.wallet_address
+        WHERE l.overall_score >= :threshold
+          AND l.trend = 'down'
+          AND h.calculated_at >= :since
+        WINDOW wallet_history AS (
+            PARTITION BY h.wallet_address
+            ORDER BY h.calculated_at, h.id
+        )
+    )
+    SELECT wallet_address, previous_score, overall_score AS current_score
+    FROM recent
+    WHERE next_id IS NULL
+      AND previous_score - overall_score >= :drop_threshold
+    ORDER BY previous_score - overall_score DESC
+"""
+
+
+def per_window_columns(template: str, windows: Sequence[int]) -> str:
+    """
+    Repeat a column template once per window.
+
+    Args:
+        template: Column SQL with a {days} placeholder
+        windows: Window lengths in days
+
+    Returns:
+        Comma-separated columns for every window
+    """
+    return ',\n'.join(template.format(days=days) for days in windows)
+
+
+def window_statistics_sql(windows: Sequence[int], wallet_filter: str = '') -> str:
+    """
+    Build the multi-window statistics query.
+
+    Args:
+        windows: Window lengths in days
+        wallet_filter: Extra WHERE condition limiting the wallets scored
+
+    Returns:
+        SQL taking :since and one :since_<days> parameter per window
+    """
+    return WINDOW_STATISTICS_SQL.format(
+        columns=per_window_columns(WINDOW_STATISTICS_COLUMNS, windows),
+        wallet_filter=wallet_filter
+    )
+
+
+def window_daily_counts_sql(windows: Sequence[int], wallet_filter: str = '') -> str:
+    """
+    Build the multi-window daily trade and win count query.
+
+    Args:
+        windows: Window lengths in days
+        wallet_filter: Extra WHERE condition limiting the wallets scored
+
+    Returns:
+        SQL taking :since and one :since_<days> parameter per window
+    """
+    return WINDOW_DAILY_COUNTS_SQL.format(
+        columns=per_window_columns(WINDOW_DAILY_COUNT_COLUMNS, windows),
+        wallet_filter=wallet_filter
+    )
+
+
+def wallet_filter_sql(wallet_addresses: Optional[Sequence[str]]) -> Tuple[str, Dict[str, str]]:
+    """
+    Build the {wallet_filter} condition of the all-wallet scoring queries.
+
+    Args:
+        wallet_addresses: Wallets to score, or None for every wallet
+
+    Returns:
+        (SQL condition, its :wallet_<i> parameters)
+    """
+    if wallet_addresses is None:
+        return '', {}
+    params = {f'wallet_{i}': wallet for i, wallet in enumerate(wallet_addresses)}
+    return 'AND agent_id IN ({})'.format(', '.join(f':{name}' for name in params)), params
+
+
+def latest_score_page_sql(columns: Sequence[str], by_category: bool = False,
+                          after: bool = False) -> str:
+    """
+    Build the keyset-paginated listing of latest scores.
+
+    Args:
+        columns: Columns to select (must be checked against LATEST_SCORE_COLUMNS)
+        by_category: Filter on :category
+        after: Start after (:after_score, :after_wallet)
+
+    Returns:
+        SQL taking :limit and the parameters of the enabled filters
+    """
+    conditions = []
+    if by_category:
+        conditions.append("category = :category")
+    if after:
+        conditions.append("(overall_score, wallet_address) < (:after_score, :after_wallet)")
+
+    sql = "SELECT {} FROM smart_money_confidence_latest".format(', '.join(columns))
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY overall_score DESC, wallet_address DESC LIMIT :limit"
+
+
+def ensure_confidence_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the confidence tables and backfill the latest-score table.
+
+    Args:
+        conn: Writable database connection
+    """
+    conn.executescript(CONFIDENCE_SCHEMA)
+
+    has_latest = conn.execute(
+        "SELECT 1 FROM smart_money_confidence_latest LIMIT 1"
+    ).fetchone()
+    if not has_latest:
+        conn.execute(BACKFILL_LATEST_SQL)
+
+    conn.commit()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of tuned SQLite connections for one database file.
+
+    Connections are opened lazily up to `size` and handed out per thread.
+    Nested `connection()` calls on the same thread reuse the connection the
+    thread already holds, so a full wallet score borrows a single connection.
+    Each connection keeps its own prepared-statement cache.
+    """
+
+    PRAGMAS = {
+        'synchronous': 'NORMAL',      # Safe with WAL, avoids fsync per commit
+        'cache_size': -65536,         # 64 MiB page cache
+        'mmap_size': 268435456,       # 256 MiB memory-mapped I/O
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,         # Wait up to 5s on a locked database
+    }
+
+    def __init__(self, db_path: str, size: int = 8, readonly: bool = False,
+                 cached_statements: int = 256):
+        """
+        Initialize the pool.
+
+        Args:
+            db_path: Path to SQLite database
+            size: Maximum number of open connections
+            readonly: Open connections in read-only mode
+            cached_statements: Prepared statements cached per connection
+        """
+        self.db_path = db_path
+        self.size = size
+        self.readonly = readonly
+        self.cached_statements = cached_statements
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if not readonly:
+            conn = self._open()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                ensure_confidence_schema(conn)
+            finally:
+                self._idle.put(conn)
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection."""
+        with self._lock:
+            self._opened += 1
+
+        if self.readonly:
+            conn = sqlite3.connect(
+                'file:{}?mode=ro'.format(pathname2url(os.path.abspath(self.db_path))),
+                uri=True,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.PRAGMAS.items():
+            conn.execute("PRAGMA {}={}".format(pragma, value))
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._opened < self.size
+
+        if can_open:
+            return self._open()
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the block."""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 0
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools: Dict[Tuple[str, bool, int], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path: str, readonly: bool = False) -> ConnectionPool:
+    """
+    Get the shared connection pool for a database.
+
+    Pools are shared by every calculator in the process (and recreated in
+    forked children, which must not reuse the parent's connections).
+
+    Args:
+        db_path: Path to SQLite database
+        readonly: Return the read-only pool
+
+    Returns:
+        ConnectionPool for the database
+    """
+    key = (os.path.abspath(db_path), readonly, os.getpid())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, readonly=readonly)
+        return pool
+
+
+class PreviousScoreCache:
+    """
+    In-memory copy of each wallet's most recent saved overall score.
+
+    Trend classification compares against the previous score, so keeping
+    these in memory removes a query per scored wallet. The cache is warmed
+    with one query, updated by every save, and caught up with writes from
+    other processes by reading only rows newer than its history-id watermark
+    (at most once every `refresh_interval` seconds).
+
+    With `persist_path` set, the cache is written to a JSON snapshot at exit
+    and after batch runs, and a cold start loads the snapshot and reads only
+    the rows saved since it was taken.
+    """
+
+    def __init__(self, pool: ConnectionPool, persist_path: Optional[str] = None,
+                 refresh_interval: float = 5.0):
+        """
+        Initialize the cache (it is warmed on first use).
+
+        Args:
+            pool: Connection pool for the database holding the scores
+            persist_path: Optional JSON snapshot path for cheap cold starts
+            refresh_interval: Seconds between catch-up reads for writes made
+                              by other processes
+        """
+        self.pool = pool
+        self.persist_path = persist_path
+        self.refresh_interval = refresh_interval
+        self.scores: Dict[str, float] = {}
+        self.watermark = 0  # Highest history id reflected in scores
+        self._watermark_wallet: Optional[str] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+        if persist_path:
+            atexit.register(self.persist)
+
+    def get(self, wallet_address: str) -> Optional[float]:
+        """
+        Get a wallet's previous score.
+
+        Returns:
+            Most recent saved overall score, or None if never scored
+        """
+        self._maybe_refresh()
+        return self.scores.get(wallet_address)
+
+    def get_all(self) -> Dict[str, float]:
+        """Get a snapshot of every wallet's previous score."""
+        self._maybe_refresh()
+        with self._lock:
+            return dict(self.scores)
+
+    def _maybe_refresh(self) -> None:
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or time.monotonic() - refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Read scores saved since the watermark (all scores on first use).
+
+        Returns:
+            Number of rows read
+        """
+        return len(self.poll())
+
+    def poll(self) -> List[Tuple[str, Optional[float], float]]:
+        """
+        Read scores saved since the watermark, with the scores they replace.
+
+        Returns:
+            (wallet address, previous score or None, new score) per row
+            read, in save order
+        """
+        # Borrow the connection before taking the lock: a caller waiting on the
+        # pool must not hold the lock a connection holder needs to finish
+        with self.pool.connection() as conn, self._lock:
+            cursor = conn.cursor()
+
+            if self._refreshed_at is None and self.persist_path:
+                self._load_snapshot(cursor)
+
+            cursor.execute(LATEST_SCORES_SINCE_SQL, (self.watermark,))
+            rows = cursor.fetchall()
+
+            changes = []
+            for row in rows:
+                wallet_address = row['wallet_address']
+                changes.append((wallet_address, self.scores.get(wallet_address), row['overall_score']))
+                self.scores[wallet_address] = row['overall_score']
+            if rows:
+                self.watermark = rows[-1]['history_id']
+                self._watermark_wallet = rows[-1]['wallet_address']
+
+            self._refreshed_at = time.monotonic()
+            return changes
+
+    def update(self, scores: List['ConfidenceScore'],
+               first_id: Optional[int] = None, last_id: Optional[int] = None) -> None:
+        """
+        Record newly saved scores.
+
+        Args:
+            scores: Scores just committed, in insert order
+            first_id: History id of the first inserted row
+            last_id: History id of the last inserted row
+        """
+        with self._lock:
+            if self._refreshed_at is None:
+                return  # Not warmed yet; the first refresh reads these rows
+
+            for score in scores:
+                self.scores[score.wallet_address] = score.overall_score
+
+            # Advance the watermark only if no other writer's rows sit between
+            if first_id is not None and first_id == self.watermark + 1 and scores:
+                self.watermark = last_id
+                self._watermark_wallet = scores[-1].wallet_address
+
+    def persist(self) -> bool:
+        """
+        Write the cache to its JSON snapshot.
+
+        Returns:
+            True if written, False if persistence is off or the write failed
+        """
+        if not self.persist_path or self._refreshed_at is None:
+            return False
+
+        with self._lock:
+            snapshot = {
+                'watermark': self.watermark,
+                'watermark_wallet': self._watermark_wallet,
+                'scores': self.scores
+            }
+            try:
+                tmp_path = f"{self.persist_path}.tmp{os.getpid()}"
+                with open(tmp_path, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.persist_path)
+                return True
+            except OSError as e:
+                print(f"Error persisting previous scores: {e}")
+                return False
+
+    def _load_snapshot(self, cursor: sqlite3.Cursor) -> None:
+        """Load the JSON snapshot if it still matches the database."""
+        try:
+            with open(self.persist_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # The watermark row must still exist, or the database was reset
+        watermark = snapshot.get('watermark', 0)
+        if watermark:
+            cursor.execute("""
+                SELECT wallet_address
+                FROM smart_money_confidence
+                WHERE id = ?
+            """, (watermark,))
+            row = cursor.fetchone()
+            if row is None or row['wallet_address'] != snapshot.get('watermark_wallet'):
+                return
+
+        self.scores = {wallet: float(score) for wallet, score in snapshot.get('scores', {}).items()}
+        self.watermark = watermark
+        self._watermark_wallet = snapshot.get('watermark_wallet')
+
+
+_score_caches: Dict[Tuple[str, int], PreviousScoreCache] = {}
+
+# Called after every successful save (e.g. to invalidate API response caches).
+SaveListener = Callable[[List['ConfidenceScore'], Optional[int]], None]
+_save_listeners: List[SaveListener] = []
+
+
+def add_save_listener(listener: SaveListener) -> None:
+    """
+    Register a callback to run after confidence scores are saved.
+
+    Args:
+        listener: Called as listener(scores, window_days) once the save has
+                  committed. window_days is None for the main score history
+                  and the window length for multi-window scores.
+    """
+    if listener not in _save_listeners:
+        _save_listeners.append(listener)
+
+
+def remove_save_listener(listener: SaveListener) -> None:
+    """Unregister a save listener."""
+    if listener in _save_listeners:
+        _save_listeners.remove(listener)
+
+
+def _notify_save_listeners(scores: List['ConfidenceScore'],
+                           window_days: Optional[int] = None) -> None:
+    for listener in list(_save_listeners):
+        try:
+            listener(scores, window_days)
+        except Exception as e:
+            print(f"Error in score save listener: {e}")
+
+
+def build_confidence_alert(wallet_address: str, previous_score: float,
+                           current_score: float) -> Dict:
+    """
+    Build a confidence-drop alert.
+
+    Args:
+        wallet_address: Wallet address
+        previous_score: Score before the drop
+        current_score: Score after the drop
+
+    Returns:
+        Alert dict (drops of 20+ points are CRITICAL, others WARNING)
+    """
+    drop = previous_score - current_score
+    return {
+        'wallet_address': wallet_address,
+        'previous_score': previous_score,
+        'current_score': current_score,
+        'drop': round(drop, 2),
+        'drop_percentage': round((drop / previous_score) * 100, 2),
+        'alert_level': 'CRITICAL' if drop >= 20 else 'WARNING'
+    }
+
+
+def get_previous_score_cache(db_path: str, pool: ConnectionPool,
+                             persist_path: Optional[str] = None) -> PreviousScoreCache:
+    """
+    Get the shared previous-score cache for a database.
+
+    Args:
+        db_path: Path to SQLite database
+        pool: Connection pool used to warm the cache if it is created
+        persist_path: Optional JSON snapshot path
+
+    Returns:
+        PreviousScoreCache for the database
+    """
+    key = (os.path.abspath(db_path), os.getpid())
+    with _pools_lock:
+        cache = _score_caches.get(key)
+        if cache is None:
+            cache = _score_caches[key] = PreviousScoreCache(pool, persist_path)
+        elif persist_path and not cache.persist_path:
+            cache.persist_path = persist_path
+            atexit.register(cache.persist)
+        return cache
+
+
 class SmartMoneyConfidenceCalculator:
     """
     Calculates Smart Money Confidence Scores based on multiple factors.
@@ -63,17 +1050,31 @@ class SmartMoneyConfidenceCalculator:
         'market_timing': 0.15
     }
 
-    def __init__(self, db_path: str = 'quant/data/trading.db'):
+    def __init__(self, db_path: str = 'quant/data/trading.db', readonly: bool = False,
+                 candle_store: Optional[CandleStore] = None,
+                 score_cache_path: Optional[str] = None):
         """
         Initialize the confidence calculator.
 
         Args:
             db_path: Path to SQLite database containing trade data
+            readonly: Use read-only connections (scoring only, no saves)
+            candle_store: Local OHLCV candles for market timing; trades
+                          without candle coverage use price-only scoring
+            score_cache_path: Optional JSON snapshot of the previous-score
+                              cache, so cold starts skip the full warm query
         """
         self.db_path = db_path
+        self.pool = get_connection_pool(db_path, readonly=readonly)
+        self.candle_store = candle_store
+        self.previous_scores = get_previous_score_cache(db_path, self.pool, score_cache_path)
+
+    def connection(self):
+        """Borrow a pooled connection (context manager)."""
+        return self.pool.connection()
 
     def get_db_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
+        """Get a standalone database connection (caller must close it)."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
@@ -151,60 +1152,76 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             Score from 0-100
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        try:
             # Get daily win rates over the period
-            cursor.execute("""
-                SELECT
-                    DATE(entry_timestamp, 'unixepoch') as trade_date,
-                    SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as daily_win_rate
-                FROM agent_trades
-                WHERE agent_id = ?
-                  AND entry_timestamp >= strftime('%s', 'now', '-{} days')
-                  AND status = 'closed'
-                GROUP BY trade_date
-                HAVING COUNT(*) >= 3  -- Only include days with sufficient trades
-            """.format(days), (wallet_address,))
+            cursor.execute(DAILY_WIN_RATES_SQL, (wallet_address, window_start(days)))
 
             rows = cursor.fetchall()
 
-            if len(rows) < 3:  # Need at least 3 days of data
-                return 0
+            return self.score_daily_win_rates([row['daily_win_rate'] for row in rows])
+
+
+    def score_daily_win_rates(self, daily_win_rates: List[float]) -> float:
+        """
+        Map a series of daily win rates to a consistency score (0-100 points).
+
+        Shared by the per-wallet and batch scoring paths so both produce
+        identical scores.
+
+        Args:
+            daily_win_rates: Win rate percentage for each qualifying day,
+                             oldest first
+
+        Returns:
+            Score from 0-100
+        """
+        stats = RunningStats()
+        for win_rate in daily_win_rates:
+            stats.add(win_rate)
+
+        return self.score_consistency(stats)
+
+    @staticmethod
+    def score_consistency(stats: RunningStats) -> float:
+        """
+        Map running daily win rate statistics to a consistency score (0-100).
+
+        Args:
+            stats: Mean and variance of the qualifying daily win rates
 
-            daily_win_rates = [row['daily_win_rate'] for row in rows]
+        Returns:
+            Score from 0-100
+        """
+        if stats.count < 3:  # Need at least 3 days of data
+            return 0
 
-            # Calculate coefficient of variation (CV)
-            # Lower CV = more consistent = higher score
-            mean_win_rate = statistics.mean(daily_win_rate)
-            if mean_win_rate == 0:
-                return 0
+        # Calculate coefficient of variation (CV)
+        # Lower CV = more consistent = higher score
+        if stats.mean == 0:
+            return 0
 
-            std_dev = statistics.stdev(daily_win_rates) if len(daily_win_rates) > 1 else 0
-            cv = (std_dev / mean_win_rate) * 100  # Coefficient of variation as percentage
-
-            # CV to score mapping
-            # CV < 10 = 100 points
-            # CV < 20 = 80 points
-            # CV < 30 = 60 points
-            # CV < 50 = 40 points
-            # CV >= 50 = 20 points
-            if cv < 10:
-                score = 100
-            elif cv < 20:
-                score = 100 - (cv - 10) * 2  # 100 -> 80
-            elif cv < 30:
-                score = 80 - (cv - 20) * 2  # 80 -> 60
-            elif cv < 50:
-                score = 60 - (cv - 30) * 1  # 60 -> 40
-            else:
-                score = max(40 - (cv - 50) * 0.5, 20)  # 40 -> 20
-
-            return score
+        cv = (stats.stdev / stats.mean) * 100  # Coefficient of variation as percentage
+
+        # CV to score mapping
+        # CV < 10 = 100 points
+        # CV < 20 = 80 points
+        # CV < 30 = 60 points
+        # CV < 50 = 40 points
+        # CV >= 50 = 20 points
+        if cv < 10:
+            score = 100
+        elif cv < 20:
+            score = 100 - (cv - 10) * 2  # 100 -> 80
+        elif cv < 30:
+            score = 80 - (cv - 20) * 2  # 80 -> 60
+        elif cv < 50:
+            score = 60 - (cv - 30) * 1  # 60 -> 40
+        else:
+            score = max(40 - (cv - 50) * 0.5, 20)  # 40 -> 20
 
-        finally:
-            conn.close()
+        return score
 
     def calculate_market_timing_score(self, wallet_address: str,
                                       days: int = 30) -> float:
@@ -212,7 +1229,8 @@ class SmartMoneyConfidenceCalculator:
         Calculate market timing score (0-100 points).
 
         Measures if wallet tends to buy low and sell high.
-        Compares entry/exit prices with average price over holding period.
+        Compares entry/exit prices with the VWAP and price range over the
+        holding period when candles are available (see score_trades_timing).
 
         Args:
             wallet_address: Wallet address
@@ -221,67 +1239,72 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             Score from 0-100
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        try:
-            cursor.execute("""
-                SELECT
-                    symbol,
-                    side,
-                    entry_price,
-                    exit_price,
-                    entry_timestamp,
-                    exit_timestamp
-                FROM agent_trades
-                WHERE agent_id = ?
-                  AND entry_timestamp >= strftime('%s', 'now', '-{} days')
-                  AND status = 'closed'
-                  AND exit_price IS NOT NULL
-                  AND exit_price > 0
-            """.format(days), (wallet_address,))
+            cursor.execute(TIMING_TRADES_SQL, (wallet_address, window_start(days)))
 
             rows = cursor.fetchall()
 
             if len(rows) == 0:
                 return 0
 
-            timing_scores = []
-
-            for trade in rows:
-                # Calculate average price during holding period
-                # This is a simplified version - in production, you'd use OHLCV data
-                holding_period = trade['exit_timestamp'] - trade['entry_timestamp']
-
-                # Normalize timing score based on PnL percentage
-                if trade['side'].lower() == 'buy':
-                    # Long: buy low, sell high
-                    if trade['exit_price'] > trade['entry_price']:
-                        # Good timing - calculate score based on how much profit
-                        pct_gain = ((trade['exit_price'] - trade['entry_price']) / trade['entry_price']) * 100
-                        score = min(100, 50 + pct_gain / 2)  # Base 50, bonus for gains
-                    else:
-                        # Bad timing
-                        pct_loss = ((trade['entry_price'] - trade['exit_price']) / trade['entry_price']) * 100
-                        score = max(0, 50 - pct_loss)  # Penalize losses
-                else:  # sell / short
-                    # Short: sell high, buy low
-                    if trade['entry_price'] > trade['exit_price']:
-                        # Good timing
-                        pct_gain = ((trade['entry_price'] - trade['exit_price']) / trade['entry_price']) * 100
-                        score = min(100, 50 + pct_gain / 2)
-                    else:
-                        # Bad timing
-                        pct_loss = ((trade['exit_price'] - trade['entry_price']) / trade['entry_price']) * 100
-                        score = max(0, 50 - pct_loss)
-
-                timing_scores.append(score)
-
             # Average timing score
-            return statistics.mean(timing_scores) if timing_scores else 0
+            return mean_timing_score(self.score_trades_timing(rows))
 
-        finally:
-            conn.close()
+    def score_trades_timing(self, rows: List) -> List[float]:
+        """
+        Calculate timing scores (0-100) for closed trades.
+
+        Trades are scored from price alone in one vectorized pass, then trades
+        whose holding period is covered by the candle store are rescored
+        against the period's VWAP and price range.
+
+        Args:
+            rows: Trades with symbol, side, entry_price, exit_price,
+                  entry_timestamp and exit_timestamp
+
+        Returns:
+            Timing score per trade, in row order
+        """
+        scores = market_timing_scores(
+            [row['side'] for row in rows],
+            [row['entry_price'] for row in rows],
+            [row['exit_price'] for row in rows]
+        )
+        if np is not None:
+            scores = scores.tolist()
+
+        if self.candle_store is not None:
+            self.candle_store.refresh()  # Check candle files once per run
+            for i, row in enumerate(rows):
+                stats = self.candle_store.holding_period(
+                    row['symbol'], row['entry_timestamp'], row['exit_timestamp']
+                )
+                if stats is not None:
+                    scores[i] = score_trade_timing_ohlcv(
+                        row['side'], row['entry_price'], row['exit_price'], stats
+                    )
+
+        return scores
+
+    @staticmethod
+    def score_trade_timing(side: str, entry_price: float, exit_price: float) -> float:
+        """
+        Calculate the timing score (0-100) of a single closed trade.
+
+        This is the price-only score, used when no candles cover the trade
+        (see score_trade_timing_ohlcv for the holding-period version).
+
+        Args:
+            side: Trade side ('buy' for long, anything else for short)
+            entry_price: Entry price
+            exit_price: Exit price
+
+        Returns:
+            Score from 0-100
+        """
+        return market_timing_score(side, entry_price, exit_price)
 
     def get_wallet_statistics(self, wallet_address: str, days: int = 30) -> Dict:
         """
@@ -294,22 +1317,10 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             Dictionary with win_rate, trade_count, avg_notional
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        try:
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as total_trades,
-                    SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) as winning_trades,
-                    AVG(ABS(entry_price * quantity)) as avg_notional,
-                    SUM(pnl) as total_pnl,
-                    AVG(pnl) as avg_pnl
-                FROM agent_trades
-                WHERE agent_id = ?
-                  AND entry_timestamp >= strftime('%s', 'now', '-{} days')
-                  AND status = 'closed'
-            """.format(days), (wallet_address,))
+            cursor.execute(WALLET_STATISTICS_SQL, (wallet_address, window_start(days)))
 
             row = cursor.fetchone()
 
@@ -332,8 +1343,6 @@ class SmartMoneyConfidenceCalculator:
                 'avg_pnl': row['avg_pnl'] or 0
             }
 
-        finally:
-            conn.close()
 
     def calculate_overall_score(self, win_rate_score: float,
                                 trade_count_score: float,
@@ -371,6 +1380,61 @@ class SmartMoneyConfidenceCalculator:
 
         return min(max(overall, 0), 100)
 
+    def calculate_component_scores(self, win_rates: Sequence[float],
+                                   trade_counts: Sequence[int],
+                                   avg_notionals: Sequence[float],
+                                   consistency_scores: Sequence[float],
+                                   market_timing_scores: Sequence[float]) -> Tuple[List[float], ...]:
+        """
+        Calculate component and overall scores for many wallets as array operations.
+
+        Applies calculate_win_rate_score, calculate_trade_count_score,
+        calculate_avg_notional_score and calculate_overall_score element-wise
+        to per-wallet columns. Single wallets are scored through here too, so
+        batch and per-wallet scores are identical.
+
+        Args:
+            win_rates: Win rate percentage per wallet
+            trade_counts: Closed trade count per wallet
+            avg_notionals: Average trade notional per wallet
+            consistency_scores: Consistency score per wallet (0-100)
+            market_timing_scores: Market timing score per wallet (0-100)
+
+        Returns:
+            (win_rate_scores, trade_count_scores, avg_notional_scores,
+            overall_scores), one list entry per wallet
+        """
+        if np is None:
+            win_rate_scores = [self.calculate_win_rate_score(rate) for rate in win_rates]
+            trade_count_scores = [self.calculate_trade_count_score(count) for count in trade_counts]
+            avg_notional_scores = [self.calculate_avg_notional_score(notional) for notional in avg_notionals]
+            overall_scores = [
+                self.calculate_overall_score(*components)
+                for components in zip(win_rate_scores, trade_count_scores, avg_notional_scores,
+                                      consistency_scores, market_timing_scores)
+            ]
+            return win_rate_scores, trade_count_scores, avg_notional_scores, overall_scores
+
+        win_rate = np.clip(np.asarray(win_rates, dtype=float), 0, 100)
+
+        # Logarithmic scales, as in the scalar methods (0 trades or notional score 0)
+        counts = np.asarray(trade_counts, dtype=float)
+        trade_count = np.minimum(50 * (np.log10(counts + 1) / math.log10(101)), 50)
+        notional = np.maximum(np.asarray(avg_notionals, dtype=float), 0)
+        avg_notional = np.minimum(50 * (np.log10(notional + 1) / math.log10(1000001)), 50)
+
+        # Weighted average, with the 0-50 components normalized to 0-100
+        overall = np.clip(
+            win_rate * self.WEIGHTS['win_rate'] +
+            trade_count * 2 * self.WEIGHTS['trade_count'] +
+            avg_notional * 2 * self.WEIGHTS['avg_notional'] +
+            np.asarray(consistency_scores, dtype=float) * self.WEIGHTS['consistency'] +
+            np.asarray(market_timing_scores, dtype=float) * self.WEIGHTS['market_timing'],
+            0, 100
+        )
+
+        return win_rate.tolist(), trade_count.tolist(), avg_notional.tolist(), overall.tolist()
+
     def get_category(self, score: float) -> ScoreCategory:
         """
         Get score category based on confidence score.
@@ -404,31 +1468,107 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             ConfidenceScore object
         """
-        # Get basic statistics
-        stats = self.get_wallet_statistics(wallet_address, days)
-
-        # Calculate individual scores
-        win_rate_score = self.calculate_win_rate_score(stats['win_rate'])
-        trade_count_score = self.calculate_trade_count_score(stats['trade_count'])
-        avg_notional_score = self.calculate_avg_notional_score(stats['avg_notional'])
-        consistency_score = self.calculate_consistency_score(wallet_address, days)
-        market_timing_score = self.calculate_market_timing_score(wallet_address, days)
-
-        # Calculate overall score
-        overall_score = self.calculate_overall_score(
-            win_rate_score,
-            trade_count_score,
-            avg_notional_score,
-            consistency_score,
-            market_timing_score
-        )
+        # Hold one pooled connection for every query of this wallet
+        with self.connection():
+            # Get basic statistics
+            stats = self.get_wallet_statistics(wallet_address, days)
+
+            consistency_score = self.calculate_consistency_score(wallet_address, days)
+            market_timing_score = self.calculate_market_timing_score(wallet_address, days)
+
+            return self.build_confidence_score(
+                wallet_address,
+                stats,
+                consistency_score,
+                market_timing_score,
+                trend_fn=lambda overall: self.calculate_trend(wallet_address, overall)
+            )
+
+    def build_confidence_score(self, wallet_address: str, stats: Dict,
+                               consistency_score: float,
+                               market_timing_score: float,
+                               trend_fn=None,
+                               calculated_at: Optional[datetime] = None) -> ConfidenceScore:
+        """
+        Combine pre-computed wallet inputs into a ConfidenceScore.
+
+        Args:
+            wallet_address: Wallet address
+            stats: Statistics dict as returned by get_wallet_statistics
+            consistency_score: Consistency score (0-100)
+            market_timing_score: Market timing score (0-100)
+            trend_fn: Callable mapping the unrounded overall score to a trend
+                      (defaults to 'neutral')
+            calculated_at: Calculation timestamp (defaults to now)
 
-        # Get category
-        category = self.get_category(overall_score)
+        Returns:
+            ConfidenceScore object
+        """
+        (win_rate_score,), (trade_count_score,), (avg_notional_score,), (overall_score,) = (
+            self.calculate_component_scores(
+                [stats['win_rate']], [stats['trade_count']], [stats['avg_notional']],
+                [consistency_score], [market_timing_score]
+            )
+        )
 
         # Calculate trend (compare with previous score)
-        trend = self.calculate_trend(wallet_address, overall_score)
+        trend = trend_fn(overall_score) if trend_fn else 'neutral'
 
+        return self._make_confidence_score(
+            wallet_address, overall_score, win_rate_score, trade_count_score,
+            avg_notional_score, consistency_score, market_timing_score, trend,
+            calculated_at or datetime.utcnow()
+        )
+
+    def build_confidence_scores(self, wallet_addresses: Sequence[str],
+                                stats: Sequence[Dict],
+                                consistency_scores: Sequence[float],
+                                market_timing_scores: Sequence[float],
+                                previous_scores: Sequence[Optional[float]],
+                                calculated_at: datetime) -> List[ConfidenceScore]:
+        """
+        Combine pre-computed inputs for many wallets into ConfidenceScores.
+
+        The component and overall scores are computed column-wise with
+        calculate_component_scores.
+
+        Args:
+            wallet_addresses: Wallet addresses
+            stats: Statistics dict per wallet, as returned by get_wallet_statistics
+            consistency_scores: Consistency score per wallet (0-100)
+            market_timing_scores: Market timing score per wallet (0-100)
+            previous_scores: Previous overall score per wallet (None if never scored)
+            calculated_at: Calculation timestamp
+
+        Returns:
+            List of ConfidenceScore objects, in wallet order
+        """
+        components = self.calculate_component_scores(
+            [wallet_stats['win_rate'] for wallet_stats in stats],
+            [wallet_stats['trade_count'] for wallet_stats in stats],
+            [wallet_stats['avg_notional'] for wallet_stats in stats],
+            consistency_scores,
+            market_timing_scores
+        )
+
+        return [
+            self._make_confidence_score(
+                wallet_address, overall_score, win_rate_score, trade_count_score,
+                avg_notional_score, consistency_score, market_timing_score,
+                self.classify_trend(overall_score, previous_score), calculated_at
+            )
+            for (wallet_address, win_rate_score, trade_count_score, avg_notional_score,
+                 overall_score, consistency_score, market_timing_score, previous_score)
+            in zip(wallet_addresses, *components, consistency_scores,
+                   market_timing_scores, previous_scores)
+        ]
+
+    def _make_confidence_score(self, wallet_address: str, overall_score: float,
+                               win_rate_score: float, trade_count_score: float,
+                               avg_notional_score: float, consistency_score: float,
+                               market_timing_score: float, trend: str,
+                               calculated_at: datetime) -> ConfidenceScore:
+        """Round the component scores and categorize the overall score."""
         return ConfidenceScore(
             wallet_address=wallet_address,
             overall_score=round(overall_score, 2),
@@ -437,15 +1577,243 @@ class SmartMoneyConfidenceCalculator:
             avg_notional_score=round(avg_notional_score, 2),
             consistency_score=round(consistency_score, 2),
             market_timing_score=round(market_timing_score, 2),
-            category=category,
-            calculated_at=datetime.utcnow(),
+            category=self.get_category(overall_score),
+            calculated_at=calculated_at,
             trend=trend
         )
 
+    def get_active_wallets(self, days: int = 30, now: Optional[float] = None,
+                           conn: Optional[sqlite3.Connection] = None) -> List[str]:
+        """
+        Get every wallet with trades in the analysis window.
+
+        Args:
+            days: Number of days to look back
+            now: Reference Unix time for the window (defaults to current time)
+            conn: Connection to read with, e.g. to stay inside the caller's
+                  transaction (defaults to a pooled connection)
+
+        Returns:
+            List of wallet addresses
+        """
+        if conn is None:
+            with self.connection() as conn:
+                return self.get_active_wallets(days, now, conn)
+
+        cursor = conn.execute(ACTIVE_WALLETS_SQL, (window_start(days, now),))
+        return [row['agent_id'] for row in cursor.fetchall()]
+
+    def calculate_all_confidences(self, days: int = 30,
+                                  wallet_addresses: Optional[List[str]] = None) -> List[ConfidenceScore]:
+        """
+        Calculate confidence scores for every active wallet in one set-based pass.
+
+        Instead of running four queries per wallet, the per-wallet aggregates
+        (statistics, qualifying daily win rates, trade timing and previous
+        score) are pulled with a handful of GROUP BY queries. Trade timing and
+        the component and overall scores are then computed over whole columns
+        (with NumPy when installed) by the same functions calculate_confidence
+        uses, so the resulting scores are identical to the per-wallet path.
+        Consistency is still folded per wallet, over its qualifying days.
+
+        Args:
+            days: Number of days to analyze
+            wallet_addresses: Only score these wallets (a shard); defaults to
+                              every wallet with activity in the window
+
+        Returns:
+            List of ConfidenceScore objects (not saved)
+        """
+        wallet_filter, params = wallet_filter_sql(wallet_addresses)
+
+        now = time.time()
+        params['since'] = window_start(days, now)
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            if wallet_addresses is None:
+                # All wallets with recent activity (any status)
+                wallet_addresses = self.get_active_wallets(days, now, conn)
+
+            # Basic statistics per wallet
+            cursor.execute(BATCH_STATISTICS_SQL.format(wallet_filter=wallet_filter), params)
+
+            stats_by_wallet = {}
+            for row in cursor.fetchall():
+                stats_by_wallet[row['agent_id']] = {
+                    'win_rate': (row['winning_trades'] / row['total_trades']) * 100,
+                    'trade_count': row['total_trades'],
+                    'avg_notional': row['avg_notional'] or 0,
+                    'total_pnl': row['total_pnl'] or 0,
+                    'avg_pnl': row['avg_pnl'] or 0
+                }
+
+            # Daily win rates per wallet (consistency)
+            cursor.execute(BATCH_DAILY_WIN_RATES_SQL.format(wallet_filter=wallet_filter), params)
+
+            daily_rates_by_wallet: Dict[str, List[float]] = {}
+            for row in cursor.fetchall():
+                daily_rates_by_wallet.setdefault(row['agent_id'], []).append(row['daily_win_rate'])
+
+            # Per-trade timing scores (market timing)
+            cursor.execute(BATCH_TIMING_TRADES_SQL.format(wallet_filter=wallet_filter), params)
+
+            rows = cursor.fetchall()
+            trade_scores = self.score_trades_timing(rows)
+
+            timing_by_wallet: Dict[str, List[float]] = {}
+            for row, trade_score in zip(rows, trade_scores):
+                timing_by_wallet.setdefault(row['agent_id'], []).append(trade_score)
+
+        # Most recent saved score per wallet (trend), caught up in one query
+        self.previous_scores.refresh()
+        previous_scores = self.previous_scores.get_all()
+
+        empty_stats = {
+            'win_rate': 0,
+            'trade_count': 0,
+            'avg_notional': 0,
+            'total_pnl': 0,
+            'avg_pnl': 0
+        }
+        return self.build_confidence_scores(
+            wallet_addresses,
+            [stats_by_wallet.get(wallet_address, empty_stats) for wallet_address in wallet_addresses],
+            [self.score_daily_win_rates(daily_rates_by_wallet.get(wallet_address, []))
+             for wallet_address in wallet_addresses],
+            [mean_timing_score(timing_by_wallet.get(wallet_address, []))
+             for wallet_address in wallet_addresses],
+            [previous_scores.get(wallet_address) for wallet_address in wallet_addresses],
+            datetime.utcnow()
+        )
+
+    def calculate_window_confidences(self, windows: Sequence[int] = DEFAULT_WINDOWS,
+                                     wallet_addresses: Optional[List[str]] = None
+                                     ) -> Dict[int, List[ConfidenceScore]]:
+        """
+        Calculate confidence scores over several window lengths in one scan.
+
+        Each query reads the longest window once and splits it with one
+        conditional aggregate per window (CASE WHEN entry_timestamp >= bound),
+        so 7-, 30- and 90-day scores cost about the same as a single 90-day
+        pass. Each window's scores match calculate_all_confidences for that
+        window. Every wallet active in the longest window gets a score for
+        every window.
+
+        Args:
+            windows: Window lengths in days
+            wallet_addresses: Only score these wallets; defaults to every
+                              wallet with activity in the longest window
+
+        Returns:
+            Dict of window length -> list of ConfidenceScore objects (not saved)
+        """
+        windows = sorted(set(windows))
+        now = time.time()
+        wallet_filter, params = wallet_filter_sql(wallet_addresses)
+        params.update({f'since_{days}': window_start(days, now) for days in windows})
+        params['since'] = params[f'since_{windows[-1]}']
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            if wallet_addresses is None:
+                wallet_addresses = self.get_active_wallets(windows[-1], now, conn)
+
+            # Basic statistics per wallet and window
+            cursor.execute(window_statistics_sql(windows, wallet_filter), params)
+
+            stats_by_window: Dict[int, Dict[str, Dict]] = {days: {} for days in windows}
+            for row in cursor.fetchall():
+                for days in windows:
+                    total_trades = row[f'total_trades_{days}']
+                    if total_trades:
+                        stats_by_window[days][row['agent_id']] = {
+                            'win_rate': (row[f'winning_trades_{days}'] / total_trades) * 100,
+                            'trade_count': total_trades,
+                            'avg_notional': row[f'avg_notional_{days}'] or 0,
+                            'total_pnl': row[f'total_pnl_{days}'] or 0,
+                            'avg_pnl': row[f'avg_pnl_{days}'] or 0
+                        }
+
+            # Daily trade and win counts per wallet and window (consistency).
+            # The oldest day of a window is partial, so counts are per window.
+            cursor.execute(window_daily_counts_sql(windows, wallet_filter), params)
+
+            daily_rates_by_window: Dict[int, Dict[str, List[float]]] = {days: {} for days in windows}
+            for row in cursor.fetchall():
+                for days in windows:
+                    trades = row[f'trades_{days}']
+                    if trades >= 3:  # Only include days with sufficient trades
+                        daily_rates_by_window[days].setdefault(row['agent_id'], []).append(
+                            row[f'wins_{days}'] * 100.0 / trades
+                        )
+
+            # Per-trade timing scores, assigned to every window containing the trade
+            cursor.execute(BATCH_TIMING_TRADES_SQL.format(wallet_filter=wallet_filter), params)
+
+            rows = cursor.fetchall()
+            trade_scores = self.score_trades_timing(rows)
+
+            timing_by_window: Dict[int, Dict[str, List[float]]] = {days: {} for days in windows}
+            bounds = [(days, params[f'since_{days}']) for days in windows]
+            for row, trade_score in zip(rows, trade_scores):
+                entry_timestamp = row['entry_timestamp']
+                for i, (days, since) in enumerate(bounds):
+                    if entry_timestamp >= since:
+                        # Windows are sorted shortest first, so every longer one contains it too
+                        for longer_days, _ in bounds[i:]:
+                            timing_by_window[longer_days].setdefault(row['agent_id'], []).append(trade_score)
+                        break
+
+            previous_by_window = self._get_previous_window_scores(cursor, windows)
+
+        empty_stats = {
+            'win_rate': 0,
+            'trade_count': 0,
+            'avg_notional': 0,
+            'total_pnl': 0,
+            'avg_pnl': 0
+        }
+        calculated_at = datetime.utcnow()
+
+        return {
+            days: self.build_confidence_scores(
+                wallet_addresses,
+                [stats_by_window[days].get(wallet_address, empty_stats)
+                 for wallet_address in wallet_addresses],
+                [self.score_daily_win_rates(daily_rates_by_window[days].get(wallet_address, []))
+                 for wallet_address in wallet_addresses],
+                [mean_timing_score(timing_by_window[days].get(wallet_address, []))
+                 for wallet_address in wallet_addresses],
+                [previous_by_window[days].get(wallet_address) for wallet_address in wallet_addresses],
+                calculated_at
+            )
+            for days in windows
+        }
+
+    def _get_previous_window_scores(self, cursor: sqlite3.Cursor,
+                                    windows: Sequence[int]) -> Dict[int, Dict[str, float]]:
+        """Latest saved multi-window score per window and wallet."""
+        previous: Dict[int, Dict[str, float]] = {days: {} for days in windows}
+
+        cursor.execute(
+            WINDOW_PREVIOUS_SCORES_SQL.format(placeholders=', '.join('?' * len(windows))),
+            tuple(windows)
+        )
+
+        for row in cursor.fetchall():
+            previous[row['window_days']][row['wallet_address']] = row['overall_score']
+
+        return previous
+
     def calculate_trend(self, wallet_address: str, current_score: float) -> str:
         """
         Calculate trend by comparing current score with previous score.
 
+        The previous score comes from the in-memory previous-score cache.
+
         Args:
             wallet_address: Wallet address
             current_score: Current confidence score
@@ -453,35 +1821,32 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             Trend: 'up', 'down', or 'neutral'
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        return self.classify_trend(current_score, self.previous_scores.get(wallet_address))
 
-        try:
-            cursor.execute("""
-                SELECT overall_score
-                FROM smart_money_confidence
-                WHERE wallet_address = ?
-                ORDER BY calculated_at DESC
-                LIMIT 1
-            """, (wallet_address,))
 
-            row = cursor.fetchone()
+    @staticmethod
+    def classify_trend(current_score: float, previous_score: Optional[float]) -> str:
+        """
+        Classify the change between a previous and current score.
 
-            if not row:
-                return 'neutral'
+        Args:
+            current_score: Current confidence score
+            previous_score: Previous confidence score (None if no history)
 
-            previous_score = row['overall_score']
-            delta = current_score - previous_score
+        Returns:
+            Trend: 'up', 'down', or 'neutral'
+        """
+        if previous_score is None:
+            return 'neutral'
 
-            if delta > 5:  # Significant improvement
-                return 'up'
-            elif delta < -5:  # Significant decline
-                return 'down'
-            else:
-                return 'neutral'
+        delta = current_score - previous_score
 
-        finally:
-            conn.close()
+        if delta > 5:  # Significant improvement
+            return 'up'
+        elif delta < -5:  # Significant decline
+            return 'down'
+        else:
+            return 'neutral'
 
     def save_confidence_score(self, score: ConfidenceScore) -> bool:
         """
@@ -493,89 +1858,185 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             True if successful, False otherwise
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        return self.save_confidence_scores([score])
 
-        try:
-            # Create table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS smart_money_confidence (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    wallet_address TEXT NOT NULL,
-                    overall_score REAL NOT NULL,
-                    win_rate_score REAL NOT NULL,
-                    trade_count_score REAL NOT NULL,
-                    avg_notional_score REAL NOT NULL,
-                    consistency_score REAL NOT NULL,
-                    market_timing_score REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    trend TEXT DEFAULT 'neutral',
-                    calculated_at INTEGER NOT NULL,
-                    created_at INTEGER DEFAULT (strftime('%s', 'now'))
-                )
-            """)
+    def save_confidence_scores(self, scores: List[ConfidenceScore]) -> bool:
+        """
+        Save a batch of confidence scores in a single transaction.
+
+        Args:
+            scores: ConfidenceScore objects
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with self.connection() as conn:
+            try:
+                # Schema is set up once when the connection pool is created
+                conn.executemany("""
+                    INSERT INTO smart_money_confidence (
+                        wallet_address, overall_score, win_rate_score,
+                        trade_count_score, avg_notional_score,
+                        consistency_score, market_timing_score,
+                        category, trend, calculated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        score.wallet_address,
+                        score.overall_score,
+                        score.win_rate_score,
+                        score.trade_count_score,
+                        score.avg_notional_score,
+                        score.consistency_score,
+                        score.market_timing_score,
+                        score.category.value,
+                        score.trend,
+                        int(score.calculated_at.timestamp())
+                    )
+                    for score in scores
+                ])
+
+                # Ids are contiguous: the write lock is held until commit
+                last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                conn.commit()
+
+                self.previous_scores.update(scores, last_id - len(scores) + 1, last_id)
+                _notify_save_listeners(scores)
+                return True
+
+            except Exception as e:
+                print(f"Error saving confidence score: {e}")
+                conn.rollback()
+                return False
+
+    def save_window_confidences(self, scores_by_window: Dict[int, List[ConfidenceScore]]) -> bool:
+        """
+        Save multi-window scores side by side, replacing each wallet's
+        previous score for the same window.
+
+        Args:
+            scores_by_window: Dict of window length -> ConfidenceScore objects,
+                              as returned by calculate_window_confidences
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with self.connection() as conn:
+            try:
+                conn.executemany("""
+                    INSERT INTO smart_money_confidence_windows (
+                        wallet_address, window_days, overall_score,
+                        win_rate_score, trade_count_score, avg_notional_score,
+                        consistency_score, market_timing_score,
+                        category, trend, calculated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(wallet_address, window_days) DO UPDATE SET
+                        overall_score = excluded.overall_score,
+                        win_rate_score = excluded.win_rate_score,
+                        trade_count_score = excluded.trade_count_score,
+                        avg_notional_score = excluded.avg_notional_score,
+                        consistency_score = excluded.consistency_score,
+                        market_timing_score = excluded.market_timing_score,
+                        category = excluded.category,
+                        trend = excluded.trend,
+                        calculated_at = excluded.calculated_at
+                """, [
+                    (
+                        score.wallet_address,
+                        days,
+                        score.overall_score,
+                        score.win_rate_score,
+                        score.trade_count_score,
+                        score.avg_notional_score,
+                        score.consistency_score,
+                        score.market_timing_score,
+                        score.category.value,
+                        score.trend,
+                        int(score.calculated_at.timestamp())
+                    )
+                    for days, scores in scores_by_window.items()
+                    for score in scores
+                ])
+
+                conn.commit()
+                for days, scores in scores_by_window.items():
+                    _notify_save_listeners(scores, days)
+                return True
+
+            except Exception as e:
+                print(f"Error saving window confidence scores: {e}")
+                conn.rollback()
+                return False
+
+    def get_window_confidences(self, wallet_address: str) -> Dict[int, ConfidenceScore]:
+        """
+        Get a wallet's latest saved multi-window scores.
+
+        Args:
+            wallet_address: Wallet address
+
+        Returns:
+            Dict of window length -> ConfidenceScore, shortest window first
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-            # Insert score
             cursor.execute("""
-                INSERT INTO smart_money_confidence (
-                    wallet_address, overall_score, win_rate_score,
+                SELECT
+                    wallet_address, window_days, overall_score, win_rate_score,
                     trade_count_score, avg_notional_score,
                     consistency_score, market_timing_score,
                     category, trend, calculated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                score.wallet_address,
-                score.overall_score,
-                score.win_rate_score,
-                score.trade_count_score,
-                score.avg_notional_score,
-                score.consistency_score,
-                score.market_timing_score,
-                score.category.value,
-                score.trend,
-                int(score.calculated_at.timestamp())
-            ))
-
-            conn.commit()
-            return True
-
-        except Exception as e:
-            print(f"Error saving confidence score: {e}")
-            conn.rollback()
-            return False
+                FROM smart_money_confidence_windows
+                WHERE wallet_address = ?
+                ORDER BY window_days
+            """, (wallet_address,))
 
-        finally:
-            conn.close()
+            return {
+                row['window_days']: ConfidenceScore(
+                    wallet_address=row['wallet_address'],
+                    overall_score=row['overall_score'],
+                    win_rate_score=row['win_rate_score'],
+                    trade_count_score=row['trade_count_score'],
+                    avg_notional_score=row['avg_notional_score'],
+                    consistency_score=row['consistency_score'],
+                    market_timing_score=row['market_timing_score'],
+                    category=ScoreCategory(row['category']),
+                    calculated_at=datetime.fromtimestamp(row['calculated_at']),
+                    trend=row['trend']
+                )
+                for row in cursor.fetchall()
+            }
 
-    def get_latest_confidence_scores(self, limit: int = 100) -> List[ConfidenceScore]:
+    def get_latest_confidence_scores(self, limit: Optional[int] = 100,
+                                     min_score: float = 0) -> List[ConfidenceScore]:
         """
         Get latest confidence scores for all wallets.
 
+        Reads the one-row-per-wallet smart_money_confidence_latest table, so
+        the cost does not grow with the length of the score history.
+
         Args:
-            limit: Maximum number of wallets to return
+            limit: Maximum number of wallets to return (None for all)
+            min_score: Only return wallets scoring at least this much
 
         Returns:
             List of ConfidenceScore objects
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        try:
             cursor.execute("""
                 SELECT
                     wallet_address, overall_score, win_rate_score,
                     trade_count_score, avg_notional_score,
                     consistency_score, market_timing_score,
                     category, trend, calculated_at
-                FROM smart_money_confidence
-                WHERE id IN (
-                    SELECT MAX(id)
-                    FROM smart_money_confidence
-                    GROUP BY wallet_address
-                )
-                ORDER BY overall_score DESC
+                FROM smart_money_confidence_latest
+                WHERE overall_score >= ?
+                ORDER BY overall_score DESC, wallet_address DESC
                 LIMIT ?
-            """, (limit,))
+            """, (min_score, -1 if limit is None else limit))
 
             rows = cursor.fetchall()
 
@@ -596,8 +2057,50 @@ class SmartMoneyConfidenceCalculator:
 
             return scores
 
-        finally:
-            conn.close()
+    def get_latest_score_page(self, limit: int = 100,
+                              category: Optional[ScoreCategory] = None,
+                              after: Optional[Tuple[float, str]] = None,
+                              columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Get one page of latest scores, ordered by score then wallet (descending).
+
+        Uses keyset pagination: pass the (overall_score, wallet_address) of the
+        last row of a page as `after` to get the next one. Each page is an index
+        seek, however deep into the listing it is. The category filter runs in
+        SQL, before the limit.
+
+        Args:
+            limit: Maximum number of rows
+            category: Only return wallets in this category
+            after: (overall_score, wallet_address) of the previous page's last row
+            columns: Columns to return (see LATEST_SCORE_COLUMNS); all by default.
+                     overall_score and wallet_address are always included.
+
+        Returns:
+            List of row dicts
+
+        Raises:
+            ValueError: If a column is not in LATEST_SCORE_COLUMNS
+        """
+        columns = list(columns or LATEST_SCORE_COLUMNS)
+        unknown = [column for column in columns if column not in LATEST_SCORE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        for key in ('wallet_address', 'overall_score'):
+            if key not in columns:
+                columns.append(key)
+
+        params: Dict = {'limit': limit}
+        if category is not None:
+            params['category'] = category.value
+        if after is not None:
+            params['after_score'], params['after_wallet'] = after
+
+        # Column names are checked against LATEST_SCORE_COLUMNS above
+        sql = latest_score_page_sql(columns, category is not None, after is not None)
+
+        with self.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
 
     def get_wallet_history(self, wallet_address: str,
                           days: int = 30) -> List[ConfidenceScore]:
@@ -611,21 +2114,10 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             List of ConfidenceScore objects
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        try:
-            cursor.execute("""
-                SELECT
-                    wallet_address, overall_score, win_rate_score,
-                    trade_count_score, avg_notional_score,
-                    consistency_score, market_timing_score,
-                    category, trend, calculated_at
-                FROM smart_money_confidence
-                WHERE wallet_address = ?
-                  AND calculated_at >= strftime('%s', 'now', '-{} days')
-                ORDER BY calculated_at ASC
-            """.format(days), (wallet_address,))
+            cursor.execute(WALLET_HISTORY_SQL, (wallet_address, window_start(days)))
 
             rows = cursor.fetchall()
 
@@ -646,8 +2138,6 @@ class SmartMoneyConfidenceCalculator:
 
             return scores
 
-        finally:
-            conn.close()
 
     def get_elite_wallets(self, threshold: float = 90.0,
                          check_decline: bool = True) -> List[ConfidenceScore]:
@@ -661,78 +2151,265 @@ class SmartMoneyConfidenceCalculator:
         Returns:
             List of elite ConfidenceScore objects
         """
-        scores = self.get_latest_confidence_scores(limit=1000)
+        scores = self.get_latest_confidence_scores(limit=None, min_score=threshold)
 
         elite = [
             score for score in scores
-            if score.overall_score >= threshold
-            and (not check_decline or score.trend != 'down')
+            if not check_decline or score.trend != 'down'
         ]
 
         return elite
 
+    def get_confidence_alerts(self, threshold: float = 90.0,
+                              drop_threshold: float = 10.0,
+                              days: int = 7) -> List[Dict]:
+        """
+        Get alerts for declining elite wallets whose score dropped significantly.
+
+        Compares each elite wallet's latest score with the one before it
+        (LAG over the wallet's history) in a single query, instead of
+        loading the history of every declining wallet.
+
+        Args:
+            threshold: Minimum latest score to be considered elite
+            drop_threshold: Minimum drop to trigger an alert
+            days: Only compare scores calculated in the last N days
+
+        Returns:
+            Alert dicts (see build_confidence_alert), largest drop first
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(CONFIDENCE_ALERTS_SQL, {
+                'threshold': threshold,
+                'drop_threshold': drop_threshold,
+                'since': window_start(days)
+            })
+
+            return [
+                build_confidence_alert(
+                    row['wallet_address'], row['previous_score'], row['current_score']
+                )
+                for row in cursor.fetchall()
+            ]
+
+
+# Incremental scorers fed by recalculate_wallet_confidence, per (database, days)
+_incremental_scorers: Dict[Tuple[str, int], 'IncrementalConfidenceScorer'] = {}
+_incremental_lock = threading.Lock()
+
 
 def recalculate_wallet_confidence(wallet_address: str,
                                    db_path: str = 'quant/data/trading.db',
-                                   days: int = 30) -> Optional[ConfidenceScore]:
+                                   days: int = 30,
+                                   trade: Optional[Dict] = None) -> Optional[ConfidenceScore]:
     """
     Recalculate confidence for a specific wallet and save to database.
 
-    This function is intended to be called after each trade fill.
+    This function is intended to be called after each trade fill. Pass the
+    closed trade (already saved to agent_trades) and it is folded into a
+    process-wide IncrementalConfidenceScorer (signals.incremental_confidence),
+    which rescores the wallet in constant time; the scorer loads every
+    wallet's aggregates in one scan on the first fill. Without a trade the
+    wallet's whole analysis window is rescanned.
+
+    The incremental window starts at a UTC midnight (see
+    IncrementalConfidenceScorer), and its aggregates only see trades
+    reported here after it was loaded.
 
     Args:
         wallet_address: Wallet address
         db_path: Path to database
         days: Number of days to analyze
+        trade: Closed trade that triggered the recalculation (agent_trades
+               columns: agent_id, side, quantity, entry_price, exit_price,
+               pnl, entry_timestamp, optionally symbol and exit_timestamp)
 
     Returns:
         ConfidenceScore if successful, None otherwise
     """
+    if trade is not None:
+        try:
+            from signals.incremental_confidence import IncrementalConfidenceScorer
+        except ImportError:
+            from incremental_confidence import IncrementalConfidenceScorer
+
+        with _incremental_lock:
+            scorer = _incremental_scorers.get((db_path, days))
+            if scorer is None:
+                # The warm-up scan already includes this trade
+                scorer = IncrementalConfidenceScorer(db_path, days)
+                scorer.warm()
+                _incremental_scorers[(db_path, days)] = scorer
+                score = scorer.score(wallet_address)
+                scorer.calculator.save_confidence_score(score)
+                return score
+
+            return scorer.on_trade_closed(dict(trade, agent_id=wallet_address))
+
     calculator = SmartMoneyConfidenceCalculator(db_path)
     score = calculator.calculate_confidence(wallet_address, days)
     calculator.save_confidence_score(score)
     return score
 
 
+def _score_wallet_shard(shard: Tuple[str, int, List[str], Optional[Tuple[str, str]]]) -> List[ConfidenceScore]:
+    """Score one shard of wallets on a read-only connection (worker process)."""
+    db_path, days, wallet_addresses, candles = shard
+    candle_store = CandleStore(*candles) if candles else None
+    calculator = SmartMoneyConfidenceCalculator(db_path, readonly=True, candle_store=candle_store)
+    return calculator.calculate_all_confidences(days, wallet_addresses=wallet_addresses)
+
+
 def get_all_wallet_confidences(db_path: str = 'quant/data/trading.db',
-                               days: int = 30) -> List[ConfidenceScore]:
+                               days: int = 30,
+                               batch: bool = True,
+                               workers: int = 1,
+                               shard_size: int = 500,
+                               candle_store: Optional[CandleStore] = None) -> List[ConfidenceScore]:
     """
     Calculate and save confidence scores for all active wallets.
 
     Args:
         db_path: Path to database
         days: Number of days to analyze
+        batch: If True, score all wallets with set-based queries and save
+               them in one transaction; if False, score wallet by wallet
+        workers: Number of worker processes. With more than one, wallets are
+                 sharded across a process pool that scores on read-only
+                 connections while this process is the single writer
+        shard_size: Wallets per shard when workers > 1
+        candle_store: Local OHLCV candles for market timing
 
     Returns:
         List of ConfidenceScore objects
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    # Opening the writable pool first ensures the schema and WAL mode exist
+    # before any read-only worker connects.
+    calculator = SmartMoneyConfidenceCalculator(db_path, candle_store=candle_store)
+
+    if workers > 1:
+        scores = _score_all_wallets_parallel(calculator, days, workers, shard_size)
+        calculator.previous_scores.persist()
+        return scores
+
+    if batch:
+        scores = calculator.calculate_all_confidences(days)
+        calculator.save_confidence_scores(scores)
+        calculator.previous_scores.persist()
+        return scores
+
+    # Get all unique wallets with recent activity
+    wallet_addresses = calculator.get_active_wallets(days)
+
+    scores = []
+
+    for wallet_address in wallet_addresses:
+        score = calculator.calculate_confidence(wallet_address, days)
+        calculator.save_confidence_score(score)
+        scores.append(score)
+
+    return scores
+
+
+def get_all_wallet_window_confidences(db_path: str = 'quant/data/trading.db',
+                                      windows: Sequence[int] = DEFAULT_WINDOWS,
+                                      candle_store: Optional[CandleStore] = None,
+                                      workers: int = 1,
+                                      shard_size: int = 500
+                                      ) -> Dict[int, List[ConfidenceScore]]:
+    """
+    Calculate and save multi-window confidence scores for all active wallets.
+
+    Args:
+        db_path: Path to database
+        windows: Window lengths in days
+        candle_store: Local OHLCV candles for market timing
+        workers: Number of worker processes. With more than one, wallets are
+                 sharded across a process pool as in get_all_wallet_confidences
+        shard_size: Wallets per shard when workers > 1
 
-    try:
-        # Get all unique wallets with recent activity
-        cursor.execute("""
-            SELECT DISTINCT agent_id
-            FROM agent_trades
-            WHERE entry_timestamp >= strftime('%s', 'now', '-{} days')
-        """.format(days))
+    Returns:
+        Dict of window length -> list of ConfidenceScore objects
+    """
+    calculator = SmartMoneyConfidenceCalculator(db_path, candle_store=candle_store)
 
-        rows = cursor.fetchall()
-        wallet_addresses = [row['agent_id'] for row in rows]
+    if workers > 1:
+        return _score_all_wallet_windows_parallel(calculator, windows, workers, shard_size)
 
-        calculator = SmartMoneyConfidenceCalculator(db_path)
-        scores = []
+    scores_by_window = calculator.calculate_window_confidences(windows)
+    calculator.save_window_confidences(scores_by_window)
+    return scores_by_window
 
-        for wallet_address in wallet_addresses:
-            score = calculator.calculate_confidence(wallet_address, days)
-            calculator.save_confidence_score(score)
-            scores.append(score)
 
-        return scores
+def _score_all_wallets_parallel(calculator: SmartMoneyConfidenceCalculator,
+                                days: int, workers: int,
+                                shard_size: int) -> List[ConfidenceScore]:
+    """
+    Shard active wallets across a process pool and save results as they arrive.
+
+    Workers only read (WAL readers never block the writer); this process is
+    the only writer, so saves cannot hit "database is locked".
+    """
+    from multiprocessing import Pool
+
+    wallet_addresses = calculator.get_active_wallets(days)
+
+    # Workers open their own mappings of the candle files
+    candles = None
+    if calculator.candle_store is not None:
+        candles = (calculator.candle_store.root, calculator.candle_store.interval)
+
+    shards = [
+        (calculator.db_path, days, wallet_addresses[i:i + shard_size], candles)
+        for i in range(0, len(wallet_addresses), shard_size)
+    ]
+
+    scores = []
+    with Pool(processes=workers) as pool:
+        for shard_scores in pool.imap_unordered(_score_wallet_shard, shards):
+            calculator.save_confidence_scores(shard_scores)
+            scores.extend(shard_scores)
+
+    return scores
+
+
+def _score_window_shard(shard: Tuple[str, List[int], List[str], Optional[Tuple[str, str]]]
+                        ) -> Dict[int, List[ConfidenceScore]]:
+    """Score one shard of wallets over every window (worker process)."""
+    db_path, windows, wallet_addresses, candles = shard
+    candle_store = CandleStore(*candles) if candles else None
+    calculator = SmartMoneyConfidenceCalculator(db_path, readonly=True, candle_store=candle_store)
+    return calculator.calculate_window_confidences(windows, wallet_addresses=wallet_addresses)
+
+
+def _score_all_wallet_windows_parallel(calculator: SmartMoneyConfidenceCalculator,
+                                       windows: Sequence[int], workers: int,
+                                       shard_size: int) -> Dict[int, List[ConfidenceScore]]:
+    """Multi-window version of _score_all_wallets_parallel."""
+    from multiprocessing import Pool
+
+    windows = sorted(set(windows))
+    wallet_addresses = calculator.get_active_wallets(windows[-1])
+
+    candles = None
+    if calculator.candle_store is not None:
+        candles = (calculator.candle_store.root, calculator.candle_store.interval)
+
+    shards = [
+        (calculator.db_path, windows, wallet_addresses[i:i + shard_size], candles)
+        for i in range(0, len(wallet_addresses), shard_size)
+    ]
+
+    scores_by_window: Dict[int, List[ConfidenceScore]] = {days: [] for days in windows}
+    with Pool(processes=workers) as pool:
+        for shard_scores in pool.imap_unordered(_score_window_shard, shards):
+            calculator.save_window_confidences(shard_scores)
+            for days, scores in shard_scores.items():
+                scores_by_window[days].extend(scores)
 
-    finally:
-        conn.close()
+    return scores_by_window
 
 
 if __name__ == '__main__':
@@ -0,0 +1,343 @@
+"""
+Columnar Snapshot Export
+
+Exports smart_money_confidence (score history) and closed agent_trades to
+date-partitioned Parquet or Arrow IPC files, so notebooks can load or
+memory-map them instead of paging through the JSON API or copying SQLite.
+
+Layout (Hive-style partitions, readable with pyarrow.dataset):
+
+    <output_dir>/<table>/date=YYYY-MM-DD/part-<first key>-<last key>.parquet
+    <output_dir>/_watermarks.json
+
+Exports are incremental. Each table is read in key order from just past its
+watermark (the key of the last exported row), new rows are written as new
+part files and the watermark is advanced only after the files are in place.
+The key must grow in write order, or rows written behind the watermark are
+never exported. Score history is append-only and keyed on id. Trades are
+updated in place when they close, possibly long after they were opened and
+with a backdated exit time, so triggers log every close to
+agent_trade_closes and trades are keyed on that log's sequence number (and
+partitioned by exit date).
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only exports need it
+    pa = None
+
+try:
+    from signals.smart_money_confidence import get_connection_pool
+except ImportError:
+    from smart_money_confidence import get_connection_pool
+
+
+FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+WATERMARK_FILE = '_watermarks.json'
+
+# Write-ordered log of trade closes. A trade is logged when it is inserted
+# closed or updated to closed, whatever its exit timestamp, so the log's
+# sequence number is a monotonic export key for closed trades.
+EXPORT_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS agent_trade_closes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        trade_id INTEGER NOT NULL
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_agent_trade_closes_insert
+    AFTER INSERT ON agent_trades
+    WHEN NEW.status = 'closed' AND NEW.exit_timestamp IS NOT NULL
+    BEGIN
+        INSERT INTO agent_trade_closes (trade_id) VALUES (NEW.id);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_agent_trade_closes_update
+    AFTER UPDATE OF status, exit_timestamp ON agent_trades
+    WHEN NEW.status = 'closed' AND NEW.exit_timestamp IS NOT NULL
+     AND (OLD.status IS NOT 'closed' OR OLD.exit_timestamp IS NULL)
+    BEGIN
+        INSERT INTO agent_trade_closes (trade_id) VALUES (NEW.id);
+    END;
+"""
+
+# Logs trades closed before the triggers existed, in their old export order.
+BACKFILL_CLOSES_SQL = """
+    INSERT INTO agent_trade_closes (trade_id)
+    SELECT id
+    FROM agent_trades
+    WHERE status = 'closed' AND exit_timestamp IS NOT NULL
+    ORDER BY exit_timestamp, id
+"""
+
+
+def ensure_export_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the trade close log and its triggers, and backfill the log.
+
+    Args:
+        conn: Writable database connection (agent_trades must exist)
+    """
+    conn.executescript(EXPORT_SCHEMA)
+
+    has_closes = conn.execute("SELECT 1 FROM agent_trade_closes LIMIT 1").fetchone()
+    if not has_closes:
+        conn.execute(BACKFILL_CLOSES_SQL)
+
+    conn.commit()
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """How one SQLite table is exported."""
+    name: str
+    key: str                   # Column growing in write order; the watermark is the last key
+    partition_column: str      # Unix timestamp column partitioned by UTC date
+    source: str = ''           # FROM clause (default: the table), e.g. joined to a log holding the key
+    where: str = ''            # Extra filter for exportable rows
+    legacy_watermark: str = '' # Maps a watermark in the table's earlier (multi-column) key to the key
+
+
+EXPORT_TABLES = {
+    'smart_money_confidence': ExportTable(
+        name='smart_money_confidence',
+        key='smart_money_confidence.id',
+        partition_column='calculated_at'
+    ),
+    'agent_trades': ExportTable(
+        name='agent_trades',
+        key='agent_trade_closes.seq',
+        partition_column='exit_timestamp',
+        source='agent_trade_closes JOIN agent_trades ON agent_trades.id = agent_trade_closes.trade_id',
+        where="agent_trades.status = 'closed' AND agent_trades.exit_timestamp IS NOT NULL",
+        # Exports keyed on (exit_timestamp, id) covered every backfilled close
+        # up to the first one past that key
+        legacy_watermark="""
+            SELECT COALESCE(
+                MIN(CASE WHEN (t.exit_timestamp, t.id) > (?, ?) THEN c.seq END) - 1,
+                MAX(c.seq)
+            )
+            FROM agent_trade_closes c
+            JOIN agent_trades t ON t.id = c.trade_id
+        """
+    ),
+}
+
+
+def export_sql(table: ExportTable, names: Sequence[str], after_watermark: bool) -> str:
+    """
+    Build the query reading a table's exportable rows in key order.
+
+    Args:
+        table: Table to export
+        names: Columns of the table to read
+        after_watermark: Only read rows past a watermark key (one ? parameter)
+
+    Returns:
+        SQL selecting the columns, export_key and partition_date
+    """
+    conditions = [table.where] if table.where else []
+    if after_watermark:
+        conditions.append(f"{table.key} > ?")
+
+    return """
+        SELECT {columns}, {key} AS export_key,
+               DATE({table}.{partition}, 'unixepoch') AS partition_date
+        FROM {source}
+        {where}
+        ORDER BY {key}
+    """.format(
+        columns=', '.join(f'{table.name}.{name}' for name in names),
+        key=table.key,
+        table=table.name,
+        partition=table.partition_column,
+        source=table.source or table.name,
+        where=('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    )
+
+
+def _arrow_type(declared_type: str):
+    """Arrow type for a SQLite declared column type."""
+    declared_type = declared_type.upper()
+    if 'INT' in declared_type:
+        return pa.int64()
+    if any(name in declared_type for name in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+class SnapshotExporter:
+    """Incremental, partitioned columnar export of the scoring tables."""
+
+    def __init__(self, db_path: str = 'quant/data/trading.db',
+                 output_dir: str = 'quant/data/export',
+                 fmt: str = 'parquet', chunk_rows: int = 500_000):
+        """
+        Initialize the exporter.
+
+        Args:
+            db_path: Path to SQLite database
+            output_dir: Root directory of the exported dataset
+            fmt: 'parquet' or 'arrow' (Arrow IPC file, memory-mappable)
+            chunk_rows: Rows read and written per part file batch
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+            ValueError: If the format is unknown
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow is required for exports (pip install pyarrow)")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+
+    def load_watermarks(self) -> Dict[str, List]:
+        """Get the last exported key of each table."""
+        path = os.path.join(self.output_dir, WATERMARK_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_watermarks(self, watermarks: Dict[str, List]) -> None:
+        path = os.path.join(self.output_dir, WATERMARK_FILE)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def export(self, tables: Optional[Sequence[str]] = None,
+               full: bool = False) -> Dict[str, Dict]:
+        """
+        Export rows added since the last export.
+
+        Args:
+            tables: Tables to export (default: all of EXPORT_TABLES)
+            full: Discard earlier exports of these tables and start over
+
+        Returns:
+            Dict of table -> {'rows', 'files', 'watermark'}
+
+        Raises:
+            ValueError: If a table is not exportable
+        """
+        tables = list(tables or EXPORT_TABLES)
+        unknown = [table for table in tables if table not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"Unknown export tables: {', '.join(unknown)}")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        watermarks = self.load_watermarks()
+        results = {}
+
+        if 'agent_trades' in tables:
+            with get_connection_pool(self.db_path).connection() as conn:
+                ensure_export_schema(conn)
+
+        pool = get_connection_pool(self.db_path, readonly=True)
+        with pool.connection() as conn:
+            # One read transaction, so every table comes from the same snapshot
+            conn.execute("BEGIN")
+            try:
+                for name in tables:
+                    table = EXPORT_TABLES[name]
+                    if full:
+                        shutil.rmtree(os.path.join(self.output_dir, name), ignore_errors=True)
+                        watermarks.pop(name, None)
+
+                    rows, files, watermark = self._export_table(conn, table, watermarks.get(name))
+                    if watermark is not None:
+                        watermarks[name] = watermark
+                    self._save_watermarks(watermarks)
+
+                    results[name] = {
+                        'rows': rows,
+                        'files': files,
+                        'watermark': watermarks.get(name)
+                    }
+            finally:
+                conn.rollback()
+
+        return results
+
+    def _export_table(self, conn: sqlite3.Connection, table: ExportTable,
+                      watermark: Optional[List]) -> Tuple[int, List[str], Optional[List]]:
+        """Write one table's new rows; returns (rows, files, new watermark)."""
+        columns = conn.execute(f"PRAGMA table_info({table.name})").fetchall()
+        schema = pa.schema([(column['name'], _arrow_type(column['type'] or '')) for column in columns])
+        names = [column['name'] for column in columns]
+
+        if watermark is not None and len(watermark) > 1:
+            # Written under the table's earlier key
+            watermark = list(conn.execute(table.legacy_watermark, watermark).fetchone())
+            if watermark[0] is None:
+                watermark = None
+
+        params = tuple(watermark) if watermark is not None else ()
+        cursor = conn.execute(export_sql(table, names, watermark is not None), params)
+
+        total = 0
+        files = []
+
+        while True:
+            rows = cursor.fetchmany(self.chunk_rows)
+            if not rows:
+                break
+
+            by_date: Dict[str, List] = {}
+            for row in rows:
+                by_date.setdefault(row['partition_date'] or 'unknown', []).append(row)
+
+            for date, partition_rows in by_date.items():
+                files.append(self._write_part(table.name, date, schema, names, partition_rows))
+
+            total += len(rows)
+            watermark = [rows[-1]['export_key']]
+
+        return total, files, watermark
+
+    def _write_part(self, table: str, date: str, schema, names: List[str],
+                    rows: List) -> str:
+        """Write rows of one partition to a new part file."""
+        directory = os.path.join(self.output_dir, table, f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory,
+            f"part-{rows[0]['export_key']:012d}-{rows[-1]['export_key']:012d}{FORMATS[self.fmt]}"
+        )
+
+        columns = list(zip(*(tuple(row)[:len(names)] for row in rows)))
+        batch = pa.table(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        if self.fmt == 'parquet':
+            pq.write_table(batch, tmp_path, compression='zstd')
+        else:
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_table(batch)
+        os.replace(tmp_path, path)
+
+        return path
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Test script for smart money confidence signals - without external APIs
+"""
+
+import dataclasses
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+import smart_money_confidence
+from candle_store import CandleStore
+from incremental_confidence import IncrementalConfidenceScorer
+from init_db import init_database
+from smart_money_confidence import (
+    DAILY_WIN_RATES_SQL, SECONDS_PER_DAY, ConfidenceScore, ScoreCategory,
+    SmartMoneyConfidenceCalculator, build_confidence_alert, market_timing_scores,
+    mean_timing_score, recalculate_wallet_confidence
+)
+from recalculation_jobs import RecalculationQueue
+from snapshot_export import SnapshotExporter
+
+
+def add_trades(db_path: str, now: int, wallet_count: int = 8, days: int = 85,
+               seed: int = 7) -> List[str]:
+    """Add deterministic trades over the last `days` days; returns the wallets"""
+    rng = random.Random(seed)
+    rows = []
+    wallets = [f'0xwallet{i:03d}' for i in range(wallet_count)]
+
+    for n, wallet in enumerate(wallets):
+        for day in rng.sample(range(1, days), rng.randint(5, days // 2)):
+            for _ in range(rng.randint(1, 5)):
+                # At least an hour away from any whole-day window bound
+                entry_timestamp = now - day * 86400 + rng.randint(3600, 80000)
+                side = rng.choice(['buy', 'sell'])
+                quantity = rng.uniform(0.1, 10) * 10 ** (n % 4)
+                entry_price = rng.uniform(50, 150)
+                exit_price = entry_price * rng.uniform(0.8, 1.25)
+                direction = 1 if side == 'buy' else -1
+                rows.append((
+                    wallet, side, quantity, entry_price, exit_price,
+                    (exit_price - entry_price) * quantity * direction, 'closed',
+                    entry_timestamp, entry_timestamp + rng.randint(60, 3000)
+                ))
+
+    # A wallet whose only recent trade is still open
+    rows.append(('0xopen_only', 'buy', 1.0, 100.0, None, 0, 'open', now - 3600, None))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO agent_trades (
+            agent_id, model, symbol, side, order_type, quantity, entry_price,
+            exit_price, pnl, status, entry_timestamp, exit_timestamp
+        ) VALUES (?, 'test', 'ETH', ?, 'market', ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    return wallets + ['0xopen_only']
+
+
+def insert_trade(db_path: str, trade: dict) -> dict:
+    """Save one closed trade, as the execution system would on a fill"""
+    trade = dict(trade, model='test', symbol='ETH', order_type='market', status='closed')
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO agent_trades ({}) VALUES ({})".format(
+        ', '.join(trade), ', '.join(f':{column}' for column in trade)
+    ), trade)
+    conn.commit()
+    conn.close()
+    return trade
+
+
+def score_fields(score) -> dict:
+    """A score's fields, without its calculation time"""
+    fields = dataclasses.asdict(score)
+    del fields['calculated_at']
+    return fields
+
+
+def test_batch_matches_per_wallet():
+    """Test that set-based batch scores equal per-wallet scores"""
+    print("Testing batch scoring against per-wallet scoring...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        init_database(db_path)
+        add_trades(db_path, int(time.time()))
+        calculator = SmartMoneyConfidenceCalculator(db_path)
+
+        def compare():
+            batch = calculator.calculate_all_confidences(30)
+            assert sorted(score.wallet_address for score in batch) == sorted(calculator.get_active_wallets(30))
+            for score in batch:
+                single = calculator.calculate_confidence(score.wallet_address, 30)
+                assert score_fields(single) == score_fields(score), (single, score)
+            return batch
+
+        batch = compare()
+        print(f"  {len(batch)} wallets match, e.g. {batch[0].wallet_address}: {batch[0].overall_score}")
+        assert len({score.category for score in batch}) > 1
+
+        # Trends against saved scores match too
+        assert calculator.save_confidence_scores(batch)
+        compare()
+
+        # And without NumPy
+        np = smart_money_confidence.np
+        smart_money_confidence.np = None
+        try:
+            compare()
+        finally:
+            smart_money_confidence.np = np
+
+    print("✓ Batch scoring test passed")
+    return True
+
+
+def test_windows_match_separate_runs():
+    """Test that one multi-window pass equals a batch run per window"""
+    print("Testing multi-window scores against separate runs...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        init_database(db_path)
+        add_trades(db_path, int(time.time()))
+        calculator = SmartMoneyConfidenceCalculator(db_path)
+
+        scores_by_window = calculator.calculate_window_confidences((90, 7, 30))
+        assert sorted(scores_by_window) == [7, 30, 90]
+
+        wallets = sorted(calculator.get_active_wallets(90))
+        for days, scores in scores_by_window.items():
+            assert sorted(score.wallet_address for score in scores) == wallets
+
+            # Wallets without trades in a shorter window still get its score
+            by_wallet = {score.wallet_address: score for score in scores}
+            separate = calculator.calculate_all_confidences(days, wallet_addresses=wallets)
+            for score in separate:
+                assert score_fields(by_wallet[score.wallet_address]) == score_fields(score), \
+                    (days, by_wallet[score.wallet_address], score)
+            print(f"  {days}-day window: {len(scores)} wallets match, "
+                  f"{sum(1 for score in scores if score.overall_score > 0)} with trades")
+
+        assert len({tuple(score.overall_score for score in scores)
+                    for scores in scores_by_window.values()}) == 3
+
+    print("✓ Multi-window scoring test passed")
+    return True
+
+
+def alerts_from_history(calculator, threshold: float, drop_threshold: float,
+                        days: int = 7) -> List[dict]:
+    """Alerts found by comparing each declining elite wallet's last two history rows"""
+    alerts = []
+    for wallet in calculator.get_elite_wallets(threshold, check_decline=False):
+        if wallet.trend != 'down':
+            continue
+        history = calculator.get_wallet_history(wallet.wallet_address, days)
+        if len(history) >= 2:
+            previous_score = history[-2].overall_score
+            current_score = history[-1].overall_score
+            if previous_score - current_score >= drop_threshold:
+                alerts.append(build_confidence_alert(wallet.wallet_address, previous_score, current_score))
+    return alerts
+
+
+def test_alerts_match_history_comparison():
+    """Test that the LAG alert query finds the alerts a per-wallet history scan finds"""
+    print("Testing LAG confidence alerts against per-wallet history...")
+
+    rng = random.Random(11)
+    now = int(time.time())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calculator = SmartMoneyConfidenceCalculator(os.path.join(tmp, 'trading.db'))
+
+        scores = []
+        for n in range(40):
+            # Distinct times, none near the 7-day bound; some history is older
+            hours = sorted(rng.sample([h for h in range(1, 300) if abs(h - 168) > 3], rng.randint(1, 5)),
+                           reverse=True)
+            for hours_ago in hours:
+                overall_score = round(rng.uniform(60, 100), 2)
+                scores.append(ConfidenceScore(
+                    wallet_address=f'0xwallet{n:03d}',
+                    overall_score=overall_score,
+                    win_rate_score=overall_score,
+                    trade_count_score=overall_score / 2,
+                    avg_notional_score=overall_score / 2,
+                    consistency_score=overall_score,
+                    market_timing_score=overall_score,
+                    category=ScoreCategory.ELITE if overall_score >= 90 else ScoreCategory.STRONG,
+                    calculated_at=datetime.fromtimestamp(now - hours_ago * 3600),
+                    trend=rng.choice(['down', 'down', 'up', 'neutral'])
+                ))
+        assert calculator.save_confidence_scores(scores)
+
+        def key(alert):
+            return alert['wallet_address']
+
+        for threshold, drop_threshold in ((90.0, 10.0), (80.0, 5.0), (70.0, 0.0)):
+            alerts = calculator.get_confidence_alerts(threshold, drop_threshold)
+            expected = alerts_from_history(calculator, threshold, drop_threshold)
+            print(f"  threshold {threshold}, drop {drop_threshold}: {len(alerts)} alerts")
+            assert sorted(alerts, key=key) == sorted(expected, key=key), (alerts, expected)
+            assert [alert['drop'] for alert in alerts] == sorted((alert['drop'] for alert in alerts), reverse=True)
+        assert alerts
+
+    print("✓ Confidence alert test passed")
+    return True
+
+
+def test_duplicate_jobs_share_wallets():
+    """Test that a wallet queued by two jobs is scored once and advances both"""
+    print("Testing de-duplication of queued recalculations...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        init_database(db_path)
+        wallets = add_trades(db_path, int(time.time()))[:6]
+
+        # No workers yet, so both jobs are queued before anything is scored
+        jobs = RecalculationQueue(db_path, workers=0, batch_size=2)
+        scored = []
+        calculate_all_confidences = jobs.calculator.calculate_all_confidences
+
+        def record(days, wallet_addresses=None):
+            scored.extend(wallet_addresses)
+            return calculate_all_confidences(days, wallet_addresses=wallet_addresses)
+
+        jobs.calculator.calculate_all_confidences = record
+
+        first = jobs.submit(wallets[:4])
+        second = jobs.submit(wallets[2:] + wallets[2:3])
+        other_window = jobs.submit(wallets[:1], days=7)
+        print(f"  Queued {jobs.pending()} wallets for 3 jobs")
+        assert (first.total, second.total, other_window.total) == (4, 4, 1)
+        assert (first.deduplicated, second.deduplicated, other_window.deduplicated) == (0, 2, 0)
+        assert jobs.pending() == 7
+
+        jobs.workers = 1
+        jobs._start_workers()
+        for job in (first, second, other_window):
+            progress = job.to_dict()
+            deadline = time.time() + 30
+            while progress['status'] != 'completed' and time.time() < deadline:
+                progress = jobs.wait(job.job_id, progress['version'], 1.0)
+            assert progress['status'] == 'completed', progress
+            assert progress['completed'] == progress['total'] and progress['failed'] == 0, progress
+
+        assert sorted(scored) == sorted(wallets + wallets[:1]), scored
+        assert jobs.pending() == 0
+
+        conn = sqlite3.connect(db_path)
+        saved = conn.execute(
+            "SELECT wallet_address, COUNT(*) FROM smart_money_confidence GROUP BY wallet_address"
+        ).fetchall()
+        conn.close()
+        assert dict(saved) == {wallet: 2 if wallet == wallets[0] else 1 for wallet in wallets}, saved
+
+        # Once scored, a wallet is queued again
+        third = jobs.submit(wallets[:1])
+        assert third.deduplicated == 0
+
+    print("✓ Job de-duplication test passed")
+    return True
+
+
+def test_ring_consistency_matches_sql():
+    """Test that the daily ring's consistency score equals the SQL daily win rates"""
+    print("Testing ring buffer consistency against SQL daily win rates...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        init_database(db_path)
+        now = int(time.time())
+        wallets = add_trades(db_path, now)
+
+        scorer = IncrementalConfidenceScorer(db_path, days=30)
+        calculator = scorer.calculator
+
+        def compare(now):
+            # The ring's window starts at the UTC midnight of the window start
+            since = (now - 30 * SECONDS_PER_DAY) // SECONDS_PER_DAY * SECONDS_PER_DAY
+            scores = {}
+            with calculator.connection() as conn:
+                for wallet in wallets:
+                    rates = [row['daily_win_rate'] for row in conn.execute(DAILY_WIN_RATES_SQL, (wallet, since))]
+                    expected = calculator.score_daily_win_rates(rates)
+                    scores[wallet] = scorer.consistency_score(wallet, now=now)
+                    assert abs(scores[wallet] - expected) < 1e-9, (wallet, scores[wallet], expected)
+            return scores
+
+        scorer.warm(now)
+        scores = compare(now)
+        print(f"  Consistency after warm: {scores}")
+        assert any(score > 0 for score in scores.values())
+
+        # Fills for today, then late fills for a day that has settled
+        for days_ago, pnls in ((0, [5, 5, -5]), (0, [5]), (12, [-5, 5, 5, -5])):
+            for pnl in pnls:
+                entry_timestamp = now - days_ago * SECONDS_PER_DAY - 60
+                trade = insert_trade(db_path, {
+                    'agent_id': wallets[0], 'side': 'buy', 'quantity': 1.0,
+                    'entry_price': 100.0, 'exit_price': 100.0 + pnl, 'pnl': pnl,
+                    'entry_timestamp': entry_timestamp, 'exit_timestamp': entry_timestamp + 30
+                })
+                scorer.on_trade_closed(trade, save=False, now=now)
+            compare(now)
+
+        # Ten days later the oldest days have left the ring
+        compare(now + 10 * SECONDS_PER_DAY)
+
+    print("✓ Ring consistency test passed")
+    return True
+
+
+def test_fills_match_rescan():
+    """Test that fill-driven incremental scores equal a full rescan"""
+    print("Testing incremental scores on trade fills against full rescans...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fills from the last four weeks, so the day-aligned incremental
+        # window and the rescan window hold the same trades
+        source_path = os.path.join(tmp, 'source.db')
+        init_database(source_path)
+        now = int(time.time())
+        add_trades(source_path, now, wallet_count=3, days=29)
+
+        conn = sqlite3.connect(source_path)
+        conn.row_factory = sqlite3.Row
+        fills = [dict(row) for row in conn.execute("""
+            SELECT agent_id, side, quantity, entry_price, exit_price, pnl,
+                   entry_timestamp, exit_timestamp
+            FROM agent_trades
+            WHERE status = 'closed'
+            ORDER BY exit_timestamp
+        """)]
+        conn.close()
+
+        db_path = os.path.join(tmp, 'trading.db')
+        init_database(db_path)
+        calculator = SmartMoneyConfidenceCalculator(db_path)
+
+        try:
+            for n, fill in enumerate(fills):
+                trade = insert_trade(db_path, fill)
+                score = recalculate_wallet_confidence(trade['agent_id'], db_path, 30, trade=trade)
+
+                if n % 10 == 0 or n == len(fills) - 1:
+                    rescan = calculator.calculate_confidence(trade['agent_id'], 30)
+                    # The rescan's trend compares with the score just saved
+                    assert dict(score_fields(score), trend=None) == dict(score_fields(rescan), trend=None), \
+                        (n, score, rescan)
+
+            assert len(smart_money_confidence._incremental_scorers) == 1
+            latest = calculator.get_latest_confidence_scores()
+            print(f"  {len(fills)} fills, latest scores: "
+                  f"{[(s.wallet_address, s.overall_score) for s in latest]}")
+            for saved in latest:
+                rescan = calculator.calculate_confidence(saved.wallet_address, 30)
+                assert saved.overall_score == rescan.overall_score
+        finally:
+            smart_money_confidence._incremental_scorers.clear()
+
+    print("✓ Incremental fill scoring test passed")
+    return True
+
+
+def test_candle_holding_periods():
+    """Test holding-period ranges from block extrema and once-per-run file checks"""
+    print("Testing candle holding-period lookups...")
+
+    rng = random.Random(3)
+    start = 1_700_000_000
+    candles = []
+    for i in range(5000):
+        close = 100 + rng.uniform(-10, 10)
+        candles.append((start + 60 * i, close, close + rng.random(), close - rng.random(), close, 1.0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandleStore(tmp, '1m')
+        store.load('ETH', candles)
+        series = store.series('ETH')
+
+        for _ in range(300):
+            first = rng.randrange(len(candles))
+            last = rng.randrange(first, len(candles))
+            stats = store.holding_period('ETH', start + 60 * first, start + 60 * last)
+            lows = [candle[3] for candle in candles[first:last + 1]]
+            highs = [candle[2] for candle in candles[first:last + 1]]
+            assert (stats.low, stats.high) == (min(lows), max(highs)), (first, last, stats)
+
+        # A rewritten file is picked up after refresh(), not mid-run
+        store.holding_period('ETH', start, start + 60)
+        CandleStore(tmp, '1m').load('ETH', [(start, 100, 500, 1, 100, 1.0)])
+        assert store.holding_period('ETH', start, start + 60).high < 500
+        store.refresh()
+        assert store.holding_period('ETH', start, start + 60).high == 500
+        assert store.series('ETH') is not series
+
+    print("✓ Candle holding period test passed")
+    return True
+
+
+def test_market_timing_scores():
+    """Test that the NumPy, scalar and single-trade timing scores agree"""
+    print("Testing market timing scores...")
+
+    sides = ['buy', 'sell', 'BUY', 'sell', 'buy', 'sell']
+    entry_prices = [100.0, 100.0, 100.0, 100.0, 0.0, -5.0]
+    exit_prices = [110.0, 110.0, 500.0, 40.0, 120.0, 10.0]
+    # Long +10%, short -10%, long capped, short +60%, then two trades
+    # without a positive entry price, which score a neutral 50
+    expected = [55.0, 40.0, 100.0, 80.0, 50.0, 50.0]
+
+    vectorized = list(market_timing_scores(sides, entry_prices, exit_prices))
+    print(f"  Vectorized: {vectorized}")
+    assert vectorized == expected, vectorized
+
+    np = smart_money_confidence.np
+    smart_money_confidence.np = None
+    try:
+        scalar = market_timing_scores(sides, entry_prices, exit_prices)
+    finally:
+        smart_money_confidence.np = np
+    print(f"  Scalar:     {scalar}")
+    assert scalar == expected, scalar
+
+    single = [SmartMoneyConfidenceCalculator.score_trade_timing(*trade)
+              for trade in zip(sides, entry_prices, exit_prices)]
+    print(f"  Per trade:  {single}")
+    assert single == expected, single
+
+    # A wallet's score is the mean over its trades, whatever their order
+    assert mean_timing_score(expected) == 62.5
+    assert mean_timing_score(expected[::-1]) == 62.5
+    assert mean_timing_score([]) == 0
+
+    print("✓ Market timing scores test passed")
+    return True
+
+
+def test_export_backdated_close():
+    """Test that a trade closed after an export, with an earlier exit time, is still exported"""
+    print("Testing snapshot export of backdated closes...")
+
+    import pyarrow.dataset as ds
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'trading.db')
+        export_dir = os.path.join(tmp, 'export')
+        init_database(db_path)
+
+        now = int(time.time())
+        conn = sqlite3.connect(db_path)
+        insert = """
+            INSERT INTO agent_trades (
+                agent_id, model, symbol, side, order_type, quantity, entry_price,
+                exit_price, pnl, status, entry_timestamp, exit_timestamp
+            ) VALUES ('0xwallet', 'test', 'ETH', 'buy', 'market', 1, 100, ?, ?, ?, ?, ?)
+        """
+        open_id = conn.execute(insert, (None, 0, 'open', now - 3 * 86400, None)).lastrowid
+        closed_id = conn.execute(insert, (110, 10, 'closed', now - 7200, now - 3600)).lastrowid
+        conn.commit()
+
+        exporter = SnapshotExporter(db_path, export_dir)
+        first = exporter.export(['agent_trades'])['agent_trades']
+        print(f"  First export: {first['rows']} rows, watermark {first['watermark']}")
+        assert first['rows'] == 1
+
+        # Closes now, two days before the exported trade's exit
+        conn.execute("""
+            UPDATE agent_trades
+            SET status = 'closed', exit_price = 90, pnl = -10, exit_timestamp = ?
+            WHERE id = ?
+        """, (now - 2 * 86400, open_id))
+        conn.commit()
+        conn.close()
+
+        second = exporter.export(['agent_trades'])['agent_trades']
+        print(f"  Second export: {second['rows']} rows, watermark {second['watermark']}")
+        assert second['rows'] == 1
+
+        assert exporter.export(['agent_trades'])['agent_trades']['rows'] == 0
+
+        ids = ds.dataset(
+            os.path.join(export_dir, 'agent_trades'), format='parquet', partitioning='hive'
+        ).to_table().column('id').to_pylist()
+        print(f"  Exported trade ids: {sorted(ids)}")
+        assert sorted(ids) == sorted([open_id, closed_id])
+
+    print("✓ Backdated close export test passed")
+    return True
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SMART MONEY SIGNALS TEST")
+    print("=" * 60)
+    print()
+
+    # Test 1: Market timing scores
+    if not test_market_timing_scores():
+        exit(1)
+
+    print()
+
+    # Test 2: Batch scores equal per-wallet scores
+    if not test_batch_matches_per_wallet():
+        exit(1)
+
+    print()
+
+    # Test 3: Snapshot export of backdated closes
+    if not test_export_backdated_close():
+        exit(1)
+
+    print()
+
+    # Test 4: Ring buffer consistency equals SQL daily win rates
+    if not test_ring_consistency_matches_sql():
+        exit(1)
+
+    print()
+
+    # Test 5: Incremental scores on trade fills equal full rescans
+    if not test_fills_match_rescan():
+        exit(1)
+
+    print()
+
+    # Test 6: Candle holding-period ranges and file checks
+    if not test_candle_holding_periods():
+        exit(1)
+
+    print()
+
+    # Test 7: Multi-window scores equal separate runs
+    if not test_windows_match_separate_runs():
+        exit(1)
+
+    print()
+
+    # Test 8: LAG alerts equal the per-wallet history comparison
+    if not test_alerts_match_history_comparison():
+        exit(1)
+
+    print()
+
+    # Test 9: Duplicate recalculation jobs score each wallet once
+    if not test_duplicate_jobs_share_wallets():
+        exit(1)
+
+    print()
+    print("=" * 60)
+    print("ALL TESTS PASSED ✓")
+    print("=" * 60)